@@ -17,11 +17,13 @@
 
 import os
 import sys
+from cStringIO import StringIO
 
 from uc2.utils import translator
 
 config = None
 appdata = None
+_app = None
 
 _ = translator.MsgTranslator()
 
@@ -37,6 +39,38 @@ def uc2_init():
     return app
 
 
+def _get_app():
+    global _app
+    if _app is None:
+        _app = uc2_init()
+        _app.init_mngrs()
+    return _app
+
+
+def convert_stream(in_fp, out_fp, out_format, **opts):
+    """
+    Translates document read from in_fp file object into out_format
+    and writes result into out_fp. Both file objects are left open.
+    Options are the same as command line ones without leading dashes.
+    """
+    from uc2.cmds import memory_convert
+
+    opts['format'] = out_format
+    memory_convert(_get_app().appdata, in_fp.read(), out_fp, opts)
+
+
+def convert_bytes(data, out_format, **opts):
+    """
+    Translates document content into out_format and returns result string.
+    """
+    from uc2.cmds import memory_convert
+
+    fileptr = StringIO()
+    opts['format'] = out_format
+    memory_convert(_get_app().appdata, data, fileptr, opts)
+    return fileptr.getvalue()
+
+
 def uc2_run(cwd=None):
     """UniConvertor launch routine."""
 
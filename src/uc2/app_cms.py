@@ -68,6 +68,7 @@ class AppColorManager(ColorManager):
         self.rgb_intent = config.cms_rgb_intent
         self.cmyk_intent = config.cms_cmyk_intent
         self.flags = config.cms_flags
+        self.use_precalc = config.cms_precalc
         self.proofing = config.cms_proofing
         self.alarm_codes = config.cms_alarmcodes
         self.gamutcheck = config.cms_gamutcheck
@@ -103,6 +103,9 @@ class UCApplication(object):
             cmds.change_config(options)
             self.config.save()
             sys.exit(0)
+        elif cmds.check_options(cmds.SERVE_CMDS):
+            self.serve()
+            sys.exit(0)
         elif len(sys.argv) == 2:
             cmds.show_short_help('Not enough arguments!')
             sys.exit(1)
@@ -153,10 +156,20 @@ class UCApplication(object):
         status = 0
         # noinspection PyBroadException
         try:
-            command(self.appdata, files, options)
+            if command(self.appdata, files, options):
+                status = 1
         except Exception:
             status = 1
 
         if self.do_verbose:
             echo()
         sys.exit(status)
+
+    def serve(self):
+        self.do_verbose = True
+        options = cmds.parse_cmd_args(None)[1]
+        events.connect(events.MESSAGES, self.verbose)
+        log_level = options.get('log', self.config.log_level)
+        self.log_filepath = os.path.join(self.appdata.app_config_dir, 'uc2.log')
+        config_logging(self.log_filepath, log_level)
+        cmds.serve(self.appdata, options)
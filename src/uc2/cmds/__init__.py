@@ -21,9 +21,11 @@ import sys
 from uc2 import events, msgconst
 from .help import show_help, show_short_help
 from .translate import convert, wildcard_convert, multiple_convert
+from .translate import memory_convert
 from .translate import normalize_options
 from .configure import show_config, change_config
 from .parts import show_parts
+from .serve import serve
 from .const import *
 
 
@@ -31,6 +33,10 @@ def check_args(cmds):
     return any([cmd in sys.argv for cmd in cmds])
 
 
+def check_options(cmds):
+    return any([item.split('=', 1)[0] in cmds for item in sys.argv[1:]])
+
+
 def parse_cmd_args(current_dir):
     files = []
     options_list = []
@@ -64,7 +70,11 @@ def parse_cmd_args(current_dir):
             if value.isdigit():
                 value = int(value)
             elif value.replace('.', '').isdigit():
-                value = float(value)
+                # Dotted values like IP addresses are kept as strings
+                try:
+                    value = float(value)
+                except ValueError:
+                    pass
             elif value.lower() in ('yes', 'no'):
                 value = {'yes': True, 'no': False}[value.lower()]
             options[key] = value
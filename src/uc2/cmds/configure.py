@@ -41,7 +41,7 @@ INTENTS = {
     'ABSOLUTE_COLORIMETRIC': uc2const.INTENT_ABSOLUTE_COLORIMETRIC,
 }
 
-BOOL_ATTRS = ('cms_use', 'black_point_compensation',
+BOOL_ATTRS = ('cms_use', 'cms_precalc', 'black_point_compensation',
               'black_preserving_transform')
 INTENT_ATTRS = ('cms_rgb_intent', 'cms_cmyk_intent')
 PROFILES = ('cms_rgb_profile', 'cms_cmyk_profile',
@@ -72,6 +72,8 @@ def show_config():
     echo('  --black_point_compensation=%s' % to_bool(config.cms_bpc_flag))
     echo('  --black_preserving_transform=%s' % to_bool(config.cms_bpt_flag))
     echo()
+    echo('  --cms_precalc=%s' % to_bool(config.cms_precalc))
+    echo()
 
 
 def change_config(options):
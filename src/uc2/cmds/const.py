@@ -27,6 +27,7 @@ CONFIG_CMDS = ('--configure', '-configure', '--config', '-config',
                '--preferences', '-preferences', '--prefs', '-prefs')
 CFG_SHOW_CMDS = ('--show-config', '-show-config', '--show-prefs', '-show-prefs')
 PARTS_CMDS = ('--parts', '-parts', '--components')
+SERVE_CMDS = ('--serve',)
 
 ALL_CMDS = HELP_CMDS + DIR_CMDS + LOG_CMDS + VERBOSE_CMDS + VS_CMDS + \
            CONFIG_CMDS + CFG_SHOW_CMDS + PARTS_CMDS
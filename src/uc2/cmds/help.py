@@ -37,6 +37,10 @@ Example: uniconvertor drawing.cdr drawing.svg
  --format=       Type of output file format (values provided below)
  --package-dir   Show installation directory (for import as Python package)
  --show-log      Show detailed log of previous run
+ --profile=      Save conversion stage timings and counters into JSON file
+ --deterministic-ids[=SEED]
+                 Generate sequential ids (from SEED, 0 by default)
+                 for reproducible output
  
 ---Bulk operations:---------------------------------
  
@@ -47,6 +51,23 @@ Example: uniconvertor --recursive --format=PDF ~/clipart/*.svg ~/clipart_pdf/
  -vs, --verbose-short    Show minimized internal logs
  --dry-run               Execute command without translation
  --recursive             Recursive scanning
+ --jobs=                 Number of parallel translation processes
+ 
+---Conversion server:-------------------------------
+
+Usage: uniconvertor --serve[=ADDRESS] [OPTIONS]
+Example: uniconvertor --serve=127.0.0.1:8765 --jobs=4
+
+ ADDRESS is HOST[:PORT], PORT or Unix socket path
+ (uc2-serve.sock in config directory by default).
+ Requests: POST /convert {"input": path, "output": path, "options": {}}
+           GET /status
+ POST requests should have "Content-Type: application/json" header.
+ "timeout" request option cannot exceed server --timeout value.
+ Available options:
+ --jobs=                 Number of worker processes
+ --timeout=              Translation timeout in seconds (300 by default)
+ --root=                 Directory of translated files (current by default)
  
 ---Editing operations:---------------------------------
 
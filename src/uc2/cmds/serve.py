@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Conversion daemon.
+
+'uniconvertor --serve[=ADDRESS]' starts HTTP server on Unix socket
+(in application config directory by default or if ADDRESS is a file path)
+or on localhost TCP port. Conversions run in pool of worker processes
+which keep application state (config, color management, format modules,
+Pango and cairo) initialized between requests.
+
+API:
+  POST /convert  {"input": path, "output": path, "options": {...}}
+                 returns {"status": bool, "messages": [...], "time": sec}
+                 "timeout" option limits translation time (seconds),
+                 it cannot exceed server --timeout value
+  GET  /status   returns pool state, queue depth and latency statistics
+
+Input and output paths are confined to root directory (--root option,
+current directory by default). Requests should have 'application/json'
+content type and no Origin header, so web pages cannot send them
+as simple cross-origin requests.
+"""
+
+import BaseHTTPServer
+import SocketServer
+import Queue
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from uc2 import events, msgconst
+
+from . import translate
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_SOCKET = 'uc2-serve.sock'
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+def _worker_loop(conn):
+    translate._init_worker()
+    from uc2.formats import preload_formats
+    preload_formats()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        status, messages = translate._convert_job(job)
+        messages = [(msgconst.MESSAGES[msg_type], msg)
+                    for msg_type, msg in messages]
+        conn.send((status, messages))
+
+
+class ConversionTimeout(Exception):
+    pass
+
+
+class Worker(object):
+    process = None
+    conn = None
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_loop,
+                                               args=(child_conn,))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+    def run(self, job, timeout):
+        self.conn.send(job)
+        if not self.conn.poll(timeout):
+            raise ConversionTimeout('Conversion timeout %s sec' % timeout)
+        return self.conn.recv()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self, terminate=False):
+        if terminate:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except (IOError, EOFError):
+                pass
+        self.process.join(5)
+        self.conn.close()
+
+
+class WorkerPool(object):
+    """
+    Bounded pool of conversion processes. Requests wait for idle
+    worker; worker which exceeds timeout is killed and replaced.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.idle = Queue.Queue()
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'failures': 0, 'timeouts': 0,
+                      'waiting': 0, 'running': 0,
+                      'latency_total': 0.0, 'latency_max': 0.0,
+                      'latency_last': 0.0}
+        for _i in range(size):
+            self.idle.put(Worker())
+
+    def _update_stats(self, **kw):
+        with self.lock:
+            for key, value in kw.items():
+                self.stats[key] += value
+
+    def convert(self, filepath, out_filepath, options, timeout=None):
+        """
+        Translates file in idle worker. Timeout cannot exceed
+        pool timeout which is used by default.
+        """
+        timeout = min(timeout or self.timeout, self.timeout)
+        start = time.time()
+        self._update_stats(waiting=1)
+        worker = self.idle.get()
+        self._update_stats(waiting=-1, running=1)
+        try:
+            if not worker.is_alive():
+                worker.stop(True)
+                worker = Worker()
+            status, messages = worker.run((filepath, out_filepath, options),
+                                          timeout)
+        except ConversionTimeout as e:
+            LOG.error('%s for "%s"', e, filepath)
+            worker.stop(True)
+            worker = Worker()
+            self._update_stats(timeouts=1)
+            status, messages = False, [(msgconst.MESSAGES[msgconst.ERROR],
+                                        str(e))]
+        except Exception as e:
+            LOG.exception('Worker failure for "%s"', filepath)
+            worker.stop(True)
+            worker = Worker()
+            status, messages = False, [(msgconst.MESSAGES[msgconst.ERROR],
+                                        str(e))]
+        finally:
+            self.idle.put(worker)
+        latency = time.time() - start
+        with self.lock:
+            self.stats['running'] -= 1
+            self.stats['requests'] += 1
+            self.stats['failures'] += 0 if status else 1
+            self.stats['latency_total'] += latency
+            self.stats['latency_last'] = latency
+            self.stats['latency_max'] = max(self.stats['latency_max'],
+                                            latency)
+        return {'status': status, 'messages': messages,
+                'time': round(latency, 4)}
+
+    def get_status(self):
+        with self.lock:
+            stats = dict(self.stats)
+        requests = stats['requests']
+        return {
+            'workers': self.size,
+            'busy': stats['running'],
+            'queue_depth': stats['waiting'],
+            'requests': requests,
+            'failures': stats['failures'],
+            'timeouts': stats['timeouts'],
+            'latency': {
+                'avg': round(stats['latency_total'] / requests, 4)
+                if requests else 0.0,
+                'last': round(stats['latency_last'], 4),
+                'max': round(stats['latency_max'], 4),
+            },
+        }
+
+    def close(self):
+        for _i in range(self.size):
+            try:
+                worker = self.idle.get(timeout=1.0)
+            except Queue.Empty:
+                break
+            worker.stop()
+
+
+class RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    server_version = 'UniConvertor'
+
+    def send_json(self, code, data):
+        content = json.dumps(data)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path == '/status':
+            self.send_json(200, self.server.pool.get_status())
+        else:
+            self.send_json(404, {'error': 'Unknown request'})
+
+    def do_POST(self):
+        if self.path != '/convert':
+            self.send_json(404, {'error': 'Unknown request'})
+            return
+        # Browsers always send Origin header for cross-origin POST
+        # and cannot send JSON content type without CORS preflight
+        if 'Origin' in self.headers:
+            self.send_json(403, {'error': 'Cross-origin requests '
+                                          'are not allowed'})
+            return
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.split(';')[0].strip().lower() != 'application/json':
+            self.send_json(415, {'error': 'Content type should be '
+                                          'application/json'})
+            return
+        try:
+            size = int(self.headers.get('Content-Length', 0))
+            if not 0 < size <= MAX_REQUEST_SIZE:
+                raise ValueError('Wrong request size')
+            request = json.loads(self.rfile.read(size))
+            filepath = request['input'].encode('utf-8')
+            out_filepath = request['output'].encode('utf-8')
+            options = request.get('options') or {}
+            if not isinstance(options, dict):
+                raise ValueError('Options should be an object')
+            options = dict((str(key), value)
+                           for key, value in options.items())
+            timeout = options.pop('timeout', None)
+            if timeout is not None and (isinstance(timeout, bool) or
+                                        not isinstance(timeout, (int, float))
+                                        or timeout <= 0):
+                raise ValueError('Timeout should be a positive number')
+        except (ValueError, KeyError, AttributeError) as e:
+            self.send_json(400, {'error': 'Wrong request: %s' % e})
+            return
+        paths = []
+        for path in (filepath, out_filepath):
+            paths.append(_confine_path(self.server.root, path))
+            if paths[-1] is None:
+                self.send_json(403, {'error': 'Path "%s" is outside of '
+                                              'root directory' % path})
+                return
+        filepath, out_filepath = paths
+        if not os.path.isfile(filepath):
+            self.send_json(404, {'error': 'File "%s" is not found'
+                                          % filepath})
+            return
+        result = self.server.pool.convert(filepath, out_filepath, options,
+                                          timeout)
+        self.send_json(200 if result['status'] else 500, result)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, msg_format, *args):
+        LOG.info('%s %s', self.address_string(), msg_format % args)
+
+
+class ThreadingHTTPServer(SocketServer.ThreadingMixIn,
+                          BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    pool = None
+    root = None
+
+
+class ThreadingUnixHTTPServer(SocketServer.ThreadingMixIn,
+                              SocketServer.UnixStreamServer):
+    daemon_threads = True
+    pool = None
+    root = None
+
+    def server_bind(self):
+        # Socket is accessible for owner only
+        umask = os.umask(0o177)
+        try:
+            SocketServer.UnixStreamServer.server_bind(self)
+        finally:
+            os.umask(umask)
+
+
+def _confine_path(root, path):
+    """
+    Returns real path of requested file or None if the path is outside
+    of root directory. Relative paths are resolved against root.
+    """
+    path = os.path.realpath(os.path.join(root, path))
+    if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+        return path
+    return None
+
+
+def _parse_address(address):
+    """
+    Returns (host, port) pair for HOST[:PORT] or PORT address value.
+    """
+    host, port = DEFAULT_HOST, DEFAULT_PORT
+    if isinstance(address, bool):
+        pass
+    elif isinstance(address, int):
+        port = address
+    elif isinstance(address, str):
+        if ':' in address:
+            host, _sep, port_str = address.rpartition(':')
+            host = host or DEFAULT_HOST
+            port = int(port_str) if port_str else DEFAULT_PORT
+        elif address.isdigit():
+            port = int(address)
+        elif address:
+            host = address
+    return host, port
+
+
+def _create_server(address, socket_path):
+    if address is True or address is None:
+        address = socket_path
+    if isinstance(address, str) and os.sep in address:
+        if os.path.exists(address):
+            os.remove(address)
+        return ThreadingUnixHTTPServer(address, RequestHandler), address
+    server = ThreadingHTTPServer(_parse_address(address), RequestHandler)
+    return server, 'http://%s:%d' % server.server_address[:2]
+
+
+def serve(appdata, options):
+    """
+    Runs conversion daemon till interruption.
+    Options: serve (address), jobs (pool size), timeout (seconds),
+    root (directory of translated files).
+    """
+    address = options.get('serve')
+    socket_path = os.path.join(appdata.app_config_dir, DEFAULT_SOCKET)
+    root = options.get('root')
+    root = os.path.expanduser(root) if isinstance(root, str) else os.getcwd()
+    root = os.path.realpath(root)
+    if not os.path.isdir(root):
+        msg = 'Root directory "%s" is not found' % root
+        events.emit(events.MESSAGES, msgconst.STOP, msg)
+        return
+    size = translate._get_jobs_number(options)
+    timeout = options.get('timeout', DEFAULT_TIMEOUT)
+    if not isinstance(timeout, (int, float)) or timeout <= 0:
+        timeout = DEFAULT_TIMEOUT
+
+    server, url = _create_server(address, socket_path)
+    server.root = root
+    server.pool = WorkerPool(size, float(timeout))
+    msg = 'Conversion server is started on %s (%d workers)' % (url, size)
+    events.emit(events.MESSAGES, msgconst.INFO, msg)
+    msg = 'Translated files are confined to "%s"' % root
+    events.emit(events.MESSAGES, msgconst.INFO, msg)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.close()
+        if isinstance(server, ThreadingUnixHTTPServer) and \
+                os.path.exists(url):
+            os.remove(url)
+        events.emit(events.MESSAGES, msgconst.INFO,
+                    'Conversion server is stopped')
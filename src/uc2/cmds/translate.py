@@ -18,11 +18,13 @@
 import copy
 import glob
 import logging
+import multiprocessing
 import os
 import sys
 
-from uc2 import events, uc2const, msgconst
+from uc2 import events, uc2const, msgconst, utils
 from uc2.formats import get_loader, get_saver, get_saver_by_id
+from uc2.utils import fsutils, profiler
 from uc2.utils.mixutils import echo
 
 from . import const
@@ -46,12 +48,46 @@ def normalize_options(options):
 
 
 def convert(appdata, files, options):
+    profile = options.pop('profile', None)
+    if not profile or profile is True:
+        _convert(appdata, files, options)
+        return
+
+    prof = profiler.Profiler()
+    prof.connect()
+    try:
+        _convert(appdata, files, options)
+    finally:
+        prof.disconnect()
+        try:
+            prof.save(profile)
+        except Exception as e:
+            LOG.error('Cannot save profiling data into %s %s', profile, e)
+
+
+def _get_id_seed(options):
+    seed = options.pop('deterministic_ids', None)
+    if seed is None or seed is False:
+        return None
+    if seed is True:
+        return 0
+    if isinstance(seed, int):
+        return seed
+    LOG.warning('Wrong --deterministic-ids value "%s", 0 is used', seed)
+    return 0
+
+
+def _convert(appdata, files, options):
     dry_run = bool(options.get('dry-run'))
     normalize_options(options)
+    # Id generator is reset for every translation, so output
+    # does not depend on previous jobs of the same process
+    utils.set_deterministic_ids(_get_id_seed(options))
 
     msg = 'Translation of "%s" into "%s"' % (files[0], files[1])
     events.emit(events.MESSAGES, msgconst.JOB, msg)
 
+    profiler.start_stage(profiler.DETECTION)
     # Define saver -----------------------------------------
     sid = options.get('format', '').lower()
     if sid and sid in const.SAVER_IDS:
@@ -60,6 +96,7 @@ def convert(appdata, files, options):
     else:
         saver, saver_id = get_saver(files[1], return_id=True)
     if saver is None:
+        profiler.end_stage(profiler.DETECTION)
         msg = 'Output file format of "%s" is unsupported.' % files[1]
         events.emit(events.MESSAGES, msgconst.ERROR, msg)
 
@@ -69,6 +106,7 @@ def convert(appdata, files, options):
 
     # Define loader -----------------------------------------
     loader, loader_id = get_loader(files[0], return_id=True)
+    profiler.end_stage(profiler.DETECTION)
     if loader is None:
         msg = 'Input file format of "%s" is unsupported.' % files[0]
         events.emit(events.MESSAGES, msgconst.ERROR, msg)
@@ -80,14 +118,25 @@ def convert(appdata, files, options):
     if dry_run:
         return
 
+    # In-memory content is loaded from file object
+    # and result is written into output stream
+    src, dst = files[0], files[1]
+    if fsutils.is_memfile(src):
+        src = (None, src.open())
+    else:
+        src = (src,)
+    dst = (None, dst) if hasattr(dst, 'write') else (dst,)
+
     # File loading -----------------------------------------
+    profiler.start_stage(profiler.LOADING)
     try:
         if loader_id in uc2const.PALETTE_LOADERS and \
                 saver_id in uc2const.PALETTE_SAVERS:
-            doc = loader(appdata, files[0], convert=True, **options)
+            doc = loader(appdata, *src, convert=True, **options)
         else:
-            doc = loader(appdata, files[0], **options)
+            doc = loader(appdata, *src, **options)
     except Exception:
+        profiler.end_stage(profiler.LOADING)
         msg = 'Error while loading "%s"' % files[0]
         msg += 'The file may be corrupted or contains unknown file format.'
         events.emit(events.MESSAGES, msgconst.ERROR, msg)
@@ -96,6 +145,8 @@ def convert(appdata, files, options):
         msg = 'Loading is interrupted'
         events.emit(events.MESSAGES, msgconst.STOP, msg)
         raise
+    profiler.end_stage(profiler.LOADING)
+    profiler.count_objects(doc)
 
     # Model transforming ----------------------------------
     if doc and doc.cid == uc2const.SK2:
@@ -113,13 +164,15 @@ def convert(appdata, files, options):
 
     # File saving -----------------------------------------
     if doc is not None:
+        profiler.start_stage(profiler.SAVING)
         try:
             if loader_id in uc2const.PALETTE_LOADERS and \
                     saver_id in uc2const.PALETTE_SAVERS:
-                saver(doc, files[1], translate=False, convert=True, **options)
+                saver(doc, *dst, translate=False, convert=True, **options)
             else:
-                saver(doc, files[1], **options)
+                saver(doc, *dst, **options)
         except Exception:
+            profiler.end_stage(profiler.SAVING)
             msg = 'Error while translation and saving "%s"' % files[0]
             events.emit(events.MESSAGES, msgconst.ERROR, msg)
 
@@ -127,6 +180,7 @@ def convert(appdata, files, options):
             msg2 = 'Translation is interrupted'
             events.emit(events.MESSAGES, msgconst.STOP, msg2)
             raise
+        profiler.end_stage(profiler.SAVING)
     else:
         msg = 'Error creating model for "%s"' % files[0]
         events.emit(events.MESSAGES, msgconst.ERROR, msg)
@@ -140,6 +194,21 @@ def convert(appdata, files, options):
     events.emit(events.MESSAGES, msgconst.OK, msg)
 
 
+def memory_convert(appdata, data, fileptr, options):
+    """
+    Translates document content provided as a string and writes result
+    into fileptr file object which is left open. Output format is defined
+    by 'format' option, input format is detected by content.
+    """
+    sid = options.get('format', '').lower()
+    if sid not in const.SAVER_IDS:
+        msg = 'Output file format is not supported.'
+        events.emit(events.MESSAGES, msgconst.ERROR, msg)
+        raise ValueError(msg)
+    files = (fsutils.MemoryFile(data), fsutils.NonClosingFile(fileptr))
+    convert(appdata, files, options)
+
+
 def _get_saver_extension(options):
     if 'format' not in options:
         msg = 'Output file format is not defined.'
@@ -175,38 +244,126 @@ def _get_filelist(path, subpath, wildcard, recursive=False):
     return filelist
 
 
-def multiple_convert(appdata, files, options):
-    saver_ext = _get_saver_extension(options)
+def _get_jobs_number(options):
+    jobs = options.get('jobs', 1)
+    if jobs is True:
+        return multiprocessing.cpu_count()
+    if not isinstance(jobs, int) or jobs < 1:
+        return 1
+    return jobs
+
+
+def _report_job(filepath, out_filepath, status, options):
     verbose = bool(options.get('verbose'))
     verbose_short = bool(options.get('verbose-short'))
+    if status:
+        if verbose:
+            echo()
+        elif verbose_short:
+            echo('Translation of "%s"' % filepath)
+            echo('into "%s" ...[  OK  ]\n' % out_filepath)
+    elif verbose_short:
+        echo('Translation of "%s"' % filepath)
+        echo('into "%s" ...[ FAIL ]\n' % out_filepath)
+
 
+WORKER_APP = None
+
+
+def _init_worker():
+    global WORKER_APP
+    # Forked workers inherit receivers of parent process,
+    # messages are collected per job and replayed by parent instead
+    events.clean_channel(events.MESSAGES)
+    from uc2 import uc2_init
+    WORKER_APP = uc2_init()
+    WORKER_APP.init_mngrs()
+
+
+def _convert_job(job):
+    filepath, out_filepath, options = job
+    messages = []
+
+    def receiver(*args):
+        messages.append(args)
+
+    events.connect(events.MESSAGES, receiver)
+    status = True
+    # noinspection PyBroadException
+    try:
+        convert(WORKER_APP.appdata, (filepath, out_filepath), options)
+    except Exception:
+        status = False
+    finally:
+        events.disconnect(events.MESSAGES, receiver)
+    return status, messages
+
+
+def _convert_jobs(appdata, jobs, options):
+    """
+    Translates list of (filepath, out_filepath) pairs sequentially
+    or using process pool if --jobs option is provided.
+    Returns number of failed translations.
+    """
+    fails = 0
+    if options.pop('profile', None):
+        LOG.warning('--profile option is ignored for bulk translation')
+    processes = min(_get_jobs_number(options), len(jobs))
+    if processes < 2:
+        for filepath, out_filepath in jobs:
+            kw = copy.deepcopy(options)
+            status = True
+            # noinspection PyBroadException
+            try:
+                convert(appdata, (filepath, out_filepath), kw)
+            except Exception:
+                status = False
+                fails += 1
+            _report_job(filepath, out_filepath, status, options)
+        return fails
+
+    tasks = [(filepath, out_filepath, copy.deepcopy(options))
+             for filepath, out_filepath in jobs]
+    pool = multiprocessing.Pool(processes, _init_worker)
+    try:
+        results = pool.imap(_convert_job, tasks, 1)
+        for index, (status, messages) in enumerate(results):
+            for args in messages:
+                events.emit(events.MESSAGES, *args)
+            if not status:
+                fails += 1
+            filepath, out_filepath = jobs[index]
+            _report_job(filepath, out_filepath, status, options)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return fails
+
+
+def multiple_convert(appdata, files, options):
+    saver_ext = _get_saver_extension(options)
+
+    fails = 0
+    jobs = []
     filelist = files[:-1]
     dir_path = files[-1]
     for filepath in filelist:
         if not os.path.exists(filepath):
             msg = 'File "%s" is not found' % filepath
             events.emit(events.MESSAGES, msgconst.STOP, msg)
+            fails += 1
             continue
         filename = os.path.basename(filepath).split('.', 1)[0]
         out_filepath = os.path.join(dir_path, '%s.%s' % (filename, saver_ext))
-        kw = copy.deepcopy(options)
-        try:
-            convert(appdata, (filepath, out_filepath), kw)
-            if verbose:
-                echo()
-            elif verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[  OK  ]\n' % out_filepath)
-        except Exception:
-            if verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[ FAIL ]\n' % out_filepath)
+        jobs.append((filepath, out_filepath))
+    return fails + _convert_jobs(appdata, jobs, options)
 
 
 def wildcard_convert(appdata, files, options):
     saver_ext = _get_saver_extension(options)
-    verbose = bool(options.get('verbose'))
-    verbose_short = bool(options.get('verbose-short'))
 
     path = os.path.dirname(files[0])
     wildcard = os.path.basename(files[0])
@@ -217,20 +374,11 @@ def wildcard_convert(appdata, files, options):
         events.emit(events.MESSAGES, msgconst.STOP, msg)
         return
 
+    jobs = []
     for filepath, subpath, filename in filelist:
         dir_path = os.path.join(files[1], subpath)
         if not os.path.exists(dir_path):
             os.makedirs(dir_path)
         out_filepath = os.path.join(dir_path, '%s.%s' % (filename, saver_ext))
-        kw = copy.deepcopy(options)
-        try:
-            convert(appdata, (filepath, out_filepath), kw)
-            if verbose:
-                echo()
-            elif verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[  OK  ]\n' % out_filepath)
-        except Exception:
-            if verbose_short:
-                echo('Translation of "%s"' % filepath)
-                echo('into "%s" ...[ FAIL ]\n' % out_filepath)
+        jobs.append((filepath, out_filepath))
+    return _convert_jobs(appdata, jobs, options)
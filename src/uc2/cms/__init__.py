@@ -25,10 +25,13 @@ from uc2.uc2const import COLOR_RGB, COLOR_CMYK, COLOR_LAB, COLOR_GRAY, \
     COLOR_SPOT, COLOR_DISPLAY, COLOR_REG
 from uc2.uc2const import IMAGE_MONO, IMAGE_GRAY, IMAGE_RGB, IMAGE_CMYK, \
     IMAGE_LAB, IMAGE_TO_COLOR
-from uc2.utils import fsutils
+from uc2.utils import fsutils, profiler
 
 CS = [COLOR_RGB, COLOR_CMYK, COLOR_LAB, COLOR_GRAY]
 
+# Max number of memoized colors per transform
+COLOR_CACHE_SIZE = 4096
+
 
 def get_registration_black():
     return [COLOR_SPOT, [[0.0, 0.0, 0.0], [1.0, 1.0, 1.0, 1.0]], 1.0, COLOR_REG]
@@ -456,6 +459,7 @@ class ColorManager(object):
     handles = None
     transforms = None
     proof_transforms = None
+    color_caches = None
 
     use_cms = True
     use_display_profile = False
@@ -467,6 +471,7 @@ class ColorManager(object):
     rgb_intent = uc2const.INTENT_RELATIVE_COLORIMETRIC
     cmyk_intent = uc2const.INTENT_PERCEPTUAL
     flags = uc2const.cmsFLAGS_NOTPRECALC
+    use_precalc = False
 
     def __init__(self):
         self.update()
@@ -483,6 +488,26 @@ class ColorManager(object):
     def clear_transforms(self):
         self.transforms = {}
         self.proof_transforms = {}
+        self.color_caches = {}
+
+    def get_flags(self):
+        """
+        Returns lcms flags for new transforms. Precalculated
+        transforms are used if use_precalc flag is set.
+        """
+        if self.use_precalc:
+            return self.flags & ~uc2const.cmsFLAGS_NOTPRECALC
+        return self.flags
+
+    def get_color_cache(self, tr_type):
+        """
+        Returns memo dict of transformed colors for provided transform type.
+        The dict is dropped when it reaches COLOR_CACHE_SIZE.
+        """
+        cache = self.color_caches.get(tr_type)
+        if cache is None or len(cache) >= COLOR_CACHE_SIZE:
+            cache = self.color_caches[tr_type] = {}
+        return cache
 
     def get_transform(self, cs_in, cs_out):
         """
@@ -500,7 +525,7 @@ class ColorManager(object):
                 cs_out = COLOR_RGB
             tr = libcms.cms_create_transform(handle_in, cs_in,
                                              handle_out, cs_out,
-                                             intent, self.flags)
+                                             intent, self.get_flags())
             self.transforms[tr_type] = tr
         return self.transforms[tr_type]
 
@@ -522,7 +547,7 @@ class ColorManager(object):
                                                       handle_proof,
                                                       self.cmyk_intent,
                                                       self.rgb_intent,
-                                                      self.flags)
+                                                      self.get_flags())
             self.proof_transforms[tr_type] = tr
         return self.proof_transforms[tr_type]
 
@@ -534,10 +559,38 @@ class ColorManager(object):
         if not self.use_cms:
             return do_simple_transform(color[1], cs_in, cs_out)
         in_color = colorb(color)
-        out_color = colorb()
-        transform = self.get_transform(cs_in, cs_out)
-        libcms.cms_do_transform(transform, in_color, out_color)
-        return decode_colorb(out_color, cs_out)
+        cache = self.get_color_cache(cs_in + cs_out)
+        key = tuple(in_color)
+        if key not in cache:
+            out_color = colorb()
+            transform = self.get_transform(cs_in, cs_out)
+            libcms.cms_do_transform(transform, in_color, out_color)
+            cache[key] = tuple(decode_colorb(out_color, cs_out))
+            profiler.count(profiler.COLORS_TRANSFORMED)
+        return list(cache[key])
+
+    def do_transforms(self, colors, cs_in, cs_out):
+        """
+        Converts list of colors between colorspaces.
+        Colors which are not memoized yet are transformed
+        using single lcms call.
+        Returns list of color values lists.
+        """
+        if not self.use_cms:
+            return [do_simple_transform(color[1], cs_in, cs_out)
+                    for color in colors]
+        cache = self.get_color_cache(cs_in + cs_out)
+        keys = [tuple(colorb(color)) for color in colors]
+        missing = list(set([key for key in keys if key not in cache]))
+        if missing:
+            transform = self.get_transform(cs_in, cs_out)
+            mode_out = COLOR_RGB if cs_out == COLOR_DISPLAY else cs_out
+            ret = libcms.cms_do_batch_transform(transform, missing,
+                                                cs_in, mode_out)
+            for key, out_color in zip(missing, ret):
+                cache[key] = tuple(decode_colorb(out_color, cs_out))
+            profiler.count(profiler.COLORS_TRANSFORMED, len(missing))
+        return [list(cache[key]) for key in keys]
 
     def do_bitmap_transform(self, img, mode, cs_out=None):
         """
@@ -558,10 +611,15 @@ class ColorManager(object):
         Returns list of color values.
         """
         in_color = colorb(color)
-        out_color = colorb()
-        transform = self.get_proof_transform(cs_in)
-        libcms.cms_do_transform(transform, in_color, out_color)
-        return decode_colorb(out_color, COLOR_RGB)
+        cache = self.get_color_cache(('proof', cs_in))
+        key = tuple(in_color)
+        if key not in cache:
+            out_color = colorb()
+            transform = self.get_proof_transform(cs_in)
+            libcms.cms_do_transform(transform, in_color, out_color)
+            cache[key] = tuple(decode_colorb(out_color, COLOR_RGB))
+            profiler.count(profiler.COLORS_TRANSFORMED)
+        return list(cache[key])
 
     def do_proof_bitmap_transform(self, img):
         """
@@ -658,6 +716,27 @@ class ColorManager(object):
                        COLOR_GRAY: self.get_grayscale_color}
         return methods_map[cs](color)
 
+    def get_colors(self, colors, cs=COLOR_RGB):
+        """
+        Converts list of colors into requested colorspace.
+        Colors are grouped by source colorspace and each group
+        is converted by batch transform.
+        Stores alpha channel and color name.
+        """
+        result = [None] * len(colors)
+        groups = {}
+        for index, color in enumerate(colors):
+            if color[0] in (cs, COLOR_SPOT):
+                result[index] = self.get_color(color, cs)
+            else:
+                groups.setdefault(color[0], []).append(index)
+        for cs_in, indexes in groups.items():
+            values = self.do_transforms([colors[i] for i in indexes], cs_in, cs)
+            for index, value in zip(indexes, values):
+                color = colors[index]
+                result[index] = [cs, value, color[2], color[3]]
+        return result
+
     def mix_colors(self, color0, color1, coef=.5):
         supported = [COLOR_RGB, COLOR_CMYK, COLOR_GRAY]
         if not color0[0] in supported:
@@ -747,7 +826,7 @@ class ColorManager(object):
             intent = self.cmyk_intent
         transform = libcms.cms_create_transform(custom_profile, cs_in,
                                                 out_profile, cs_out, intent,
-                                                self.flags)
+                                                self.get_flags())
         return libcms.cms_do_bitmap_transform(transform, img, cs_in, cs_out)
 
     def get_display_image(self, img):
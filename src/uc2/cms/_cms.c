@@ -324,6 +324,48 @@ pycms_TransformPixel2 (PyObject *self, PyObject *args) {
 	return result;
 }
 
+//4 channels and extra channel of double values
+#define MAX_PIXEL_SIZE 40
+
+static PyObject *
+pycms_TransformBuffer (PyObject *self, PyObject *args) {
+
+	unsigned char *inbuf;
+	unsigned char *outbuf;
+	int inlength, count, insize, outsize;
+	void *transform;
+	cmsHTRANSFORM hTransform;
+	PyObject *result;
+
+	if (!PyArg_ParseTuple(args, "Os#iii", &transform, &inbuf, &inlength, &count, &insize, &outsize)) {
+		Py_INCREF(Py_None);
+		return Py_None;
+	}
+
+	//input buffer should contain count pixels of insize bytes
+	if (count < 0 || insize < 1 || insize > MAX_PIXEL_SIZE ||
+			outsize < 1 || outsize > MAX_PIXEL_SIZE ||
+			count > inlength / insize || count > INT_MAX / outsize) {
+		PyErr_SetString(PyExc_ValueError, "wrong transform buffer size");
+		return NULL;
+	}
+
+	hTransform = (cmsHTRANSFORM) PyCObject_AsVoidPtr(transform);
+
+	cmsErrorAction(LCMS_ERROR_IGNORE);
+
+	outbuf=malloc(count*outsize + 1);
+	if (outbuf == NULL) {
+		return PyErr_NoMemory();
+	}
+
+	cmsDoTransform(hTransform, inbuf, outbuf, count);
+
+	result = Py_BuildValue("s#", outbuf, count*outsize);
+	free(outbuf);
+	return result;
+}
+
 static PyObject *
 pycms_TransformBitmap (PyObject *self, PyObject *args) {
 
@@ -501,6 +543,7 @@ PyMethodDef pycms_methods[] = {
 	{"setAlarmCodes", pycms_SetAlarmCodes, METH_VARARGS},
 	{"transformPixel", pycms_TransformPixel, METH_VARARGS},
 	{"transformPixel2", pycms_TransformPixel2, METH_VARARGS},
+	{"transformBuffer", pycms_TransformBuffer, METH_VARARGS},
 	{"transformBitmap", pycms_TransformBitmap, METH_VARARGS},
 	{"getProfileName", pycms_GetProfileName, METH_VARARGS},
 	{"getProfileInfo", pycms_GetProfileInfo, METH_VARARGS},
@@ -413,6 +413,47 @@ def cms_do_transform(transform, inbuff, outbuff):
         raise CmsError(msg)
 
 
+# Number of bytes per pixel used by lcms transform buffers
+PIXEL_SIZE = {
+    uc2const.COLOR_GRAY: 1,
+    uc2const.COLOR_LAB: 3,
+}
+
+
+def cms_do_batch_transform(transform, inbuffs, in_mode, out_mode):
+    """Transform list of color values using single lcms call.
+
+    :param transform: valid lcms transformation handle
+    :param inbuffs: list of 4-member lists. The members should be
+                    between 0 and 255
+    :param in_mode: colorspace of transform input
+    :param out_mode: colorspace of transform output
+
+    :return: list of 4-member lists of transformed values
+    """
+    if not inbuffs:
+        return []
+    in_size = PIXEL_SIZE.get(in_mode, 4)
+    out_size = PIXEL_SIZE.get(out_mode, 4)
+    inbuff = bytearray()
+    for item in inbuffs:
+        if len(item) < in_size:
+            msg = 'Color value %s is too short for %s colorspace'
+            raise CmsError(msg % (repr(item), in_mode))
+        inbuff.extend(item[:in_size])
+    try:
+        ret = _cms.transformBuffer(transform, str(inbuff), len(inbuffs),
+                                   in_size, out_size)
+    except (ValueError, MemoryError) as e:
+        raise CmsError('Cannot transform color values: %s' % e)
+    if ret is None:
+        raise CmsError('Cannot transform color values')
+    ret = bytearray(ret)
+    tail = [0] * (4 - out_size)
+    return [list(ret[i:i + out_size]) + tail
+            for i in range(0, len(ret), out_size)]
+
+
 def cms_do_bitmap_transform(transform, image, in_mode, out_mode):
     """Provides PIL images support for color management.
     Currently supports L, RGB, CMYK and LAB modes only.
@@ -27,6 +27,8 @@ Signal arguments:
 CONFIG_MODIFIED   attr, value - modified config field
 FILTER_INFO       msg, position - info message and progress in range 0.0-1.0
 MESSAGES          msg_type, msg - message type and message text
+PROFILE           kind, name, value - profiling stage start/end or counter
+                  increment (see uc2.utils.profiler)
 
 """
 
@@ -39,6 +41,7 @@ CANCEL_OPERATION = False
 CONFIG_MODIFIED = ['CONFIG_MODIFIED']
 FILTER_INFO = ['FILTER_INFO']
 MESSAGES = ['MESSAGES']
+PROFILE = ['PROFILE']
 
 
 def connect(channel, receiver):
@@ -94,5 +97,5 @@ def clean_all_channels():
     """
     Cleans all channels.
     """
-    for item in (CONFIG_MODIFIED, MESSAGES, FILTER_INFO):
+    for item in (CONFIG_MODIFIED, MESSAGES, FILTER_INFO, PROFILE):
         clean_channel(item)
@@ -18,6 +18,7 @@
 import logging
 from importlib import import_module
 
+import detector
 from fallback import fallback_check, im_loader
 from uc2 import events, msgconst
 from uc2 import uc2const
@@ -79,6 +80,18 @@ def _get_checker(pid):
     return checker
 
 
+def preload_formats():
+    """
+    Imports all loaders, savers and format checkers in advance,
+    so long-running processes do not pay for it on first request.
+    """
+    for pid in uc2const.LOADER_FORMATS:
+        _get_loader(pid)
+        _get_checker(pid)
+    for pid in uc2const.SAVER_FORMATS:
+        _get_saver(pid)
+
+
 def get_loader_by_id(pid):
     loader = _get_loader(pid)
     if not loader:
@@ -87,64 +100,70 @@ def get_loader_by_id(pid):
     return loader
 
 
-def get_loader(path, experimental=False, return_id=False):
+def get_loader(path, experimental=False, return_id=False,
+               return_confidence=False):
+    """
+    Detects file format by signature table (see detector module) reading
+    file header once. Format checkers run only for formats matching file
+    extension when signature is not recognized (e.g. for formats without
+    magic bytes), image libraries are used as the last resort.
+    """
     if not fsutils.exists(path):
         return None
     if not fsutils.isfile(path):
         return None
 
-    ret_id = None
-
     ext = fsutils.get_file_extension(path)
-    loader = None
     ld_formats = [] + uc2const.LOADER_FORMATS
+    if experimental:
+        ld_formats += uc2const.EXPERIMENTAL_LOADERS
 
-    msg = 'Start to search for loader by file extension %s' % (ext.__str__())
+    msg = 'Start to search for loader by file signature'
     events.emit(events.MESSAGES, msgconst.INFO, msg)
 
-    if experimental:
-        ld_formats += uc2const.EXPERIMENTAL_LOADERS
-    for item in ld_formats:
-        if ext in uc2const.FORMAT_EXTENSION[item]:
-            checker = _get_checker(item)
-            if checker and checker(path):
-                loader = _get_loader(item)
-                ret_id = item
-                break
+    loader = None
+    ret_id, confidence = detector.detect(path, ld_formats)
+    if ret_id is not None:
+        loader = _get_loader(ret_id)
 
     if loader is None:
-        msg = 'Loader is not found or not suitable for %s' % path
+        msg = 'Loader is not found by file signature for %s' % path
         events.emit(events.MESSAGES, msgconst.WARNING, msg)
-        msg = 'Start to search loader by file content'
+        msg = 'Start to search for loader by file extension %s' % ext
         events.emit(events.MESSAGES, msgconst.INFO, msg)
 
+        ret_id = None
         for item in ld_formats:
+            if ext not in uc2const.FORMAT_EXTENSION[item]:
+                continue
             checker = _get_checker(item)
-            if checker is not None:
-                if checker(path):
-                    loader = _get_loader(item)
-                    ret_id = item
-                    break
+            if checker and checker(path):
+                loader = _get_loader(item)
+                ret_id, confidence = item, detector.LOW
+                break
 
     if loader is None:
-        msg = 'By file content loader is not found for %s' % path
-        events.emit(events.MESSAGES, msgconst.WARNING, msg)
         msg = 'Try using fallback loader'
         events.emit(events.MESSAGES, msgconst.INFO, msg)
         if fallback_check(path):
             loader = im_loader
+            confidence = detector.LOW
 
     if loader is None:
         msg = 'Loader is not found for %s' % path
         events.emit(events.MESSAGES, msgconst.ERROR, msg)
     else:
         loader_name = loader.__str__().split(' ')[1]
-        msg = 'Loader "%s" is found for %s' % (loader_name, path)
+        msg = 'Loader "%s" is found for %s (confidence %.2f)' % \
+              (loader_name, path, confidence)
         events.emit(events.MESSAGES, msgconst.OK, msg)
 
+    result = (loader,)
     if return_id:
-        return loader, ret_id
-    return loader
+        result += (ret_id,)
+    if return_confidence:
+        result += (confidence,)
+    return result if len(result) > 1 else loader
 
 
 def get_saver_by_id(pid):
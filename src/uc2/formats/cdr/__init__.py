@@ -28,7 +28,7 @@ def cdr_loader(appdata, filename=None, fileptr=None, translate=True, cnf=None,
                **kw):
     cnf = merge_cnf(cnf, kw)
     doc = CDR_Presenter(appdata, cnf)
-    doc.load(filename)
+    doc.load(filename, fileptr)
     if translate:
         sk2_doc = SK2_Presenter(appdata, cnf)
         sk2_doc.doc_file = filename
@@ -16,15 +16,15 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import math
-from copy import deepcopy
 
+from uc2 import libgeom
 from uc2.formats.cdr import cdr_const as const
 from uc2.formats.cdr.cdr_const import CDR6, CDR7, CDR8, CDR9, CDR12, CDR13
 from uc2.formats.cdr.cdr_utils import parse_matrix, parse_size_value, \
     parse_cdr_color
 from uc2.formats.riff.model import RiffList, RiffObject
 from uc2.sk2const import NODE_CUSP, NODE_SMOOTH, NODE_SYMMETRICAL, \
-    CURVE_CLOSED, CURVE_OPENED
+    CURVE_CLOSED
 from uc2.utils import dword2py_int, long2py_float, word2py_int
 
 CDR_RECTANGLE = 1
@@ -129,32 +129,22 @@ def parse_polygon(obj):
     obj.loda.cache_fields.append((offset, 4, 'num of polygon edges'))
 
 
-def parse_curve(obj):
-    data = obj.loda.chunk
-    offset = 108
-
-    for item in obj.loda.data_list:
-        if item[0] == const.DATA_COORDS:
-            offset = item[1] + 8
-
-    obj.paths = []
-    path = []
-    points = []
+def parse_curve_points(data, offset, pointnum):
+    """
+    Reads curve points into packed paths.
+    """
+    paths = libgeom.PackedPaths()
+    path_started = False
+    has_points = False
     point1 = []
     point2 = []
-
-    pointnum = dword2py_int(data[offset:offset + 4])
-    obj.num_of_points = pointnum
-    obj.loda.cache_fields.append((offset, 4, 'num of points'))
-    obj.loda.cache_fields.append((offset + 4, 8 * pointnum, 'curve points'))
-    obj.loda.cache_fields.append(
-        (offset + 4 + pointnum * 8, pointnum, 'point flags'))
+    flags_offset = offset + 4 + pointnum * 8
 
     for i in range(pointnum):
         x = parse_size_value(data[offset + 4 + i * 8:offset + 8 + i * 8])
         y = parse_size_value(data[offset + 8 + i * 8:offset + 12 + i * 8])
 
-        point_type = ord(data[offset + 4 + pointnum * 8 + i])
+        point_type = ord(data[flags_offset + i])
         if point_type & 0x10 == 0 and point_type & 0x20 == 0:
             marker = NODE_CUSP
         if point_type & 0x10 == 0x10:
@@ -163,21 +153,24 @@ def parse_curve(obj):
             marker = NODE_SYMMETRICAL
 
         if point_type & 0x40 == 0 and point_type & 0x80 == 0:
-            if path:
-                path.append(deepcopy(points))
-                path.append(CURVE_OPENED)
-                obj.paths.append(deepcopy(path))
-            path = []
-            points = []
+            paths.start_path([x, y])
+            path_started = True
+            has_points = False
             point1 = []
             point2 = []
-            path.append([x, y])
         if point_type & 0x40 == 0x40 and point_type & 0x80 == 0:
-            points.append([x, y])
+            if path_started:
+                paths.append_point([x, y])
+                has_points = True
             point1 = []
             point2 = []
         if point_type & 0x40 == 0 and point_type & 0x80 == 0x80:
-            points.append(deepcopy([point1, point2, [x, y], marker]))
+            if path_started:
+                if point1 and point2:
+                    paths.append_point([point1, point2, [x, y], marker])
+                else:
+                    paths.append_point([x, y])
+                has_points = True
             point1 = []
             point2 = []
         if point_type & 0x40 == 0x40 and point_type & 0x80 == 0x80:
@@ -186,16 +179,28 @@ def parse_curve(obj):
             else:
                 point1 = [x, y]
         if point_type & 8 == 8:
-            if path and points:
-                path.append(deepcopy(points))
-                path.append(CURVE_CLOSED)
-                obj.paths.append(deepcopy(path))
-                path = []
-                points = []
-    if path:
-        path.append(deepcopy(points))
-        path.append(CURVE_OPENED)
-        obj.paths.append(deepcopy(path))
+            if path_started and has_points:
+                paths.close_path(CURVE_CLOSED)
+                path_started = False
+    return paths
+
+
+def parse_curve(obj):
+    data = obj.loda.chunk
+    offset = 108
+
+    for item in obj.loda.data_list:
+        if item[0] == const.DATA_COORDS:
+            offset = item[1] + 8
+
+    pointnum = dword2py_int(data[offset:offset + 4])
+    obj.num_of_points = pointnum
+    obj.loda.cache_fields.append((offset, 4, 'num of points'))
+    obj.loda.cache_fields.append((offset + 4, 8 * pointnum, 'curve points'))
+    obj.loda.cache_fields.append(
+        (offset + 4 + pointnum * 8, pointnum, 'point flags'))
+    obj.paths = parse_curve_points(data, offset, pointnum)
+
 
 
 def parse_text(obj): pass
@@ -375,12 +380,6 @@ class CdrCurve(CdrGraphObj):
             if item[0] == const.DATA_COORDS:
                 offset = item[1] + 8
 
-        self.paths = []
-        path = []
-        points = []
-        point1 = []
-        point2 = []
-
         pointnum = dword2py_int(data[offset:offset + 4])
         self.num_of_points = pointnum
         self.loda.cache_fields.append((offset, 4, 'num of points'))
@@ -388,53 +387,7 @@ class CdrCurve(CdrGraphObj):
             (offset + 4, 8 * pointnum, 'curve points'))
         self.loda.cache_fields.append(
             (offset + 4 + pointnum * 8, pointnum, 'point flags'))
-
-        for i in range(pointnum):
-            x = parse_size_value(data[offset + 4 + i * 8:offset + 8 + i * 8])
-            y = parse_size_value(data[offset + 8 + i * 8:offset + 12 + i * 8])
-
-            point_type = ord(data[offset + 4 + pointnum * 8 + i])
-            if point_type & 0x10 == 0 and point_type & 0x20 == 0:
-                marker = NODE_CUSP
-            if point_type & 0x10 == 0x10:
-                marker = NODE_SMOOTH
-            if point_type & 0x20 == 0x20:
-                marker = NODE_SYMMETRICAL
-
-            if point_type & 0x40 == 0 and point_type & 0x80 == 0:
-                if path:
-                    path.append(deepcopy(points))
-                    path.append(CURVE_OPENED)
-                    self.paths.append(deepcopy(path))
-                path = []
-                points = []
-                point1 = []
-                point2 = []
-                path.append([x, y])
-            if point_type & 0x40 == 0x40 and point_type & 0x80 == 0:
-                points.append([x, y])
-                point1 = []
-                point2 = []
-            if point_type & 0x40 == 0 and point_type & 0x80 == 0x80:
-                points.append(deepcopy([point1, point2, [x, y], marker]))
-                point1 = []
-                point2 = []
-            if point_type & 0x40 == 0x40 and point_type & 0x80 == 0x80:
-                if point1:
-                    point2 = [x, y]
-                else:
-                    point1 = [x, y]
-            if point_type & 8 == 8:
-                if path and points:
-                    path.append(deepcopy(points))
-                    path.append(CURVE_CLOSED)
-                    self.paths.append(deepcopy(path))
-                    path = []
-                    points = []
-        if path:
-            path.append(deepcopy(points))
-            path.append(CURVE_OPENED)
-            self.paths.append(deepcopy(path))
+        self.paths = parse_curve_points(data, offset, pointnum)
 
     def translate(self, translator):
         translator.create_curve(self)
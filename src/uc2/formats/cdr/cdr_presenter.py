@@ -47,8 +47,8 @@ class CDR_Presenter(BinaryModelPresenter):
         self.model = model.RiffRootList()
         self.model.childs = []
 
-    def load(self, path):
-        BinaryModelPresenter.load(self, path)
+    def load(self, path=None, fileptr=None):
+        BinaryModelPresenter.load(self, path, fileptr)
 
     def traslate_from_sk2(self, sk2_doc):
         pass
@@ -20,6 +20,7 @@ import zipfile
 from uc2.formats.cdrz import const
 from uc2.formats.cdrz.presenter import CDRZ_Presenter
 from uc2.formats.pdxf.presenter import PDXF_Presenter
+from uc2.utils import fsutils
 from uc2.utils.mixutils import merge_cnf
 
 
@@ -42,6 +43,8 @@ def cdrz_saver(cdr_doc, filename, translate=True, cnf=None, **kw):
 
 
 def check_cdrz(path):
+    if fsutils.is_memfile(path):
+        path = path.open()
     if not zipfile.is_zipfile(path):
         return False
 
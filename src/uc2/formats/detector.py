@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Signature based format detection.
+
+File header is read once and matched against table of magic signatures,
+so format modules are not imported and files are not reopened for every
+format checker. Every match has a confidence value: unique magic sequences
+give EXACT, short or generic ones (two-byte ids, plain text commands)
+give LOW.
+"""
+
+import re
+
+from uc2 import _, uc2const, sk2const
+from uc2.utils import fsutils
+
+HEADER_SIZE = 4096
+TEXT_LINES = 20
+
+EXACT = 1.0
+HIGH = 0.8
+LOW = 0.3
+
+# Matching file extension raises candidate rank (but not its confidence)
+EXTENSION_BONUS = 0.25
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+UTF8_BOM = '\xef\xbb\xbf'
+
+XML_PROLOG = re.compile(r'''\s*(?:<\?.*?\?>|<!--.*?-->|
+    <!DOCTYPE[^\[>]*(?:\[.*?\])?\s*>)''', re.DOTALL | re.VERBOSE)
+XML_ROOT = re.compile(r'\s*<([A-Za-z_][\w.:-]*)([^>]*)')
+XML_NS = re.compile(r'''\bxmlns(?::([\w.-]+))?\s*=\s*["']([^"']*)["']''')
+
+
+def _xml_root(header):
+    if header.startswith(UTF8_BOM):
+        header = header[len(UTF8_BOM):]
+    pos = 0
+    while True:
+        match = XML_PROLOG.match(header, pos)
+        if not match:
+            break
+        pos = match.end()
+    match = XML_ROOT.match(header, pos)
+    if not match:
+        return None, {}
+    namespaces = dict(XML_NS.findall(match.group(2)))
+    return match.group(1), namespaces
+
+
+def _text_lines(header):
+    return header.split('\n', TEXT_LINES)[:TEXT_LINES]
+
+
+def _magic(*signatures):
+    return lambda header: header.startswith(signatures)
+
+
+def _riff(*form_types):
+    return lambda header: header[:4] in ('RIFF', 'RIFX') and \
+        header[8:12] in form_types
+
+
+def _text_tag(*tags):
+    return lambda header: any(tag in line for line in _text_lines(header)
+                              for tag in tags)
+
+
+def _check_sk2(header):
+    lines = _text_lines(header)
+    for line, doc_id in zip(lines[:2], (sk2const.SK2DOC_ID,
+                                        sk2const.SK2XML_ID)):
+        if line.startswith(doc_id):
+            version = line[len(doc_id):].strip()
+            if version.isdigit() and int(version) > int(sk2const.SK2VER):
+                raise RuntimeError(_('Newer version of SK2 format is found!'))
+            return True
+    return False
+
+
+def _check_svg(header):
+    name, namespaces = _xml_root(header)
+    if not name:
+        return False
+    prefix, _sep, local_name = name.rpartition(':')
+    if local_name != 'svg':
+        return False
+    namespace = namespaces.get(prefix, SVG_NS if not prefix else '')
+    # Illustrator declares namespace by DTD entity: xmlns="&ns_svg;"
+    if not prefix and namespace.startswith('&'):
+        return True
+    return namespace == SVG_NS
+
+
+def _check_xml(header):
+    return any('<?xml ' in line for line in _text_lines(header))
+
+
+def _check_wmf(header):
+    return header[:2] in ('\x01\x00', '\x02\x00') and \
+        header[4:6] in ('\x00\x01', '\x00\x03')
+
+
+def _check_cgm(header):
+    return len(header) > 1 and \
+        (ord(header[0]) << 8 | ord(header[1])) & 0xffe0 == 0x0020
+
+
+def _check_bmp(header):
+    return header[:2] == 'BM' and header[6:10] == '\x00' * 4
+
+
+def _check_pcx(header):
+    return len(header) > 2 and header[0] == '\x0a' and \
+        header[1] in '\x00\x02\x03\x04\x05' and header[2] == '\x01'
+
+
+def _check_ppm(header):
+    return len(header) > 2 and header[0] == 'P' and header[1] in '123456' \
+        and header[2].isspace()
+
+
+CDR_VERSIONS = ('CDR6', 'CDR7', 'CDR8', 'CDR9', 'CDRA', 'CDRB', 'CDRC', 'CDRD')
+
+# (format id, matcher, confidence)
+SIGNATURES = [
+    (uc2const.SK2, _check_sk2, EXACT),
+    (uc2const.SK1, _magic('##sK1 1'), EXACT),
+    (uc2const.SK, _magic('##Sketch 1 '), EXACT),
+    (uc2const.SKP, _magic('##sK1 palette'), EXACT),
+    (uc2const.CDR, _riff(*CDR_VERSIONS), EXACT),
+    (uc2const.CMX, _riff('CMX1'), EXACT),
+    (uc2const.CCX, _riff('CDRX'), EXACT),
+    (uc2const.XAR, _magic('XARA\xa3\xa3\r\n'), EXACT),
+    (uc2const.WMF, _magic('\xd7\xcd\xc6\x9a'), EXACT),
+    (uc2const.FIG, _magic('#FIG 3'), EXACT),
+    (uc2const.GPL, _magic('GIMP Palette'), EXACT),
+    (uc2const.PNG, _magic('\x89PNG\r\n\x1a\n'), EXACT),
+    (uc2const.GIF, _magic('GIF87a', 'GIF89a'), EXACT),
+    (uc2const.TIF, _magic('II*\x00', 'MM\x00*'), EXACT),
+    (uc2const.PSD, _magic('8BPS'), EXACT),
+    (uc2const.XCF, _magic('gimp xcf'), EXACT),
+    (uc2const.WEBP, _riff('WEBP'), EXACT),
+    (uc2const.JP2, _magic('\x00\x00\x00\x0cjP  \r\n\x87\n',
+                          '\xff\x4f\xff\x51'), EXACT),
+    (uc2const.XPM, _magic('/* XPM */'), EXACT),
+    (uc2const.SVG, _check_svg, HIGH),
+    (uc2const.PES, _magic('#PES', '#PEC'), HIGH),
+    (uc2const.ASE, _magic('ASEF'), HIGH),
+    (uc2const.SCRIBUS_PAL, _text_tag('SCRIBUSCOLORS'), HIGH),
+    (uc2const.SOC, _text_tag('office:color-table', 'ooo:color-table'), HIGH),
+    (uc2const.COREL_PAL, _text_tag('<palette'), HIGH),
+    (uc2const.JPG, _magic('\xff\xd8\xff'), HIGH),
+    (uc2const.BMP, _check_bmp, HIGH),
+    (uc2const.SVGZ, _magic('\x1f\x8b\x08'), LOW),
+    (uc2const.WMF, _check_wmf, LOW),
+    (uc2const.CGM, _check_cgm, LOW),
+    (uc2const.PLT, _magic('IN;'), LOW),
+    (uc2const.DST, _magic('LA:'), LOW),
+    (uc2const.CPL, _magic('\xcd\xdd', '\xdd\xdc', '\xcd\xbc', '\xcd\xdc',
+                          '\xdc\xdc', '\xcc\xdc', '\xcc\xbc'), LOW),
+    (uc2const.ACO, _magic('\x00\x01', '\x00\x02'), LOW),
+    (uc2const.JCW, _magic('JCW'), LOW),
+    (uc2const.PCX, _check_pcx, LOW),
+    (uc2const.PPM, _check_ppm, LOW),
+    (uc2const.XBM, _magic('#define '), LOW),
+    (uc2const.RIFF, _magic('RIFF'), LOW),
+    (uc2const.XML, _check_xml, LOW),
+]
+
+
+def read_header(path, size=HEADER_SIZE):
+    fileptr = fsutils.get_fileptr(path)
+    try:
+        return fileptr.read(size)
+    finally:
+        fileptr.close()
+
+
+def detect(path, formats=None, header=None):
+    """
+    Returns (format id, confidence) pair for the best signature match
+    among formats (all loader formats by default) or (None, 0.0).
+    """
+    if formats is None:
+        formats = uc2const.LOADER_FORMATS
+    formats = set(formats)
+    if header is None:
+        header = read_header(path)
+    ext = fsutils.get_file_extension(path)
+
+    result = (None, 0.0)
+    rank = 0.0
+    for pid, matcher, confidence in SIGNATURES:
+        if pid not in formats or not matcher(header):
+            continue
+        value = confidence
+        if ext in uc2const.FORMAT_EXTENSION[pid]:
+            value += EXTENSION_BONUS
+        if value > rank:
+            result, rank = (pid, confidence), value
+    return result
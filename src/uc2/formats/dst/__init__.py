@@ -50,9 +50,9 @@ def dst_saver(doc, filename=None, fileptr=None, translate=True, cnf=None, **kw):
         dst_doc.save(filename, fileptr)
         dst_doc.close()
     else:
-        doc.save(filename)
+        doc.save(filename, fileptr)
 
-    if dst_doc.config.create_edr_palette:
+    if filename and dst_doc.config.create_edr_palette:
         from uc2.formats.skp import SKP_Presenter
         from uc2.formats.edr_pal import edr_pal_saver
         skp_doc = SKP_Presenter(doc.appdata)
@@ -89,6 +89,8 @@ DEFAULT_COLORS = [
 
 
 def find_palette(filename):
+    if not filename:
+        return None
     name = os.path.splitext(filename)[0]
     for ext in '.edr', '.EDR', '.rgb', '.RGB':
         if os.path.exists(name + ext):
@@ -16,11 +16,10 @@
 # (EDR) Embird color palette
 # NOTE: The .edr format is an optional color file
 
-import os
 from uc2.formats.edr_pal.edr_presenter import EDR_Presenter
 from uc2.formats.sk2.sk2_presenter import SK2_Presenter
 from uc2.formats.skp.skp_presenter import SKP_Presenter
-from uc2.utils.fsutils import get_fileptr
+from uc2.utils.fsutils import get_fileptr, getsize
 from uc2.utils.mixutils import merge_cnf
 
 
@@ -66,7 +65,7 @@ def edr_pal_saver(doc, filename=None, fileptr=None, translate=True,
 
 
 def check_edr_pal(path):
-    file_size = os.path.getsize(path)
+    file_size = getsize(path)
     fileptr = get_fileptr(path)
     magic = fileptr.read(4)
     fileptr.close()
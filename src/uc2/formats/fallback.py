@@ -34,7 +34,10 @@ def im_loader(appdata, filename=None, fileptr=None, translate=True, cnf=None,
     page = sk2_doc.methods.get_page()
 
     image_obj = sk2_model.Pixmap(sk2_doc.config)
-    image_obj.handler.load_from_file(sk2_doc.cms, filename)
+    if fileptr:
+        image_obj.handler.load_from_fileptr(sk2_doc.cms, fileptr)
+    else:
+        image_obj.handler.load_from_file(sk2_doc.cms, filename)
 
     orient = uc2const.PORTRAIT
     w = image_obj.size[0] * uc2const.px_to_pt
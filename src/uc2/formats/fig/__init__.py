@@ -20,7 +20,7 @@ from uc2 import uc2const
 from uc2.formats.sk2.sk2_presenter import SK2_Presenter
 from uc2.formats.fig.fig_presenter import FIG_Presenter
 from uc2.utils.mixutils import merge_cnf
-from uc2.utils.fsutils import get_fileptr
+from uc2.utils.fsutils import get_fileptr, getsize
 
 
 def fig_loader(appdata, filename=None, fileptr=None,
@@ -57,7 +57,7 @@ def fig_saver(sk2_doc, filename=None, fileptr=None,
 
 
 def check_fig(path):
-    file_size = os.path.getsize(path)
+    file_size = getsize(path)
     fileptr = get_fileptr(path)
     magic = '#FIG 3'
 
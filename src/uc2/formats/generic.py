@@ -19,7 +19,7 @@ import logging
 
 from uc2 import _, uc2const
 from uc2 import events, msgconst
-from uc2.utils import fsutils
+from uc2.utils import fsutils, profiler
 
 LOG = logging.getLogger(__name__)
 
@@ -142,15 +142,18 @@ class ModelPresenter(object):
             self.send_error(msg)
             raise IOError(msg)
 
+        profiler.start_stage(profiler.PARSING)
         try:
             self.parsing_msg(0.03)
             self.send_info(_('Parsing in progress...'))
             self.model = self.loader.load(self, filename, fileptr)
         except Exception as e:
+            profiler.end_stage(profiler.PARSING)
             self.close()
             LOG.error('Error loading %s', filename)
             LOG.exception(e)
             raise
+        profiler.end_stage(profiler.PARSING)
 
         model_name = uc2const.FORMAT_NAMES[self.cid]
         self.send_ok(_('<%s> document model is created') % model_name)
@@ -160,6 +163,7 @@ class ModelPresenter(object):
         if self.model is not None:
             self.obj_num = self.model.count() + 1
             self.update_msg(0.0)
+            profiler.start_stage(profiler.UPDATE)
             try:
                 self.model.config = self.config
                 self.model.do_update(self, action)
@@ -167,6 +171,8 @@ class ModelPresenter(object):
                 LOG.error(_('Error updating document model'))
                 LOG.exception(e)
                 raise
+            finally:
+                profiler.end_stage(profiler.UPDATE)
 
             model_name = uc2const.FORMAT_NAMES[self.cid]
             msg = _('<%s> document model is updated successfully') % model_name
@@ -181,15 +187,18 @@ class ModelPresenter(object):
             self.send_error(msg)
             raise IOError(msg)
 
+        profiler.start_stage(profiler.WRITING)
         try:
             self.saving_msg(0.03)
             self.send_info(_('Saving is started...'))
             self.saver.save(self, filename, fileptr)
         except Exception as e:
-            msg = _('Error while saving') + ' ' + filename + ' %s'
+            msg = _('Error while saving') + ' %s %%s' % (filename or '')
             LOG.error(msg)
             LOG.exception(e)
             raise
+        finally:
+            profiler.end_stage(profiler.WRITING)
 
         model_name = uc2const.FORMAT_NAMES[self.cid]
         msg = _('<%s> document model is saved successfully') % model_name
@@ -200,7 +209,9 @@ class ModelPresenter(object):
         filename = self.doc_file
         self.doc_file = ''
         if self.model is not None:
+            profiler.start_stage(profiler.CLOSING)
             self.model.destroy()
+            profiler.end_stage(profiler.CLOSING)
         self.model = None
         filename = filename.encode('utf-8') \
             if isinstance(filename, unicode) else filename
@@ -52,8 +52,12 @@ class AbstractLoader(object):
             self.fileptr = get_fileptr(path)
         elif fileptr:
             self.fileptr = fileptr
-            self.fileptr.seek(-1, 1)
-            self.file_size = self.fileptr.tell()
+            try:
+                self.fileptr.seek(0, 2)
+                self.file_size = self.fileptr.tell()
+            except (IOError, ValueError):
+                # compressed streams cannot seek from the end
+                self.file_size = 0
             self.fileptr.seek(0)
         else:
             msg = _('There is no file for reading')
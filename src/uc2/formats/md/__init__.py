@@ -16,6 +16,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from uc2.formats.md.md_presenter import MdPresenter
+from uc2.utils import fsutils
 from uc2.utils.mixutils import merge_cnf
 
 
@@ -28,8 +29,8 @@ def md_loader(appdata, filename=None, fileptr=None, translate=True, cnf=None,
 
 
 def md_saver(doc, filename=None, fileptr=None, translate=True, cnf=None, **kw):
-    doc.save(filename)
+    doc.save(filename, fileptr)
 
 
 def check_md(path):
-    return ".md" in path
+    return fsutils.get_file_extension(path) == 'md'
@@ -69,6 +69,6 @@ class PDF_Saver(AbstractSaver):
             layers += master_layers
             for layer in layers:
                 if methods.is_layer_visible(layer):
-                    renderer.render(layer.childs, True)
+                    renderer.render_layer(layer)
             renderer.end_page()
         renderer.save()
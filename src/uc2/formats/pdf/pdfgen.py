@@ -19,9 +19,20 @@ import math
 from copy import deepcopy
 from reportlab.lib.colors import CMYKColorSep, Color, CMYKColor
 from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase.pdfdoc import PDFInfo, PDFString, PDFDate, PDFDictionary
+from reportlab.pdfbase.pdfdoc import PDFInfo, PDFString, PDFDate, \
+    PDFDictionary, PDFName, PDFStream, PDFArrayCompact, PDFAxialShading, \
+    PDFRadialShading, PDFObjectReference
 from reportlab.pdfgen.canvas import Canvas, FILL_EVEN_ODD, FILL_NON_ZERO
 
+# Native transparent gradients depend on reportlab internals
+# (_buildColorFunction, canvas._doc, canvas._extgstate and canvas._code)
+# which can change between reportlab versions. If they are not available,
+# transparent gradients are rendered by strips as before.
+try:
+    from reportlab.pdfgen.canvas import _buildColorFunction
+except ImportError:
+    _buildColorFunction = None
+
 from pdfconst import PDF_VERSION_DEFAULT
 from uc2 import _, uc2const, events
 from uc2 import libgeom, libcairo, sk2const
@@ -61,10 +72,12 @@ class PDFGenerator(object):
     use_spot = True
     num_pages = 0
     page_count = 0
+    page_bbox = None
     prgs_msg = _('Saving in progress...')
 
     def __init__(self, fileptr, cms, version=PDF_VERSION_DEFAULT):
         self.cms = cms
+        self.pattern_forms = {}
         self.canvas = Canvas(fileptr, pdfVersion=version[0])
         self.info = UC2PDFInfo(self.canvas._doc)
         self.info.pdfxversion = version[1]
@@ -111,6 +124,8 @@ class PDFGenerator(object):
     def start_page(self, w, h, left_margin=0.0, top_margin=0.0):
         self.canvas.translate(w / 2.0 - left_margin, h / 2.0 - top_margin)
         self.canvas.setPageSize((w, h))
+        self.page_bbox = [left_margin - w / 2.0, top_margin - h / 2.0,
+                          left_margin + w / 2.0, top_margin + h / 2.0]
         position = 0.0
         if self.num_pages:
             position = float(self.page_count) / float(self.num_pages)
@@ -128,6 +143,15 @@ class PDFGenerator(object):
         self.canvas.save()
 
     # --- Rendering
+    def render_layer(self, layer):
+        """
+        Renders layer objects which are visible on current page.
+        """
+        objs = layer.childs
+        if self.page_bbox:
+            objs = layer.get_objects_in_bbox(self.page_bbox)
+        self.render(objs, True)
+
     def render(self, objs, toplevel=False):
         obj_count = 0
         for obj in objs:
@@ -362,13 +386,106 @@ class PDFGenerator(object):
                                        positions, True)
         self.canvas.restoreState()
 
-    def fill_tr_gradient(self, obj, pdfpath, fill_trafo, gradient):
-        grad_type = gradient[0]
+    def get_gradient_bbox(self, obj, fill_trafo):
+        paths = libgeom.apply_trafo_to_paths(obj.paths, obj.trafo)
+        if fill_trafo:
+            inv_trafo = libgeom.invert_trafo(fill_trafo)
+            paths = libgeom.apply_trafo_to_paths(paths, inv_trafo)
+        return libgeom.normalize_bbox(libgeom.get_paths_bbox(paths))
+
+    def get_gradient_shading(self, grad_type, sp, ep, function, colorspace):
         if grad_type == sk2const.GRADIENT_RADIAL:
+            radius = libgeom.distance(sp, ep)
+            return PDFRadialShading(sp[0], sp[1], 0.0, sp[0], sp[1], radius,
+                                    Function=function, ColorSpace=colorspace,
+                                    Extend='[true true]')
+        return PDFAxialShading(sp[0], sp[1], ep[0], ep[1],
+                               Function=function, ColorSpace=colorspace,
+                               Extend='[true true]')
+
+    def set_soft_mask(self, shading, bbox):
+        """
+        Installs luminosity soft mask painted by provided DeviceGray
+        shading. The mask is active till nearest restoreState() call.
+        Raises AttributeError if reportlab internals are changed.
+        """
+        # All internals are looked up before document is changed
+        doc = self.canvas._doc
+        add_shading = doc.addShading
+        states = self.canvas._extgstate._c
+        code = self.canvas._code
+        shading_name = add_shading(shading)
+        shadings = PDFDictionary({
+            shading_name: PDFObjectReference(shading_name)})
+        resources = PDFDictionary({'Shading': shadings})
+        group = PDFDictionary({'Type': PDFName('Group'),
+                               'S': PDFName('Transparency'),
+                               'CS': PDFName('DeviceGray')})
+        form = PDFStream(content='/%s sh' % shading_name)
+        form.dictionary['Type'] = PDFName('XObject')
+        form.dictionary['Subtype'] = PDFName('Form')
+        form.dictionary['FormType'] = 1
+        form.dictionary['BBox'] = PDFArrayCompact(bbox)
+        form.dictionary['Group'] = group
+        form.dictionary['Resources'] = resources
+        smask = PDFDictionary({'Type': PDFName('Mask'),
+                               'S': PDFName('Luminosity'),
+                               'G': doc.Reference(form)})
+        name = 'UC2SMask%d' % len(states)
+        states[('SMask', smask)] = name
+        code.append('/%s gs' % name)
+
+    def fill_tr_gradient(self, obj, pdfpath, fill_trafo, gradient):
+        if _buildColorFunction is not None:
+            try:
+                self.fill_shading_tr_gradient(obj, pdfpath, fill_trafo,
+                                              gradient)
+                return
+            except (AttributeError, ImportError):
+                pass
+        if gradient[0] == sk2const.GRADIENT_RADIAL:
             self.fill_radial_tr_gradient(obj, pdfpath, fill_trafo, gradient)
         else:
             self.fill_linear_tr_gradient(obj, pdfpath, fill_trafo, gradient)
 
+    def fill_shading_tr_gradient(self, obj, pdfpath, fill_trafo, gradient):
+        """
+        Fills path by native PDF shading of opaque stop colors
+        which is masked by DeviceGray shading of stop alpha values.
+        """
+        grad_type = gradient[0]
+        sp, ep = gradient[1]
+        stops = gradient[2]
+        bbox = self.get_gradient_bbox(obj, fill_trafo)
+        colors = []
+        alphas = []
+        positions = []
+        for offset, color in stops:
+            positions.append(offset)
+            alphas.append([color[2]])
+            colors.append(self.get_pdfcolor(color[:2] + [1.0] + color[3:]))
+        alpha_function = _buildColorFunction(alphas, positions)
+        mask = self.get_gradient_shading(grad_type, sp, ep,
+                                         alpha_function, 'DeviceGray')
+
+        self.canvas.saveState()
+        try:
+            self.canvas.clipPath(pdfpath, 0, 0)
+            if fill_trafo:
+                self.canvas.transform(*fill_trafo)
+            self.set_soft_mask(mask, bbox)
+            if grad_type == sk2const.GRADIENT_RADIAL:
+                radius = libgeom.distance(sp, ep)
+                self.canvas.radialGradient(sp[0], sp[1], radius, colors,
+                                           positions, True)
+            else:
+                x0, y0 = sp
+                x1, y1 = ep
+                self.canvas.linearGradient(x0, y0, x1, y1, colors,
+                                           positions, True)
+        finally:
+            self.canvas.restoreState()
+
     def get_grcolor_at_point(self, stops, point=0.0):
         if not point:
             return self.get_pdfcolor(stops[0][1])
@@ -525,6 +642,29 @@ class PDFGenerator(object):
         self.draw_pixmap_obj(obj)
         self.canvas.restoreState()
 
+    def get_pattern_form(self, obj, pattern):
+        """
+        Registers pattern bitmap as a form XObject and returns
+        (name, width, height) tuple. Every distinct pattern bitmap
+        is decoded and embedded into document only once.
+        """
+        duotone = ''
+        if pattern[0] == sk2const.PATTERN_IMG and len(pattern) > 2:
+            duotone = repr(pattern[2])
+        key = (pattern[0], pattern[1], duotone)
+        if key not in self.pattern_forms:
+            image_obj = sk2_model.Pixmap(obj.config)
+            image_obj.handler.load_from_b64str(self.cms, pattern[1])
+            if duotone:
+                image_obj.style[3] = deepcopy(pattern[2])
+            w, h = image_obj.get_size()
+            name = 'UC2Pattern%d' % len(self.pattern_forms)
+            self.canvas.beginForm(name, 0, 0, w, h)
+            self.draw_pixmap_obj(image_obj)
+            self.canvas.endForm()
+            self.pattern_forms[key] = (name, w, h)
+        return self.pattern_forms[key]
+
     def fill_pattern(self, obj, pdfpath, fill_trafo, pattern):
         if not fill_trafo:
             fill_trafo = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
@@ -536,23 +676,19 @@ class PDFGenerator(object):
         bbox = libgeom.get_paths_bbox(paths)
         cv_trafo = libgeom.multiply_trafo(pattern[3], fill_trafo)
 
-        image_obj = sk2_model.Pixmap(obj.config)
-        image_obj.handler.load_from_b64str(self.cms, pattern[1])
-        if pattern[0] == sk2const.PATTERN_IMG and len(pattern) > 2:
-            image_obj.style[3] = deepcopy(pattern[2])
+        name, w, h = self.get_pattern_form(obj, pattern)
 
         self.canvas.saveState()
         self.canvas.clipPath(pdfpath, 0, 0)
         self.canvas.transform(*cv_trafo)
 
-        w, h = image_obj.get_size()
         x = bbox[0]
         y = bbox[3]
         while y > bbox[1] - h:
             while x < bbox[2]:
                 self.canvas.saveState()
                 self.canvas.transform(1.0, 0.0, 0.0, 1.0, x, y)
-                self.draw_pixmap_obj(image_obj)
+                self.canvas.doForm(name)
                 self.canvas.restoreState()
                 x += w
             y -= h
@@ -20,6 +20,7 @@ import zipfile
 from uc2.formats.pdxf import const
 from uc2.formats.pdxf import model
 from uc2.formats.pdxf.presenter import PDXF_Presenter
+from uc2.utils import fsutils
 from uc2.utils.mixutils import merge_cnf
 
 PDXF_HEADER = (b'\x50\x4b\x03\x04\x14\x00\x00\x00')
@@ -37,6 +38,8 @@ def pdxf_saver(pdxf_doc, filename, translate=True, cnf=None, **kw):
 
 
 def check_pdxf(path):
+    if fsutils.is_memfile(path):
+        path = path.open()
     if not zipfile.is_zipfile(path):
         return False
 
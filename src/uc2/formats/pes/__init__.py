@@ -15,10 +15,8 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import os
-
 from uc2.formats.pes.pes_const import PES_SIGNATURE, PEC_SIGNATURE
-from uc2.utils.fsutils import get_fileptr
+from uc2.utils.fsutils import get_fileptr, getsize
 from uc2.utils.mixutils import merge_cnf
 
 
@@ -47,11 +45,11 @@ def pes_saver(doc, filename=None, fileptr=None, translate=True, cnf=None, **kw):
         pes_doc.save(filename, fileptr)
         pes_doc.close()
     else:
-        doc.save(filename)
+        doc.save(filename, fileptr)
 
 
 def check_pes(path):
-    file_size = os.path.getsize(path)
+    file_size = getsize(path)
     fileptr = get_fileptr(path)
 
     if file_size > 4:
@@ -15,11 +15,9 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import os
-
 from uc2.formats.plt.plt_presenter import PltPresenter
 from uc2.formats.sk2.sk2_presenter import SK2_Presenter
-from uc2.utils.fsutils import get_fileptr
+from uc2.utils.fsutils import get_fileptr, getsize
 from uc2.utils.mixutils import merge_cnf
 
 
@@ -45,11 +43,11 @@ def plt_saver(doc, filename=None, fileptr=None, translate=True, cnf=None, **kw):
         plt_doc.save(filename, fileptr)
         plt_doc.close()
     else:
-        doc.save(filename)
+        doc.save(filename, fileptr)
 
 
 def check_plt(path):
-    file_size = os.path.getsize(path)
+    file_size = getsize(path)
     fileptr = get_fileptr(path)
 
     if file_size > 20:
@@ -24,5 +24,6 @@ class PLT_Config(XmlConfigParser):
     plt_tolerance = 0.1
     plt_force_zero = True
     plt_optimize = True
+    plt_optimize_travel = False
     plt_rounding_level = 1
     plt_scale = 1.0
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Pen-up travel optimization for plotter jobs.
+
+Paths are flattened paths in PLT coordinates. Optimizer reorders paths,
+chooses start point of closed paths (closed path is entered and left
+in the same point, so its direction is kept) and direction of open paths.
+
+Tour is built by nearest neighbor search on kd-tree of path entry
+points and improved by 2-opt moves limited by window of neighboring
+positions, so both steps scale to hundred thousands of paths
+including clustered ones.
+"""
+
+import math
+
+from uc2 import sk2const
+
+# Number of closed path vertices placed into tree
+CLOSED_SAMPLES = 8
+# Maximal number of entries in kd-tree leaf
+LEAF_SIZE = 8
+TWO_OPT_WINDOW = 25
+TWO_OPT_PASSES = 3
+
+
+def _is_closed(path):
+    return path[2] == sk2const.CURVE_CLOSED and path[1][-1] == path[0]
+
+
+def _vertices(path):
+    return [path[0]] + path[1][:-1]
+
+
+def get_travel_distance(paths, origin=(0.0, 0.0)):
+    """
+    Returns total pen-up distance of paths sequence started from origin.
+    """
+    x, y = origin
+    ret = 0.0
+    for path in paths:
+        ret += math.hypot(path[0][0] - x, path[0][1] - y)
+        x, y = path[1][-1] if path[1] else path[0]
+    return ret
+
+
+class _KDTree(object):
+    """
+    Static 2d-tree of (path index, vertex index) entries with removal.
+    Tree is split by medians, so it adapts to clustered points.
+    Every node keeps number of alive entries to skip emptied subtrees.
+
+    Node is a list [x0, y0, x1, y1, alive count, parent, left, right,
+    first, last]; leaf nodes have no childs and refer to entries range
+    order[first:last].
+    """
+
+    def __init__(self, entries, points):
+        self.entries = entries
+        self.xs = [p[0] for p in points]
+        self.ys = [p[1] for p in points]
+        self.alive = [True] * len(points)
+        self.order = range(len(points))
+        self.leaf_of = [None] * len(points)
+        self.path_entries = {}
+        for pos, entry in enumerate(entries):
+            self.path_entries.setdefault(entry[0], []).append(pos)
+        self.root = self._build(0, len(points), None) if points else None
+
+    def _build(self, first, last, parent):
+        order = self.order
+        xs = [self.xs[pos] for pos in order[first:last]]
+        ys = [self.ys[pos] for pos in order[first:last]]
+        node = [min(xs), min(ys), max(xs), max(ys), last - first, parent,
+                None, None, first, last]
+        if last - first <= LEAF_SIZE:
+            for pos in order[first:last]:
+                self.leaf_of[pos] = node
+            return node
+        coords = self.xs if node[2] - node[0] >= node[3] - node[1] \
+            else self.ys
+        order[first:last] = sorted(order[first:last], key=coords.__getitem__)
+        middle = (first + last) // 2
+        node[6] = self._build(first, middle, node)
+        node[7] = self._build(middle, last, node)
+        return node
+
+    def remove_path(self, index):
+        for pos in self.path_entries.pop(index):
+            if self.alive[pos]:
+                self.alive[pos] = False
+                node = self.leaf_of[pos]
+                while node is not None:
+                    node[4] -= 1
+                    node = node[5]
+
+    def nearest(self, point):
+        """
+        Returns nearest alive entry or None if all entries are removed.
+        """
+        if self.root is None or not self.root[4]:
+            return None
+        x, y = point
+        xs, ys, alive, order = self.xs, self.ys, self.alive, self.order
+        best, best_dist = None, None
+        # stack of (squared distance to node box, node)
+        stack = [(0.0, self.root)]
+        while stack:
+            node_dist, node = stack.pop()
+            if best is not None and node_dist >= best_dist:
+                continue
+            if node[6] is None:
+                for pos in order[node[8]:node[9]]:
+                    if alive[pos]:
+                        dist = (xs[pos] - x) ** 2 + (ys[pos] - y) ** 2
+                        if best is None or dist < best_dist:
+                            best, best_dist = pos, dist
+                continue
+            childs = []
+            for child in node[6:8]:
+                if child[4]:
+                    dx = max(child[0] - x, 0.0, x - child[2])
+                    dy = max(child[1] - y, 0.0, y - child[3])
+                    dist = dx * dx + dy * dy
+                    if best is None or dist < best_dist:
+                        childs.append((dist, child))
+            # nearer child is pushed last to be checked first
+            if len(childs) == 2 and childs[0][0] < childs[1][0]:
+                childs.reverse()
+            stack += childs
+        return self.entries[best]
+
+
+def _dist(p0, p1):
+    return math.hypot(p0[0] - p1[0], p0[1] - p1[1])
+
+
+def _nearest_vertex(vertices, x, y):
+    dists = [(px - x) ** 2 + (py - y) ** 2 for px, py in vertices]
+    return dists.index(min(dists))
+
+
+def optimize_travel(paths, origin=(0.0, 0.0), window=TWO_OPT_WINDOW,
+                    passes=TWO_OPT_PASSES):
+    """
+    Returns reordered paths with minimized pen-up travel. Open paths
+    can be reversed, closed paths can start from any vertex.
+    Source paths are not changed.
+    """
+    if not paths:
+        return []
+
+    # --- Tree of entry points
+    closed = [_is_closed(path) for path in paths]
+    vertices = []
+    entries = []
+    points = []
+    for index, path in enumerate(paths):
+        if closed[index]:
+            verts = _vertices(path)
+            step = max(1, len(verts) // CLOSED_SAMPLES)
+            for vertex in range(0, len(verts), step):
+                entries.append((index, vertex))
+                points.append(verts[vertex])
+        else:
+            verts = [path[0], path[1][-1]]
+            entries += [(index, 0), (index, 1)]
+            points += verts
+        vertices.append(verts)
+    tree = _KDTree(entries, points)
+
+    # --- Nearest neighbor tour
+    # Position 0 is origin, position k is order[k - 1] path
+    order = []
+    ins = [tuple(origin)]
+    outs = [tuple(origin)]
+    x, y = origin
+    entry = tree.nearest((x, y))
+    while entry is not None:
+        index, vertex = entry
+        verts = vertices[index]
+        if closed[index]:
+            vertex = _nearest_vertex(verts, x, y)
+            exit_vertex = vertex
+        else:
+            exit_vertex = 1 - vertex
+        tree.remove_path(index)
+        order.append(index)
+        ins.append(tuple(verts[vertex]))
+        x, y = verts[exit_vertex]
+        outs.append((x, y))
+        entry = tree.nearest((x, y))
+
+    # --- Windowed 2-opt
+    # Reversing positions i+1..j swaps entry and exit points of paths
+    hypot = math.hypot
+    size = len(ins)
+    for _pass in range(passes):
+        improved = False
+        for i in range(size - 1):
+            ax, ay = outs[i]
+            bx, by = ins[i + 1]
+            d_ab = hypot(ax - bx, ay - by)
+            for j in range(i + 1, min(i + 1 + window, size)):
+                cx, cy = outs[j]
+                if j + 1 < size:
+                    dx, dy = ins[j + 1]
+                    delta = hypot(ax - cx, ay - cy) + hypot(bx - dx, by - dy) \
+                        - d_ab - hypot(cx - dx, cy - dy)
+                else:
+                    delta = hypot(ax - cx, ay - cy) - d_ab
+                if delta < -1e-9:
+                    ins[i + 1:j + 1], outs[i + 1:j + 1] = \
+                        outs[i + 1:j + 1][::-1], ins[i + 1:j + 1][::-1]
+                    order[i:j] = order[i:j][::-1]
+                    bx, by = ins[i + 1]
+                    d_ab = hypot(ax - bx, ay - by)
+                    improved = True
+        if not improved:
+            break
+
+    # --- Start vertices of closed paths for final neighbors
+    ret = []
+    for pos, index in enumerate(order):
+        path = paths[index]
+        verts = vertices[index]
+        prev_point = outs[pos]
+        if closed[index]:
+            if pos + 2 < size:
+                next_point = ins[pos + 2]
+                costs = [_dist(prev_point, v) + _dist(v, next_point)
+                         for v in verts]
+                vertex = costs.index(min(costs))
+            else:
+                vertex = _nearest_vertex(verts, *prev_point)
+            outs[pos + 1] = ins[pos + 1] = tuple(verts[vertex])
+            verts = verts[vertex:] + verts[:vertex]
+            ret.append([[] + verts[0], [[] + p for p in verts[1:]] +
+                        [[] + verts[0]], path[2]])
+        elif tuple(verts[0]) == ins[pos + 1]:
+            ret.append(path)
+        else:
+            points = [path[0]] + path[1]
+            points.reverse()
+            ret.append([[] + points[0], [[] + p for p in points[1:]],
+                        path[2]])
+    return ret
@@ -15,14 +15,18 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import logging
 from copy import deepcopy
 
-from uc2 import _, events
+from uc2 import _, events, msgconst
 from uc2 import libgeom
-from uc2.formats.plt import plt_model
-from uc2.formats.plt.plt_const import SK2_to_PLT_TRAFO, PLT_to_SK2_TRAFO
+from uc2.formats.plt import plt_model, plt_optimizer
+from uc2.formats.plt.plt_const import SK2_to_PLT_TRAFO, PLT_to_SK2_TRAFO, \
+    mm_to_plt
 from uc2.formats.sk2 import sk2_model
 
+LOG = logging.getLogger(__name__)
+
 
 class PLT_to_SK2_Translator(object):
     def translate(self, plt_doc, sk2_doc):
@@ -91,6 +95,7 @@ class SK2_to_PLT_Translator(object):
                      m22 * self.plt_doc.config.plt_scale,
                      dx, dy]
 
+            job_paths = []
             obj_num = len(self.obj_stack)
             for obj in self.obj_stack:
 
@@ -126,4 +131,26 @@ class SK2_to_PLT_Translator(object):
                         path[1] = points
 
                     if path and path[1]:
-                        self.jobs.append(plt_model.PltJob('', path))
+                        job_paths.append(path)
+
+            if self.plt_doc.config.plt_optimize_travel:
+                job_paths = self.optimize_travel(job_paths)
+            for path in job_paths:
+                self.jobs.append(plt_model.PltJob('', path))
+
+    def optimize_travel(self, paths):
+        """
+        Returns reordered paths if pen-up travel is reduced,
+        otherwise paths are kept in document order.
+        """
+        before = plt_optimizer.get_travel_distance(paths)
+        new_paths = plt_optimizer.optimize_travel(paths)
+        after = plt_optimizer.get_travel_distance(new_paths)
+        if after >= before:
+            LOG.info('Pen-up travel is not reduced, document order is kept')
+            return paths
+        msg = _('Pen-up travel is reduced from %.0f mm to %.0f mm') % \
+            (before / mm_to_plt, after / mm_to_plt)
+        LOG.info(msg)
+        events.emit(events.MESSAGES, msgconst.INFO, msg)
+        return new_paths
@@ -18,11 +18,14 @@
 import cairo
 
 from uc2.formats.fallback import im_loader
+from uc2.formats.png.png_writer import PNGWriter
 from uc2.formats.sk2.crenderer import CairoRenderer
+from uc2.libcairo import get_png_scanlines
 from uc2.utils.fsutils import get_fileptr
 from uc2.utils.mixutils import merge_cnf
 
 PNG_ID = '\x89\x50\x4e\x47'
+PNG_BAND_SIZE = 16 * 1024 * 1024
 
 
 def png_loader(appdata, filename=None, fileptr=None, translate=True, cnf=None, **kw):
@@ -38,20 +41,37 @@ def png_saver(sk2_doc, filename=None, fileptr=None, translate=True, cnf=None, **
     w, h = [scale * item for item in page.page_format[1]]
     trafo = (scale, 0, 0, -scale, w / 2.0, h / 2.0)
 
-    canvas_matrix = cairo.Matrix(*trafo)
-    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, int(w), int(h))
-    ctx = cairo.Context(surface)
-    ctx.set_matrix(canvas_matrix)
+    width, height = int(w), int(h)
+    # Page is rendered by horizontal bands so peak memory
+    # does not depend on page size and image scale
+    band_height = max(1, min(height, PNG_BAND_SIZE // (4 * width or 1)))
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, band_height)
 
     antialias_flag = not cnf.get('image_antialiasing') in (False, 0)
     layers = sk2_doc.methods.get_visible_layers(page)
     rend = CairoRenderer(sk2_doc.cms)
+    writer = PNGWriter(fileptr, width, height)
 
-    for item in layers:
-        rend.antialias_flag = not any([not item.properties[3], not antialias_flag])
-        rend.render(ctx, item.childs)
+    y = 0
+    while y < height:
+        rows = min(band_height, height - y)
+        if rows < band_height:
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, rows)
+        ctx = cairo.Context(surface)
+        if y:
+            ctx.set_operator(cairo.OPERATOR_CLEAR)
+            ctx.paint()
+            ctx.set_operator(cairo.OPERATOR_OVER)
+        band_trafo = trafo[:5] + (trafo[5] - y,)
+        ctx.set_matrix(cairo.Matrix(*band_trafo))
+        for item in layers:
+            rend.antialias_flag = not any([not item.properties[3],
+                                           not antialias_flag])
+            rend.render_layer(ctx, item)
+        writer.write_scanlines(get_png_scanlines(surface))
+        y += rows
 
-    surface.write_to_png(fileptr)
+    writer.close()
     fileptr.close()
 
 
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import struct
+import zlib
+
+PNG_SIGNATURE = '\x89PNG\r\n\x1a\n'
+
+BIT_DEPTH = 8
+COLOR_TYPE_RGBA = 6
+IDAT_SIZE = 8192
+
+
+class PNGWriter(object):
+    """
+    Streaming encoder of 8-bit RGBA PNG images.
+    Scanlines are compressed and written as soon as they are added,
+    so image is never kept in memory as a whole. Compressed data is
+    split into IDAT chunks of fixed size, so the file does not depend
+    on the number of scanlines added at once.
+    """
+    fileptr = None
+    width = 0
+    height = 0
+    rows = 0
+    compressor = None
+    buf = ''
+
+    def __init__(self, fileptr, width, height, level=6):
+        self.fileptr = fileptr
+        self.width = width
+        self.height = height
+        self.compressor = zlib.compressobj(level)
+        self.fileptr.write(PNG_SIGNATURE)
+        self.write_chunk('IHDR', struct.pack('>IIBBBBB', width, height,
+                                             BIT_DEPTH, COLOR_TYPE_RGBA,
+                                             0, 0, 0))
+
+    def write_chunk(self, tag, data):
+        self.fileptr.write(struct.pack('>I', len(data)))
+        self.fileptr.write(tag)
+        self.fileptr.write(data)
+        crc = zlib.crc32(data, zlib.crc32(tag)) & 0xffffffff
+        self.fileptr.write(struct.pack('>I', crc))
+
+    def write_scanlines(self, data):
+        """
+        Adds filtered scanlines, i.e. every row is prefixed
+        by filter type byte.
+        """
+        self.rows += len(data) // (self.width * 4 + 1)
+        if self.rows > self.height:
+            raise ValueError('Too many scanlines for PNG image')
+        self.write_data(self.compressor.compress(data))
+
+    def write_data(self, data, last=False):
+        self.buf += data
+        size = len(self.buf) if last else IDAT_SIZE
+        while self.buf and len(self.buf) >= size:
+            self.write_chunk('IDAT', self.buf[:size])
+            self.buf = self.buf[size:]
+
+    def close(self):
+        if self.rows != self.height:
+            raise ValueError('Incomplete PNG image: %d of %d scanlines'
+                             % (self.rows, self.height))
+        self.write_data(self.compressor.flush(), True)
+        self.write_chunk('IEND', '')
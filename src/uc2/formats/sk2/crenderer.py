@@ -114,6 +114,12 @@ class CairoRenderer:
             for obj in objs:
                 self.render_object(ctx, obj)
 
+    def render_layer(self, ctx, layer):
+        """
+        Renders layer objects which are visible in context clip area.
+        """
+        self.render(ctx, layer.get_objects_in_bbox(ctx.clip_extents()))
+
     def render_object(self, ctx, obj):
         if obj.is_primitive:
             self.render_primitives(ctx, obj)
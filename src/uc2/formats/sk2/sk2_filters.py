@@ -17,9 +17,9 @@
 
 import logging
 
-from uc2 import libimg, sk2const
+from uc2 import libgeom, libimg, sk2const
 from uc2.formats.generic_filters import AbstractLoader, AbstractSaver
-from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2 import sk2_model, sk2_parser
 from uc2.formats.sk2.crenderer import CairoRenderer
 
 LOG = logging.getLogger(__name__)
@@ -49,10 +49,10 @@ class SK2_Loader(AbstractLoader):
 
             if self.line:
                 try:
-                    code = compile('self.' + self.line, '<string>', 'exec')
-                    exec code
-                except Exception as e:
-                    msg = 'Parsing error in "%s"', self.line
+                    cmd, args = sk2_parser.parse_line(self.line)
+                    getattr(self, cmd)(*args)
+                except Exception:
+                    msg = 'Parsing error in "%s"' % self.line
                     self.send_error(msg)
                     raise
 
@@ -83,6 +83,8 @@ class SK2_Loader(AbstractLoader):
                 return
             elif item in ('size', 'colorspace'):
                 return
+        elif obj.is_curve and item == 'paths':
+            val = libgeom.pack_paths(val)
         obj.__dict__[item] = val
 
     def end(self):
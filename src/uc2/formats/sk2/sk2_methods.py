@@ -382,6 +382,8 @@ class SK2_Methods:
         for obj in objs:
             if obj.is_selectable:
                 bbox = libgeom.sum_bbox(bbox, obj.cache_bbox)
+            elif obj.is_layer:
+                bbox = libgeom.sum_bbox(bbox, obj.get_bbox())
             elif obj.childs:
                 bbox = libgeom.sum_bbox(bbox, self.count_bbox(obj.childs))
         return bbox
@@ -51,6 +51,8 @@ class DocumentObject(TextModelObject):
     is_container = False
     is_selectable = False
 
+    cache_state = None
+
     def get_class_name(self):
         return CID_TO_NAME[self.cid]
 
@@ -86,6 +88,45 @@ class DocumentObject(TextModelObject):
     def is_closed(self):
         return False
 
+    def get_state(self):
+        """
+        Returns snapshot of object fields and childs list. Field values
+        are copied, so in-place changes of trafo, style or paths lists
+        are detected as well.
+        """
+        return [(key, deepcopy(value))
+                for key, value in self.__dict__.iteritems()
+                if key not in GENERIC_FIELDS
+                and not key.startswith('cache')] + self.childs
+
+    def set_dirty(self):
+        """
+        Forces recalculation of object caches on next model update.
+        Should be called after changes which are not stored in object
+        fields (e.g. pixmap images kept by handler).
+        """
+        self.cache_state = None
+
+    def do_update(self, presenter=None, action=False):
+        """
+        Updates only objects which are changed since previous model
+        update (field values are changed, childs list is modified or
+        set_dirty() is called) and parents of changed objects.
+        Returns True if object is updated.
+        """
+        changed = False
+        for child in self.childs:
+            child.parent = self
+            child.config = self.config
+            changed = child.do_update(presenter, action) or changed
+        if changed or action or self.cache_state != self.get_state():
+            self.update()
+            if action:
+                self.update_for_sword()
+            self.cache_state = self.get_state()
+            return True
+        return False
+
 
 class Document(DocumentObject):
     """
@@ -237,6 +278,11 @@ class Layer(StructuralObject):
     name = ''
     is_layer = True
 
+    cache_bbox = []
+    cache_index = None
+    cache_index_state = None
+    cache_unindexed = []
+
     def __init__(self, config, parent=None, name=''):
         self.cid = LAYER
         self.childs = []
@@ -271,6 +317,61 @@ class Layer(StructuralObject):
             stroke[2] = [uc2const.COLOR_RGB, self.color[:3], self.color[3], '']
         if len(self.properties) == 3:
             self.properties += [1, ]
+        self.update_index()
+
+    def update_index(self):
+        """
+        Builds spatial index of layer objects by their visual bboxes.
+        Index values are positions of objects in childs list. Objects
+        without bbox are not indexed and always returned
+        by get_objects_in_bbox().
+        """
+        items = []
+        self.cache_unindexed = []
+        self.cache_bbox = []
+        for index, child in enumerate(self.childs):
+            bbox = child.get_visual_bbox() if child.is_selectable else []
+            if bbox:
+                items.append((bbox, index))
+                self.cache_bbox = libgeom.sum_bbox(self.cache_bbox,
+                                                   child.cache_bbox)
+            else:
+                self.cache_unindexed.append(index)
+        self.cache_index = libgeom.BBoxIndex(items)
+        self.cache_index_state = self.get_index_state()
+
+    def get_index_state(self):
+        return self.childs + [child.cache_bbox for child in self.childs
+                              if child.is_selectable]
+
+    def get_index(self):
+        """
+        Returns layer index. Index is rebuilt if objects are added,
+        removed or transformed after layer update.
+        """
+        state = self.get_index_state()
+        if self.cache_index is None or \
+                len(state) != len(self.cache_index_state) or \
+                any(a is not b for a, b in zip(state, self.cache_index_state)):
+            self.update_index()
+        return self.cache_index
+
+    def get_objects_in_bbox(self, bbox):
+        """
+        Returns layer objects which visual bboxes overlap provided bbox.
+        Objects order is preserved.
+        """
+        indexes = self.get_index().query(bbox)
+        if self.cache_unindexed:
+            indexes = sorted(indexes + self.cache_unindexed)
+        return [self.childs[index] for index in indexes]
+
+    def get_bbox(self):
+        """
+        Returns bbox of layer objects (empty list for empty layer).
+        """
+        self.get_index()
+        return [] + self.cache_bbox
 
 
 class GuideLayer(Layer):
@@ -402,6 +503,12 @@ class SelectableObject(DocumentObject):
 
     def to_curve(self): return None
 
+    def get_visual_bbox(self):
+        """
+        Returns bbox of object as it is rendered (including stroke).
+        """
+        return self.cache_bbox
+
 
 # ---------------Compound objects---------------------
 class Group(SelectableObject):
@@ -434,6 +541,12 @@ class Group(SelectableObject):
                 self.cache_bbox = libgeom.sum_bbox(self.cache_bbox,
                                                    child.cache_bbox)
 
+    def get_visual_bbox(self):
+        bbox = []
+        for child in self.childs:
+            bbox = libgeom.sum_bbox(bbox, child.get_visual_bbox())
+        return bbox
+
     def update(self):
         self.update_bbox()
 
@@ -506,6 +619,9 @@ class Container(Group):
         self.cache_container = self.childs[0]
         self.cache_bbox = deepcopy(self.cache_container.cache_bbox)
 
+    def get_visual_bbox(self):
+        return self.childs[0].get_visual_bbox() if self.childs else []
+
 
 class PrimitiveObject(SelectableObject):
     """
@@ -547,6 +663,7 @@ class PrimitiveObject(SelectableObject):
         return curve
 
     def update(self):
+        self.cache_state = None
         self.cache_pattern_img = None
         self.cache_ps_pattern_img = None
         self.cache_gray_pattern_img = None
@@ -583,6 +700,25 @@ class PrimitiveObject(SelectableObject):
     def update_bbox(self):
         self.cache_bbox = libgeom.get_cpath_bbox(self.cache_cpath)
 
+    def get_visual_bbox(self):
+        stroke = self.style[1]
+        if not self.cache_bbox or not stroke or not self.cache_line_width:
+            return self.cache_bbox
+        # square caps and bevel joins extend stroke up to sqrt(2)*width/2,
+        # miter joins up to miterlimit*width/2
+        coef = math.sqrt(2.0)
+        if stroke[5] == sk2const.JOIN_MITER:
+            coef = max(coef, stroke[6])
+        width = abs(self.cache_line_width) * coef
+        if stroke[0] != sk2const.STROKE_MIDDLE:
+            width *= 2.0
+        bbox = libgeom.enlarge_bbox(self.cache_bbox, width, width)
+        for pair in self.cache_arrows or []:
+            for item in pair:
+                if item:
+                    bbox = libgeom.sum_bbox(bbox, libgeom.get_cpath_bbox(item))
+        return bbox
+
     def apply_trafo(self, trafo):
         self.cache_cpath = libgeom.apply_trafo(self.cache_cpath, trafo)
         self.trafo = libgeom.multiply_trafo(self.trafo, trafo)
@@ -827,6 +963,9 @@ class Curve(PrimitiveObject):
 
     Curve affine transformation is stored and collected separately,
     i.e. curve points are not modified to avoid accurancy lost.
+
+    Paths are kept packed (libgeom.PackedPaths), so modified paths
+    should be reassigned to curve.
     """
 
     cid = CURVE
@@ -840,24 +979,23 @@ class Curve(PrimitiveObject):
         self.cid = CURVE
         self.config = config
         self.parent = parent
-        self.paths = paths
+        self.paths = libgeom.pack_paths(paths)
         self.trafo = trafo
         self.style = style
 
     def get_initial_paths(self):
         return self.paths
 
+    def get_end_markers(self):
+        if libgeom.is_packed(self.paths):
+            return self.paths.closed
+        return [path[2] for path in self.paths]
+
     def is_closed(self):
-        for path in self.paths:
-            if path[2] == sk2const.CURVE_CLOSED:
-                return True
-        return False
+        return sk2const.CURVE_CLOSED in self.get_end_markers()
 
     def is_closed_all(self):
-        for path in self.paths:
-            if path[2] == sk2const.CURVE_OPENED:
-                return False
-        return True
+        return sk2const.CURVE_OPENED not in self.get_end_markers()
 
     def to_curve(self):
         return self
@@ -1055,6 +1193,7 @@ class Text(PrimitiveObject):
         return ret
 
     def update(self):
+        self.cache_state = None
         self.cache_cpath = self.get_glyphs()
         index = 0
         for item in self.cache_cpath:
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+SK2 document lines parser.
+
+SK2 document body is a sequence of obj('tag'), set('field',value) and end()
+lines, where value is a Python literal. The module parses such lines without
+compile/exec calls so untrusted documents cannot run any code on loading.
+"""
+
+import json
+import marshal
+import re
+
+OBJ = 'obj'
+SET = 'set'
+END = 'end'
+
+# Nested lists of numbers (paths, trafos, colors) are valid JSON documents
+# and are decoded by C accelerated json module
+JSON_CHARS = '[]0123456789,.eE+- '
+JSON_DECODER = json.JSONDecoder()
+
+SIMPLE_STRING = re.compile(r"^'([^'\\]*)'$")
+
+# Styles and other mixed literals are usually repeated many times
+# in a document, so parsed values are memoized in marshalled form
+# to return independent copies for every object
+LITERAL_CACHE = {}
+LITERAL_CACHE_SIZE = 1024
+LITERAL_CACHE_MAX_LEN = 2048
+
+TOKENS = re.compile(r'''\s*(?:
+    ([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?[lL]?)|
+    ([\[\](){},:])|
+    ([uUbB]?(?:'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"))|
+    ([A-Za-z_]\w*)|
+    (\S)
+    )''', re.VERBOSE | re.DOTALL)
+
+NAMES = {'None': None, 'True': True, 'False': False}
+CLOSING = {'[': ']', '(': ')', '{': '}'}
+
+SET_LINE = re.compile(r'''^set\((['"])(\w+)\1\s*,(.*)\)\s*$''', re.DOTALL)
+OBJ_LINE = re.compile(r'''^obj\((['"])(\w+)\1\)\s*$''')
+END_LINE = re.compile(r'^end\(\)\s*$')
+
+
+class SK2ParsingError(ValueError):
+    pass
+
+
+def _decode_string(token):
+    prefix = token[0]
+    if prefix in 'uUbB':
+        token = token[1:]
+    value = token[1:-1]
+    if prefix in 'uU':
+        return value.decode('unicode_escape')
+    if '\\' in value:
+        return value.decode('string_escape')
+    return value
+
+
+def _decode_number(token):
+    if token[-1] in 'lL':
+        return long(token[:-1])
+    if '.' in token or 'e' in token or 'E' in token:
+        return float(token)
+    return int(token)
+
+
+def _close_frame(frame):
+    opening, items, has_comma = frame[0], frame[1], frame[3]
+    if opening == '[':
+        return items
+    elif opening == '(':
+        if len(items) == 1 and not has_comma:
+            return items[0]
+        return tuple(items)
+    if len(items) % 2:
+        raise SK2ParsingError('Incomplete dictionary item')
+    return dict(zip(items[::2], items[1::2]))
+
+
+def _parse_tokens(text):
+    # Frame is [opening char, items, separator expected flag, comma flag]
+    stack = [['', [], False, False]]
+    for num, op, string, name, error in TOKENS.findall(text):
+        frame = stack[-1]
+        if op:
+            if op in CLOSING:
+                if frame[2]:
+                    raise SK2ParsingError('Missing separator before "%s"' % op)
+                stack.append([op, [], False, False])
+                continue
+            elif op == ',':
+                if not frame[2] or not frame[0] or \
+                        (frame[0] == '{' and len(frame[1]) % 2):
+                    raise SK2ParsingError('Unexpected comma')
+                frame[2] = False
+                frame[3] = True
+                continue
+            elif op == ':':
+                if frame[0] != '{' or not frame[2] or not len(frame[1]) % 2:
+                    raise SK2ParsingError('Unexpected colon')
+                frame[2] = False
+                continue
+            # closing bracket
+            if CLOSING.get(frame[0]) != op:
+                raise SK2ParsingError('Unexpected "%s"' % op)
+            stack.pop()
+            value = _close_frame(frame)
+            frame = stack[-1]
+        elif num:
+            value = _decode_number(num)
+        elif string:
+            value = _decode_string(string)
+        elif name in NAMES:
+            value = NAMES[name]
+        elif name:
+            raise SK2ParsingError('Unknown name "%s"' % name)
+        else:
+            raise SK2ParsingError('Unexpected symbol "%s"' % error)
+
+        if frame[2]:
+            raise SK2ParsingError('Missing separator before %r' % value)
+        if not frame[0] and frame[1]:
+            raise SK2ParsingError('Extra data after literal')
+        frame[1].append(value)
+        frame[2] = True
+
+    if len(stack) > 1 or not stack[0][1]:
+        raise SK2ParsingError('Unexpected end of literal')
+    return stack[0][1][0]
+
+
+def parse_literal(text):
+    """
+    Returns value of Python literal provided as a string.
+    Only None, booleans, numbers, strings, lists, tuples
+    and dictionaries are accepted.
+    """
+    text = text.strip()
+    if not text.translate(None, JSON_CHARS):
+        try:
+            value, end = JSON_DECODER.raw_decode(text)
+            if end == len(text):
+                return value
+        except ValueError:
+            pass
+    match = SIMPLE_STRING.match(text)
+    if match:
+        return match.group(1)
+    if text in LITERAL_CACHE:
+        return marshal.loads(LITERAL_CACHE[text])
+    value = _parse_tokens(text)
+    if len(text) < LITERAL_CACHE_MAX_LEN:
+        if len(LITERAL_CACHE) >= LITERAL_CACHE_SIZE:
+            LITERAL_CACHE.clear()
+        LITERAL_CACHE[text] = marshal.dumps(value)
+    return value
+
+
+def parse_line(line):
+    """
+    Parses SK2 document line and returns (command, args) tuple,
+    where command is one of OBJ, SET or END.
+    """
+    if line.startswith(SET):
+        match = SET_LINE.match(line)
+        if match:
+            return SET, (match.group(2), parse_literal(match.group(3)))
+    elif line.startswith(OBJ):
+        match = OBJ_LINE.match(line)
+        if match:
+            return OBJ, (match.group(2),)
+    elif END_LINE.match(line):
+        return END, ()
+    raise SK2ParsingError('Unknown document line')
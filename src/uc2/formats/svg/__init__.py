@@ -46,8 +46,13 @@ def svg_saver(sk2_doc, filename=None, fileptr=None,
         translate = False
     if translate:
         svg_doc = SVG_Presenter(sk2_doc.appdata, cnf)
-        svg_doc.translate_from_sk2(sk2_doc)
-        svg_doc.save(filename, fileptr)
+        if isinstance(filename, basestring):
+            svg_doc.doc_file = filename
+        if svg_doc.config.svg_stream_export:
+            svg_doc.save_from_sk2(sk2_doc, filename, fileptr)
+        else:
+            svg_doc.translate_from_sk2(sk2_doc)
+            svg_doc.save(filename, fileptr)
         svg_doc.close()
     else:
         sk2_doc.save(filename, fileptr)
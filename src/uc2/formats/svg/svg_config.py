@@ -24,3 +24,14 @@ class SVG_Config(XmlConfigParser):
     indent = '\t'
     filename = 'svg_config.xml'
     svg_dpi = 0.0
+    # bitmaps with equal content are written once and referenced by <use>
+    svg_dedup_images = True
+    # if False, bitmaps are saved as PNG files in <svg name>_images folder
+    svg_embed_images = True
+    # gradient stops are written once and referenced by xlink:href,
+    # gradients with equal vector and stops are written once
+    svg_dedup_gradients = True
+    # path styles are written once as CSS classes in <style> element
+    svg_css_styles = False
+    # SVG export writes objects on the fly instead of building document model
+    svg_stream_export = True
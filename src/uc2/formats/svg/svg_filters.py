@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from uc2.formats.svg.svg_translators import SK2_to_SVG_StreamTranslator
+from uc2.formats.xml_.xml_filters import Advanced_XML_Saver
+
+
+class SVG_StreamSaver(Advanced_XML_Saver):
+    """
+    Translates SK2 document and writes SVG file on the fly,
+    presenter model contains root element only.
+    """
+    name = 'SVG_StreamSaver'
+    sk2_doc = None
+
+    def __init__(self, sk2_doc):
+        Advanced_XML_Saver.__init__(self)
+        self.sk2_doc = sk2_doc
+
+    def do_save(self):
+        self.indent = 0
+        self.write_header()
+        translator = SK2_to_SVG_StreamTranslator(self)
+        translator.translate(self.sk2_doc, self.presenter)
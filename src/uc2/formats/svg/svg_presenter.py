@@ -20,6 +20,7 @@ import os
 from uc2 import uc2const
 from uc2.formats.generic import TaggedModelPresenter
 from uc2.formats.svg.svg_config import SVG_Config
+from uc2.formats.svg.svg_filters import SVG_StreamSaver
 from uc2.formats.svg.svg_methods import SVG_Methods, create_new_svg
 from uc2.formats.svg.svg_translators import SK2_to_SVG_Translator
 from uc2.formats.svg.svg_translators import SVG_to_SK2_Translator
@@ -62,6 +63,17 @@ class SVG_Presenter(TaggedModelPresenter):
         translator = SK2_to_SVG_Translator()
         translator.translate(sk2_doc, self)
 
+    def save_from_sk2(self, sk2_doc, filename=None, fileptr=None):
+        """
+        Translates SK2 document writing SVG directly into file.
+        """
+        saver = self.saver
+        self.saver = SVG_StreamSaver(sk2_doc)
+        try:
+            self.save(filename, fileptr)
+        finally:
+            self.saver = saver
+
     def translate_to_sk2(self, sk2_doc):
         translator = SVG_to_SK2_Translator()
         translator.translate(self, sk2_doc)
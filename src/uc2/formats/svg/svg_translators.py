@@ -15,6 +15,7 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
 import logging
 import os
 from base64 import b64decode, b64encode
@@ -277,9 +278,7 @@ class SVG_to_SK2_Translator(object):
                     pths = curve.get_initial_paths()
                     pths = libgeom.apply_trafo_to_paths(pths, curve.trafo)
                     curves.append(pths)
-                paths = curves[0]
-                for item in curves[1:]:
-                    paths = libgeom.fuse_paths(paths, item)
+                paths = libgeom.union_paths(curves)
             else:
                 container.childs[0].update()
                 curve = container.childs[0].to_curve()
@@ -658,21 +657,19 @@ class SVG_to_SK2_Translator(object):
         if not items:
             return
         items = ' '.join(items)
-        if '.' not in items:
-            return
-        items = items.split('.')[1:]
-        for item in items:
+        for item in items.split('}'):
             if '{' not in item:
                 continue
-            class_, stylestr = item.split('{')
-            stylestr = stylestr.replace('}', '')
-            stls = stylestr.split(';')
+            selectors, stylestr = item.split('{', 1)
             style = {}
-            for stl in stls:
+            for stl in stylestr.split(';'):
                 vals = stl.split(':')
                 if len(vals) == 2:
                     style[vals[0].strip()] = vals[1].strip()
-            self.classes[class_.strip()] = style
+            for selector in selectors.split(','):
+                if '.' in selector:
+                    class_ = selector.split('.')[-1].strip()
+                    self.classes.setdefault(class_, {}).update(style)
 
     def translate_color_profile(self, svg_obj):
         self.profiles[svg_obj.attrs['name']] = svg_obj
@@ -1105,6 +1102,9 @@ class SK2_to_SVG_Translator(object):
     sk2_mt = None
     sk2_mtds = None
     svg_mtds = None
+    images = None
+    gradients = None
+    style_classes = None
 
     def translate(self, sk2_doc, svg_doc):
         self.svg_doc = svg_doc
@@ -1113,17 +1113,37 @@ class SK2_to_SVG_Translator(object):
         self.sk2_mt = sk2_doc.model
         self.sk2_mtds = sk2_doc.methods
         self.svg_mtds = svg_doc.methods
-        self.defs_count = 0
-        svg_attrs = self.svg_mt.attrs
-
-        self.trafo = [1.0, 0.0, 0.0, -1.0, 0.0, 0.0]
-        svg_attrs['id'] = utils.generate_guid()
-        units = svg_const.SVG_PX if self.sk2_mt.doc_units == uc2const.UNIT_PX \
-            else svg_const.SVG_PT
+        self.svg_mt.attrs['id'] = utils.generate_guid()
         for item in self.svg_mt.childs:
             if item.tag == 'defs':
                 self.defs = item
                 break
+        self.translate_pages()
+        self.finish_defs()
+        self.add_spacer(self.svg_mt)
+        self.clear()
+
+    def clear(self):
+        self.svg_doc = None
+        self.sk2_doc = None
+        self.svg_mt = None
+        self.sk2_mt = None
+        self.sk2_mtds = None
+        self.svg_mtds = None
+        self.images = None
+        self.gradients = None
+        self.style_classes = None
+
+    def translate_pages(self):
+        self.defs_count = 0
+        self.images = {}
+        self.gradients = {}
+        self.style_classes = {}
+        self.indent_level = -1
+        self.trafo = [1.0, 0.0, 0.0, -1.0, 0.0, 0.0]
+        svg_attrs = self.svg_mt.attrs
+        units = svg_const.SVG_PX if self.sk2_mt.doc_units == uc2const.UNIT_PX \
+            else svg_const.SVG_PT
         for item in self.sk2_mt.childs:
             if item.cid == sk2_model.PAGES:
                 page = item.childs[0]
@@ -1139,18 +1159,15 @@ class SK2_to_SVG_Translator(object):
                 self.page_dx = 0.0
                 for page in item.childs:
                     self.translate_page(self.svg_mt, page)
+
+    def finish_defs(self):
+        if self.style_classes:
+            self.make_style_sheet()
         self.indent_level = 0
         if self.defs.childs:
             self.add_spacer(self.defs)
         else:
             self.svg_mt.childs.remove(self.defs)
-        self.add_spacer(self.svg_mt)
-        self.svg_doc = None
-        self.sk2_doc = None
-        self.svg_mt = None
-        self.sk2_mt = None
-        self.sk2_mtds = None
-        self.svg_mtds = None
 
     def add_spacer(self, parent):
         spacer = '\n' + '\t' * self.indent_level
@@ -1160,6 +1177,13 @@ class SK2_to_SVG_Translator(object):
         self.add_spacer(parent)
         parent.childs.append(obj)
 
+    def start_group(self, dest_parent, group):
+        pass
+
+    def end_group(self, dest_parent, group):
+        self.add_spacer(group)
+        self.append_obj(dest_parent, group)
+
     def translate_page(self, dest_parent, source_obj):
         w, h = source_obj.page_format[1]
         self.trafo[4] = w / 2.0 + self.page_dx
@@ -1199,9 +1223,9 @@ class SK2_to_SVG_Translator(object):
         group = svg_utils.create_xmlobj('g')
         if not source_obj.properties[0]:
             group.attrs['style'] = 'display:none;'
+        self.start_group(dest_parent, group)
         self.translate_objs(group, source_obj.childs)
-        self.add_spacer(group)
-        self.append_obj(dest_parent, group)
+        self.end_group(dest_parent, group)
 
     def translate_group(self, dest_parent, source_obj):
         if source_obj.is_container:
@@ -1221,9 +1245,9 @@ class SK2_to_SVG_Translator(object):
 
             group = svg_utils.create_xmlobj('g')
             group.attrs['clip-path'] = 'url(#%s)' % clip_id
+            self.start_group(dest_parent, group)
             self.translate_objs(group, source_obj.childs[1:])
-            self.add_spacer(group)
-            self.append_obj(dest_parent, group)
+            self.end_group(dest_parent, group)
 
             if clip.style[1] and not clip.style[1][7]:
                 stroke_obj = clip.copy()
@@ -1232,9 +1256,9 @@ class SK2_to_SVG_Translator(object):
                 self.translate_primitive(dest_parent, stroke_obj)
         else:
             group = svg_utils.create_xmlobj('g')
+            self.start_group(dest_parent, group)
             self.translate_objs(group, source_obj.childs)
-            self.add_spacer(group)
-            self.append_obj(dest_parent, group)
+            self.end_group(dest_parent, group)
 
     def make_clippath(self, source_obj):
         clippath = svg_utils.create_xmlobj('clipPath')
@@ -1260,7 +1284,10 @@ class SK2_to_SVG_Translator(object):
         trafo = libgeom.multiply_trafo(curve.trafo, self.trafo)
         paths = libgeom.apply_trafo_to_paths(curve.paths, trafo)
         pth = svg_utils.create_xmlobj('path')
-        pth.attrs['style'] = style
+        if self.svg_doc.config.svg_css_styles:
+            pth.attrs['class'] = self.get_style_class(style)
+        else:
+            pth.attrs['style'] = style
         pth.attrs['d'] = svg_utils.translate_paths_to_d(paths)
         self.append_obj(dest_parent, pth)
         arrows = curve.arrows_to_curve()
@@ -1268,22 +1295,78 @@ class SK2_to_SVG_Translator(object):
             self.translate_primitive(dest_parent, arrows)
 
     def translate_pixmap(self, dest_parent, source_obj):
-        surface = source_obj.handler.get_surface(self.sk2_doc.cms)
-        image_stream = StringIO()
-        surface.write_to_png(image_stream)
-        content = b64encode(image_stream.getvalue())
-        image = svg_utils.create_xmlobj('image')
-        w, h = source_obj.get_size()
         trafo = [1.0, 0.0, 0.0, -1.0, 0.0, 0.0]
         trafo = libgeom.multiply_trafo(trafo, source_obj.trafo)
         trafo = libgeom.multiply_trafo(trafo, self.trafo)
-        image.attrs['xlink:href'] = 'data:image/png;base64,' + content
-        image.attrs['transform'] = 'matrix(%s)' % trafo.__str__()[1:-1]
+        transform = 'matrix(%s)' % trafo.__str__()[1:-1]
+        key = self.get_image_key(source_obj)
+
+        if not self.svg_doc.config.svg_dedup_images:
+            image = self.create_image(source_obj, key)
+            image.attrs['transform'] = transform
+            self.append_obj(dest_parent, image)
+            return
+
+        if key not in self.images:
+            image = self.create_image(source_obj, key)
+            image.attrs['id'] = 'image' + str(self.defs_count + 1)
+            self.defs_count += 1
+            lvl = self.indent_level
+            self.indent_level = 1
+            self.append_obj(self.defs, image)
+            self.indent_level = lvl
+            self.images[key] = image.attrs['id']
+        use = svg_utils.create_xmlobj('use')
+        use.attrs['xlink:href'] = '#' + self.images[key]
+        use.attrs['transform'] = transform
+        self.append_obj(dest_parent, use)
+
+    def get_image_key(self, source_obj):
+        """
+        Returns hex digest of pixmap content. Duotone colors are taken
+        into account because they change displayed image.
+        """
+        key = source_obj.handler.get_digest()
+        if source_obj.colorspace in uc2const.DUOTONES:
+            key = hashlib.sha1(key + repr(source_obj.style[3])).hexdigest()
+        return key
+
+    def create_image(self, source_obj, key):
+        image = svg_utils.create_xmlobj('image')
+        w, h = source_obj.get_size()
+        image.attrs['xlink:href'] = self.get_image_href(source_obj, key)
         image.attrs['x'] = '0'
         image.attrs['y'] = str(-h)
         image.attrs['width'] = str(w)
         image.attrs['height'] = str(h)
-        self.append_obj(dest_parent, image)
+        return image
+
+    def get_image_href(self, source_obj, key):
+        """
+        Writes pixmap as PNG data URI or, if images are not embedded,
+        as PNG file in <svg name>_images folder next to SVG file.
+        """
+        surface = source_obj.handler.get_surface(self.sk2_doc.cms,
+                                                 cached=False)
+        doc_file = self.svg_doc.doc_file
+        if self.svg_doc.config.svg_embed_images or not doc_file:
+            image_stream = StringIO()
+            surface.write_to_png(image_stream)
+            return 'data:image/png;base64,' + \
+                   b64encode(image_stream.getvalue())
+
+        image_dir = os.path.splitext(doc_file)[0] + '_images'
+        if not fsutils.exists(image_dir):
+            fsutils.makedirs(image_dir)
+        filename = key + '.png'
+        image_path = os.path.join(image_dir, filename)
+        if not fsutils.exists(image_path):
+            fileptr = fsutils.get_fileptr(image_path, True)
+            try:
+                surface.write_to_png(fileptr)
+            finally:
+                fileptr.close()
+        return os.path.basename(image_dir) + '/' + filename
 
     def translate_style(self, obj):
         style = {}
@@ -1291,6 +1374,27 @@ class SK2_to_SVG_Translator(object):
         self.set_stroke(style, obj)
         return svg_utils.translate_style_dict(style)
 
+    def get_style_class(self, style):
+        if style not in self.style_classes:
+            self.style_classes[style] = 'st' + str(len(self.style_classes) + 1)
+        return self.style_classes[style]
+
+    def make_style_sheet(self):
+        """
+        Writes style classes as <style> element in defs.
+        """
+        style_sheet = svg_utils.create_xmlobj('style', {'type': 'text/css'})
+        self.indent_level = 1
+        self.append_obj(self.defs, style_sheet)
+        self.indent_level += 1
+        classes = sorted(self.style_classes.items(),
+                         key=lambda item: int(item[1][2:]))
+        for style, class_name in classes:
+            rule = '.%s{%s}' % (class_name, style)
+            self.append_obj(style_sheet, svg_utils.create_spacer(rule))
+        self.indent_level -= 1
+        self.add_spacer(style_sheet)
+
     def set_stroke(self, svg_style, obj):
         if not obj.style[1]:
             return
@@ -1349,8 +1453,6 @@ class SK2_to_SVG_Translator(object):
             svg_style['fill'] = 'url(#%s)' % grad_id
 
     def translate_gradient(self, gradient, obj):
-        grad_id = 'grad' + str(self.defs_count + 1)
-        self.defs_count += 1
         trafo = libgeom.multiply_trafo(obj.fill_trafo, self.trafo)
         vector = libgeom.apply_trafo_to_points(gradient[1], trafo)
         spread = 'pad'
@@ -1359,7 +1461,6 @@ class SK2_to_SVG_Translator(object):
         attrs = {'gradientUnits': 'userSpaceOnUse'}
         if gradient[0] == sk2const.GRADIENT_RADIAL:
             tag = 'radialGradient'
-            attrs['id'] = grad_id
             attrs['spreadMethod'] = spread
             cx, cy = gradient[1][0]
             r = libgeom.distance(*gradient[1])
@@ -1372,22 +1473,45 @@ class SK2_to_SVG_Translator(object):
             tag = 'linearGradient'
             x1, y1 = vector[0]
             x2, y2 = vector[1]
-            attrs['id'] = grad_id
             attrs['spreadMethod'] = spread
             attrs['x1'] = str(x1)
             attrs['y1'] = str(y1)
             attrs['x2'] = str(x2)
             attrs['y2'] = str(y2)
+        stops = self.translate_stops(gradient[2])
+        if not self.svg_doc.config.svg_dedup_gradients:
+            return self.add_gradient(tag, attrs, stops)
+
+        # Stops are written once and referenced by gradients of every
+        # object (xlink:href), gradients with equal vector share definition
+        stops_key = (tag, tuple(tuple(sorted(item.items())) for item in stops))
+        if stops_key not in self.gradients:
+            self.gradients[stops_key] = self.add_gradient(tag, {}, stops)
+        attrs['xlink:href'] = '#' + self.gradients[stops_key]
+        key = (tag, tuple(sorted(attrs.items())))
+        if key not in self.gradients:
+            self.gradients[key] = self.add_gradient(tag, attrs)
+        return self.gradients[key]
+
+    def add_gradient(self, tag, attrs, stops=None):
+        grad_id = 'grad' + str(self.defs_count + 1)
+        self.defs_count += 1
+        attrs['id'] = grad_id
         grad_obj = svg_utils.create_xmlobj(tag, attrs)
         lvl = self.indent_level
         self.indent_level = 1
         self.append_obj(self.defs, grad_obj)
-        self.indent_level += 1
-        self.translate_stops(grad_obj, gradient[2])
+        if stops:
+            self.indent_level += 1
+            for item in stops:
+                self.append_obj(grad_obj, svg_utils.create_xmlobj('stop', item))
+            self.indent_level -= 1
+            self.add_spacer(grad_obj)
         self.indent_level = lvl
         return grad_id
 
-    def translate_stops(self, parent, stops):
+    def translate_stops(self, stops):
+        ret = []
         for stop in stops:
             attrs = {}
             offset, color = stop
@@ -1396,7 +1520,112 @@ class SK2_to_SVG_Translator(object):
             clr = cms.rgb_to_hexcolor(clr[1])
             alpha = str(color[2])
             attrs['style'] = 'stop-color:%s;stop-opacity:%s;' % (clr, alpha)
-            stop_obj = svg_utils.create_xmlobj('stop', attrs)
-            self.append_obj(parent, stop_obj)
-        self.indent_level -= 1
-        self.add_spacer(parent)
+            ret.append(attrs)
+        return ret
+
+
+class SK2_to_SVG_StreamTranslator(SK2_to_SVG_Translator):
+    """
+    Writes SVG document directly into saver file without building
+    the whole document model. SK2 document is walked twice: first pass
+    collects defs (gradients, clip paths, images), second pass writes
+    objects as soon as they are translated. Both passes allocate defs ids
+    in the same order so references match. Output is identical to
+    document model saved by Advanced_XML_Saver.
+    """
+    saver = None
+    defs_pass = False
+    streamed = None
+
+    def __init__(self, saver):
+        self.saver = saver
+
+    def translate(self, sk2_doc, svg_doc):
+        self.svg_doc = svg_doc
+        self.sk2_doc = sk2_doc
+        self.svg_mt = svg_doc.model
+        self.sk2_mt = sk2_doc.model
+        self.sk2_mtds = sk2_doc.methods
+        self.svg_mtds = svg_doc.methods
+        self.svg_mt.attrs['id'] = utils.generate_guid()
+        for item in self.svg_mt.childs:
+            if item.tag == 'defs':
+                self.defs = item
+                break
+        # streamed objects are open tags in file, keyed by id()
+        self.streamed = {id(self.svg_mt): self.svg_mt}
+
+        self.defs_pass = True
+        self.translate_pages()
+        self.finish_defs()
+        self.saver.write('<svg%s>' % self.saver.get_obj_attrs(self.svg_mt))
+        for child in self.svg_mt.childs:
+            self.saver.write_obj(child)
+        self.svg_mt.childs = []
+        self.defs.childs = []
+
+        self.defs_pass = False
+        self.translate_pages()
+        self.saver.write('\n</svg>')
+        self.streamed = None
+        self.clear()
+
+    def is_streamed(self, obj):
+        return id(obj) in self.streamed
+
+    def append_obj(self, parent, obj):
+        if parent is self.defs:
+            if self.defs_pass:
+                SK2_to_SVG_Translator.append_obj(self, parent, obj)
+        elif self.is_streamed(parent):
+            if not self.defs_pass:
+                self.saver.write('\n' + '\t' * self.indent_level)
+                self.saver.write_obj(obj)
+        else:
+            SK2_to_SVG_Translator.append_obj(self, parent, obj)
+
+    def start_group(self, dest_parent, group):
+        if self.is_streamed(dest_parent):
+            self.streamed[id(group)] = group
+            if not self.defs_pass:
+                self.saver.write('\n' + '\t' * self.indent_level)
+                attrs = self.saver.get_obj_attrs(group)
+                self.saver.write('<g%s>' % attrs)
+
+    def end_group(self, dest_parent, group):
+        if self.is_streamed(group):
+            del self.streamed[id(group)]
+            if not self.defs_pass:
+                self.saver.write('\n' + '\t' * self.indent_level)
+                self.saver.write('</g>')
+        else:
+            SK2_to_SVG_Translator.end_group(self, dest_parent, group)
+
+    def translate_primitive(self, dest_parent, source_obj):
+        if not self.defs_pass or not self.is_streamed(dest_parent):
+            SK2_to_SVG_Translator.translate_primitive(self, dest_parent,
+                                                      source_obj)
+            return
+        # Style only: it creates gradients and style classes.
+        # Only text and objects with arrows are converted to curves:
+        # text produces group of glyph curves, arrows are curves with
+        # own style. Order of styles is the same as in objects pass.
+        if source_obj.is_text:
+            self.translate_group(dest_parent, source_obj.to_curve())
+            return
+        style = self.translate_style(source_obj)
+        if self.svg_doc.config.svg_css_styles:
+            self.get_style_class(style)
+        stroke = source_obj.style[1]
+        if stroke and stroke[9]:
+            curve = source_obj.to_curve()
+            arrows = curve.arrows_to_curve() if curve.is_curve else None
+            if arrows:
+                self.translate_primitive(dest_parent, arrows)
+
+    def create_image(self, source_obj, key):
+        # Image is needed in defs pass for <defs> and in objects pass
+        # for inline images, other one is dropped without encoding
+        if self.defs_pass == bool(self.svg_doc.config.svg_dedup_images):
+            return SK2_to_SVG_Translator.create_image(self, source_obj, key)
+        return svg_utils.create_xmlobj('image')
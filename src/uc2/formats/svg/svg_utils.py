@@ -25,7 +25,6 @@ from uc2.formats.svg import svg_colors
 from uc2.formats.xml_.xml_model import XMLObject, XmlContentText
 from uc2.libgeom import add_points, sub_points, mult_point
 
-PATH_STUB = [[], [], sk2const.CURVE_OPENED]
 F13 = 1.0 / 3.0
 F23 = 2.0 / 3.0
 LOG = logging.getLogger(__name__)
@@ -212,8 +211,8 @@ def parse_svg_path_cmds(pathcmds):
     coords = parse_svg_coords(pathcmds[last_index + 1:index])
     cmds.append([last, coords])
 
-    paths = []
-    path = []
+    paths = libgeom.PackedPaths()
+    start = None
     cpoint = []
     rel_flag = False
     last_cmd = 'M'
@@ -221,45 +220,51 @@ def parse_svg_path_cmds(pathcmds):
 
     for cmd in cmds:
         if cmd[0] in 'Mm':
-            if path: paths.append(path)
-            path = deepcopy(PATH_STUB)
+            start = None
             rel_flag = cmd[0] == 'm'
             points = [cmd[1][i:i + 2] for i in range(0, len(cmd[1]), 2)]
             for point in points:
+                if len(point) != 2:
+                    continue
                 if cpoint and rel_flag:
                     point = add_points(base_point(cpoint), point)
-                if not path[0]:
-                    path[0] = point
+                if start is None:
+                    start = point
+                    paths.start_path(point)
                 else:
-                    path[1].append(point)
+                    paths.append_point(point)
                 cpoint = point
-        elif cmd[0] in 'Zz':
+        elif cmd[0] in 'Zz' and start is not None:
             p0 = [] + base_point(cpoint)
-            p1 = [] + path[0]
+            p1 = [] + start
             if not libgeom.is_equal_points(p0, p1, 8):
-                path[1].append([] + path[0])
-            path[2] = sk2const.CURVE_CLOSED
-            cpoint = [] + path[0]
+                paths.append_point(p1)
+            paths.close_path(sk2const.CURVE_CLOSED)
+            cpoint = [] + start
         elif cmd[0] in 'Cc':
             rel_flag = cmd[0] == 'c'
             points = [cmd[1][i:i + 2] for i in range(0, len(cmd[1]), 2)]
             points = [points[i:i + 3] for i in range(0, len(points), 3)]
             for point in points:
+                if len(point) != 3 or len(point[2]) != 2:
+                    continue
                 if rel_flag:
                     point = [add_points(base_point(cpoint), point[0]),
                         add_points(base_point(cpoint), point[1]),
                         add_points(base_point(cpoint), point[2])]
                 qpoint = [] + point
                 qpoint.append(sk2const.NODE_CUSP)
-                path[1].append(qpoint)
+                paths.append_point(qpoint)
                 cpoint = point
         elif cmd[0] in 'Ll':
             rel_flag = cmd[0] == 'l'
             points = [cmd[1][i:i + 2] for i in range(0, len(cmd[1]), 2)]
             for point in points:
+                if len(point) != 2:
+                    continue
                 if rel_flag:
                     point = add_points(base_point(cpoint), point)
-                path[1].append(point)
+                paths.append_point(point)
                 cpoint = point
         elif cmd[0] in 'Hh':
             rel_flag = cmd[0] == 'h'
@@ -269,7 +274,7 @@ def parse_svg_path_cmds(pathcmds):
                     point = [x + dx, y]
                 else:
                     point = [x, y]
-                path[1].append(point)
+                paths.append_point(point)
                 cpoint = point
         elif cmd[0] in 'Vv':
             rel_flag = cmd[0] == 'v'
@@ -279,13 +284,15 @@ def parse_svg_path_cmds(pathcmds):
                     point = [x, y + dy]
                 else:
                     point = [x, y]
-                path[1].append(point)
+                paths.append_point(point)
                 cpoint = point
         elif cmd[0] in 'Ss':
             rel_flag = cmd[0] == 's'
             points = [cmd[1][i:i + 2] for i in range(0, len(cmd[1]), 2)]
             points = [points[i:i + 2] for i in range(0, len(points), 2)]
             for point in points:
+                if len(point) != 2 or len(point[1]) != 2:
+                    continue
                 q = cpoint
                 p = cpoint
                 if len(cpoint) > 2:
@@ -300,7 +307,7 @@ def parse_svg_path_cmds(pathcmds):
                 point = [p1, p2, p3]
                 qpoint = [] + point
                 qpoint.append(sk2const.NODE_CUSP)
-                path[1].append(qpoint)
+                paths.append_point(qpoint)
                 cpoint = point
 
         elif cmd[0] in 'Qq':
@@ -320,7 +327,7 @@ def parse_svg_path_cmds(pathcmds):
                 point = [p1, p2, p3]
                 qpoint = [] + point
                 qpoint.append(sk2const.NODE_CUSP)
-                path[1].append(qpoint)
+                paths.append_point(qpoint)
                 cpoint = point
                 last_quad = q
 
@@ -342,7 +349,7 @@ def parse_svg_path_cmds(pathcmds):
                 point = [p1, p2, p3]
                 qpoint = [] + point
                 qpoint.append(sk2const.NODE_CUSP)
-                path[1].append(qpoint)
+                paths.append_point(qpoint)
                 cpoint = point
                 last_quad = q
 
@@ -361,7 +368,7 @@ def parse_svg_path_cmds(pathcmds):
                     y += cpoint[1]
                 if cpoint == [x, y]: continue
                 if not rx or not ry:
-                    path[1].append([x, y])
+                    paths.append_point([x, y])
                     continue
 
                 vector = [[] + cpoint, [x, y]]
@@ -440,11 +447,10 @@ def parse_svg_path_cmds(pathcmds):
                 points = libgeom.apply_trafo_to_points(points, tr3)
 
                 for point in points:
-                    path[1].append(point)
+                    paths.append_point(point)
 
         last_cmd = cmd[0]
 
-    if path: paths.append(path)
     return paths
 
 
@@ -30,7 +30,8 @@ def svgz_loader(appdata, filename=None, fileptr=None,
                 translate=True, cnf=None, **kw):
     cnf = merge_cnf(cnf, kw)
     svg_doc = SVG_Presenter(appdata, cnf)
-    fileptr = gzip.GzipFile(upath(filename), mode='rb', fileobj=fileptr)
+    fileptr = gzip.GzipFile(upath(filename) if filename else None,
+                            mode='rb', fileobj=fileptr)
     svg_doc.load(None, fileptr)
     if translate:
         sk2_doc = SK2_Presenter(appdata, cnf)
@@ -47,7 +48,8 @@ def svgz_saver(sk2_doc, filename=None, fileptr=None,
     cnf = merge_cnf(cnf, kw)
     if sk2_doc.cid == uc2const.SVG:
         translate = False
-    fileptr = gzip.GzipFile(upath(filename), mode='wb', fileobj=fileptr)
+    fileptr = gzip.GzipFile(upath(filename) if filename else None,
+                            mode='wb', fileobj=fileptr)
     if translate:
         svg_doc = SVG_Presenter(sk2_doc.appdata, cnf)
         svg_doc.translate_from_sk2(sk2_doc)
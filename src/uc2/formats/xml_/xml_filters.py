@@ -73,6 +73,10 @@ class XML_Saver(AbstractSaver):
 
     def do_save(self):
         self.indent = 0
+        self.write_header()
+        self.write_obj(self.model)
+
+    def write_header(self):
         cfg = self.model.config.encoding
         self.writeln('<?xml version="1.0" encoding="%s"?>' % cfg)
         appdata = self.presenter.appdata
@@ -80,7 +84,6 @@ class XML_Saver(AbstractSaver):
         ver = "%s%s" % (appdata.version, appdata.revision)
         link = "(https://%s/)" % appdata.app_domain
         self.writeln("<!-- %s %s %s -->" % (name, ver, link))
-        self.write_obj(self.model)
 
     def write_obj(self, obj):
         ind = self.indent * self.model.config.indent
@@ -91,6 +91,16 @@ def apply_trafo(cairo_path, trafo, copy=False):
     return cairo_path
 
 
+def apply_trafo_to_buffer(buffer, trafo):
+    """
+    Transforms in place x,y pairs stored in array('d') or other
+    writable buffer of doubles.
+    """
+    m11, m21, m12, m22, dx, dy = trafo
+    _libcairo.apply_trafo_to_buffer(buffer, m11, m21, m12, m22, dx, dy)
+    return buffer
+
+
 def multiply_trafo(trafo1, trafo2):
     matrix1 = get_matrix_from_trafo(trafo1)
     matrix2 = get_matrix_from_trafo(trafo2)
@@ -192,6 +202,14 @@ def check_surface_whiteness(surface):
     return _libcairo.get_pixel(surface) == [255, 255, 255]
 
 
+def get_png_scanlines(surface):
+    """
+    Returns ARGB32 surface content as unfiltered PNG scanlines
+    of unpremultiplied RGBA pixels.
+    """
+    return _libcairo.get_png_scanlines(surface)
+
+
 def image_to_surface_n(image):
     png_stream = StringIO()
     image.save(png_stream, format='PNG')
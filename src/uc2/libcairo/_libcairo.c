@@ -120,6 +120,39 @@ cairo_ApplyTrafoToPath (PyObject *self, PyObject *args) {
 }
 
 
+static PyObject *
+cairo_ApplyTrafoToBuffer (PyObject *self, PyObject *args) {
+
+	double m11, m12, m21, m22, dx, dy, x, y;
+	double *points;
+	void *data;
+	Py_ssize_t length, i;
+	PyObject *buffer;
+
+	if (!PyArg_ParseTuple(args, "Odddddd",
+			&buffer, &m11, &m21, &m12, &m22, &dx, &dy)) {
+		return NULL;
+	}
+
+	if (PyObject_AsWriteBuffer(buffer, &data, &length)) {
+		return NULL;
+	}
+
+	//buffer is a sequence of x,y pairs of doubles
+	points = (double *) data;
+	length = length / sizeof(double) - 1;
+	for (i = 0; i < length; i += 2) {
+		x = points[i];
+		y = points[i + 1];
+		points[i] = m11 * x + m12 * y + dx;
+		points[i + 1] = m21 * x + m22 * y + dy;
+	}
+
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+
 static PyObject *
 cairo_GetPDPathFromPath (PyObject *self, PyObject *args) {
 
@@ -325,15 +358,65 @@ cairo_DrawRGBAImage (PyObject *self, PyObject *args) {
 	return Py_None;
 }
 
+static PyObject *
+cairo_GetPNGScanlines (PyObject *self, PyObject *args) {
+
+	PycairoSurface *pysurface;
+	cairo_surface_t *surface;
+	int width, height, stride, x, y;
+	unsigned int pixel, alpha;
+	unsigned char *src, *dest;
+	PyObject *result;
+
+	if (!PyArg_ParseTuple(args, "O", &pysurface)) {
+		return NULL;
+	}
+
+	surface = pysurface -> surface;
+	cairo_surface_flush(surface);
+	src = cairo_image_surface_get_data(surface);
+	width = cairo_image_surface_get_width(surface);
+	height = cairo_image_surface_get_height(surface);
+	stride = cairo_image_surface_get_stride(surface);
+
+	result = PyString_FromStringAndSize(NULL, height * (width * 4 + 1));
+	if (result == NULL) {
+		return NULL;
+	}
+	dest = (unsigned char*) PyString_AS_STRING(result);
+
+	for(y=0; y<height; y++) {
+		//PNG filter type None
+		*dest++ = 0;
+		for(x=0; x<width; x++) {
+			memcpy(&pixel, src + y*stride + x*4, 4);
+			alpha = (pixel & 0xff000000) >> 24;
+			//unpremultiplied RGBA, the same as cairo_surface_write_to_png()
+			if (alpha == 0) {
+				dest[0] = dest[1] = dest[2] = dest[3] = 0;
+			} else {
+				dest[0] = (((pixel & 0xff0000) >> 16) * 255 + alpha / 2) / alpha;
+				dest[1] = (((pixel & 0x00ff00) >>  8) * 255 + alpha / 2) / alpha;
+				dest[2] = (((pixel & 0x0000ff) >>  0) * 255 + alpha / 2) / alpha;
+				dest[3] = alpha;
+			}
+			dest += 4;
+		}
+	}
+	return result;
+}
+
 static
 PyMethodDef cairo_methods[] = {
 	{"get_path_from_cpath", cairo_GetPDPathFromPath, METH_VARARGS},
 	{"draw_rect", cairo_DrawRectangle, METH_VARARGS},
 	{"get_trafo", cairo_ConvertMatrixToTrafo, METH_VARARGS},
 	{"apply_trafo", cairo_ApplyTrafoToPath, METH_VARARGS},
+	{"apply_trafo_to_buffer", cairo_ApplyTrafoToBuffer, METH_VARARGS},
 	{"get_pixel", cairo_GetSurfaceFirstPixel, METH_VARARGS},
 	{"draw_rgb_image", cairo_DrawRGBImage, METH_VARARGS},
 	{"draw_rgba_image", cairo_DrawRGBAImage, METH_VARARGS},
+	{"get_png_scanlines", cairo_GetPNGScanlines, METH_VARARGS},
 	{NULL, NULL}
 };
 
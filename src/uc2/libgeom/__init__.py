@@ -16,13 +16,16 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from bbox import *
+from bbox_index import BBoxIndex
 from bezier_ops import *
 from contour import stroke_to_curve
 from cwrap import *
 from flattering import get_flattened_paths, flat_paths, flat_path
 from objs import *
+from packed import PackedPaths, pack_paths, unpack_paths, is_packed
 from points import *
-from shaping import intersect_paths, fuse_paths, trim_paths, excluse_paths
+from shaping import intersect_paths, fuse_paths, trim_paths, excluse_paths, \
+    union_paths
 from text_on_path import set_text_on_path
 from trafo import *
 
@@ -48,4 +51,7 @@ POINTS DEFINITION:
 line point - [x,y]
 curve point - [[x1,y1],[x2,y2],[x3,y3], marker]
 marker - NODE_CUSP = 0; NODE_SMOOTH = 1; NODE_SYMMETRICAL = 2 
+
+Paths can be also stored in compact PackedPaths object (see packed.py)
+which is read-only sequence of paths.
 """
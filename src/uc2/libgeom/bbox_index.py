@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import math
+
+NODE_CAPACITY = 16
+
+
+def _center_x(node):
+    return node[0] + node[2]
+
+
+def _center_y(node):
+    return node[1] + node[3]
+
+
+def _make_node(childs, is_leaf):
+    return (min(item[0] for item in childs), min(item[1] for item in childs),
+            max(item[2] for item in childs), max(item[3] for item in childs),
+            childs, is_leaf)
+
+
+class BBoxIndex(object):
+    """Static R-tree of bounding boxes packed by Sort-Tile-Recursive
+    algorithm. Index is built once, changed items require new index.
+
+    Node is a tuple (x0, y0, x1, y1, childs, is_leaf), leaf node
+    childs are (x0, y0, x1, y1, item_index) tuples.
+
+    :type items: list
+    :param items: list of (bbox, value) pairs
+    """
+    root = None
+    values = None
+
+    def __init__(self, items, capacity=NODE_CAPACITY):
+        self.values = []
+        entries = []
+        for bbox, value in items:
+            x0, y0, x1, y1 = bbox
+            entries.append((min(x0, x1), min(y0, y1), max(x0, x1),
+                            max(y0, y1), len(self.values)))
+            self.values.append(value)
+        if entries:
+            self.root = self._pack(entries, capacity)
+
+    @staticmethod
+    def _pack(level, capacity):
+        is_leaf = True
+        while True:
+            pages = int(math.ceil(len(level) / float(capacity)))
+            slice_size = int(math.ceil(math.sqrt(pages))) * capacity
+            level.sort(key=_center_x)
+            nodes = []
+            for i in range(0, len(level), slice_size):
+                tile = sorted(level[i:i + slice_size], key=_center_y)
+                for j in range(0, len(tile), capacity):
+                    nodes.append(_make_node(tile[j:j + capacity], is_leaf))
+            if len(nodes) == 1:
+                return nodes[0]
+            level = nodes
+            is_leaf = False
+
+    def __len__(self):
+        return len(self.values)
+
+    def get_bbox(self):
+        """Returns bounding box of all indexed items.
+
+        :rtype: list
+        :return: bounding box (empty list for empty index)
+        """
+        return list(self.root[:4]) if self.root else []
+
+    def query(self, bbox):
+        """Finds items which bounding boxes overlap provided bbox.
+
+        :type bbox: list
+        :param bbox: bounding box
+
+        :rtype: list
+        :return: values of found items in insertion order
+        """
+        if self.root is None:
+            return []
+        x0, y0, x1, y1 = bbox
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node[0] > x1 or node[2] < x0 or node[1] > y1 or node[3] < y0:
+                continue
+            if node[5]:
+                found += [item[4] for item in node[4]
+                          if item[0] <= x1 and item[2] >= x0 and
+                          item[1] <= y1 and item[3] >= y0]
+            else:
+                stack += node[4]
+        found.sort()
+        return [self.values[index] for index in found]
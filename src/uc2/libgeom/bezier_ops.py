@@ -22,6 +22,7 @@ from uc2 import sk2const
 from flattering import flat_path
 from points import distance, mult_point, add_points
 from cwrap import get_cpath_bbox, create_cpath
+from packed import PackedPaths
 
 
 def is_curve_point(point):
@@ -47,6 +48,8 @@ def get_paths_length(paths):
 
 
 def get_paths_bbox(paths):
+    if isinstance(paths, PackedPaths):
+        return paths.get_bbox()
     return get_cpath_bbox(create_cpath(paths))
 
 
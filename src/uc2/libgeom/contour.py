@@ -21,7 +21,7 @@ from copy import deepcopy
 from uc2 import sk2const
 from points import distance, mult_point, add_points, sub_points, midpoint
 from bezier_ops import bezier_base_point
-from shaping import fuse_paths, intersect_lines, intersect_segments, dash_path
+from shaping import union_paths, intersect_lines, intersect_segments, dash_path
 
 # This constant is used to calculate the length of the bezier
 # tangents to approximate a circle.
@@ -508,8 +508,4 @@ def stroke_to_curve(paths, stroke_style):
         new_paths.append(outlines)
     if len(new_paths) == 1:
         return new_paths[0]
-    else:
-        ret = new_paths[0]
-        for item in new_paths[1:]:
-            ret = fuse_paths(ret, item)
-        return ret
+    return union_paths(new_paths)
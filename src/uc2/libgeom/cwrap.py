@@ -17,9 +17,11 @@
 
 from uc2 import libcairo
 
+from packed import unpack_paths
+
 
 def create_cpath(cache_paths):
-    return libcairo.create_cpath(cache_paths)
+    return libcairo.create_cpath(unpack_paths(cache_paths))
 
 
 def copy_cpath(cache_cpath):
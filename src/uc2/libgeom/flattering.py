@@ -15,71 +15,143 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from copy import deepcopy
+import math
+from array import array
 
-from points import add_points, mult_point, get_point_angle
+from packed import PackedPaths, SEG_LINE
 from trafo import apply_trafo_to_paths, NORMAL_TRAFO
 
+# Subdivision depth limit (2^16 pieces per segment)
+MAX_DEPTH = 16
 
-# ------------- Flattering -------------
-
-def split_segment(start_point, end_point, t=0.5):
-    p0 = start_point[2] if len(start_point) > 2 else start_point
-    p1, p2, p3 = end_point[:3]
-    flag = end_point[3] if len(end_point) == 4 else 0
-    p0_1 = add_points(mult_point(p0, (1.0 - t)), mult_point(p1, t))
-    p1_2 = add_points(mult_point(p1, (1.0 - t)), mult_point(p2, t))
-    p2_3 = add_points(mult_point(p2, (1.0 - t)), mult_point(p3, t))
-    p01_12 = add_points(mult_point(p0_1, (1.0 - t)), mult_point(p1_2, t))
-    p12_23 = add_points(mult_point(p1_2, (1.0 - t)), mult_point(p2_3, t))
-    p0112_1223 = add_points(mult_point(p01_12, (1.0 - t)),
-                            mult_point(p12_23, t))
-    new_point = [p0_1, p01_12, p0112_1223, flag]
-    new_end_point = [p12_23, p2_3, p3, flag]
-    return new_point, new_end_point
 
+# ------------- Flattering -------------
 
 def base_point(point):
     return point if len(point) == 2 else point[2]
 
 
-def check_flatness(p0, p1, p2, tlr=0.5):
-    p0, p1, p2 = (base_point(p) for p in (p0, p1, p2))
-    if p0 == p1 or p1 == p2:
+def _is_flat(vx1, vy1, vx2, vy2, tan_tlr, tlr):
+    """
+    Checks that angle between chord vectors is less than tolerance.
+    Zero length chord is flat.
+    """
+    if not (vx1 or vy1) or not (vx2 or vy2):
         return True
-    a1 = get_point_angle(p1, p0)
-    a2 = get_point_angle(p2, p1)
-    return abs(a2 - a1) < tlr
+    cross = vx1 * vy2 - vy1 * vx2
+    dot = vx1 * vx2 + vy1 * vy2
+    if tan_tlr is None:
+        return abs(math.atan2(cross, dot)) < tlr
+    return dot > 0.0 and abs(cross) < tan_tlr * dot
+
+
+def flat_bezier(buf, x0, y0, x1, y1, x2, y2, x3, y3, tlr=0.5):
+    """
+    Flattens cubic Bezier segment appending x,y pairs of resulted
+    polyline (without start point) into buf (array('d') or list).
+
+    Segment is split in half while angle between chords
+    start-middle and middle-end is not less than tlr (in radians).
+    Uses explicit stack instead of recursion.
+    """
+    tan_tlr = math.tan(tlr) if tlr < math.pi / 2.0 else None
+    extend = buf.extend
+    stack = [(x0, y0, x1, y1, x2, y2, x3, y3, 0)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        x0, y0, x1, y1, x2, y2, x3, y3, depth = pop()
+        x01 = (x0 + x1) * 0.5
+        y01 = (y0 + y1) * 0.5
+        x12 = (x1 + x2) * 0.5
+        y12 = (y1 + y2) * 0.5
+        x23 = (x2 + x3) * 0.5
+        y23 = (y2 + y3) * 0.5
+        xa = (x01 + x12) * 0.5
+        ya = (y01 + y12) * 0.5
+        xb = (x12 + x23) * 0.5
+        yb = (y12 + y23) * 0.5
+        xm = (xa + xb) * 0.5
+        ym = (ya + yb) * 0.5
+        vx1 = xm - x0
+        vy1 = ym - y0
+        vx2 = x3 - xm
+        vy2 = y3 - ym
+        if tan_tlr is None:
+            flat = _is_flat(vx1, vy1, vx2, vy2, tan_tlr, tlr)
+        else:
+            # inlined _is_flat()
+            dot = vx1 * vx2 + vy1 * vy2
+            flat = not (vx1 or vy1) or not (vx2 or vy2) or \
+                (dot > 0.0 and abs(vx1 * vy2 - vy1 * vx2) < tan_tlr * dot)
+        if flat or depth >= MAX_DEPTH:
+            extend((xm, ym, x3, y3))
+        else:
+            # second half is pushed first to be processed last
+            push((xm, ym, xb, yb, x23, y23, x3, y3, depth + 1))
+            push((x0, y0, x01, y01, xa, ya, xm, ym, depth + 1))
+    return buf
 
 
 def flat_segment(start_point, end_point, tlr=0.5):
-    ret = []
-    p0 = start_point
-    p1, p2 = split_segment(start_point, end_point)
-    if check_flatness(p0, p1, p2, tlr):
-        ret += [base_point(p) for p in (p0, p1, p2)]
-    else:
-        ret += flat_segment(p0, p1, tlr)[:-1]
-        ret += flat_segment(p1, p2, tlr)
-    return ret
+    p0 = base_point(start_point)
+    (x1, y1), (x2, y2), (x3, y3) = end_point[:3]
+    buf = flat_bezier(array('d'), p0[0], p0[1], x1, y1, x2, y2, x3, y3, tlr)
+    return [[] + p0] + [[buf[i], buf[i + 1]] for i in range(0, len(buf), 2)]
 
 
 def flat_path(path, tlr=0.1):
-    path = deepcopy(path)
     ret_points = []
-    start = path[0]
+    start = base_point(path[0])
+    buf = array('d')
     for point in path[1]:
         if len(point) == 2:
-            ret_points.append(point)
+            ret_points.append([] + point)
+            start = point
         else:
-            ret_points += flat_segment(start, point, tlr)[1:]
-        start = point
+            (x1, y1), (x2, y2), (x3, y3) = point[:3]
+            del buf[:]
+            flat_bezier(buf, start[0], start[1], x1, y1, x2, y2, x3, y3, tlr)
+            ret_points += [[buf[i], buf[i + 1]]
+                           for i in range(0, len(buf), 2)]
+            start = point[2]
     if path[2] and path[0] != ret_points[-1]:
         ret_points.append([] + path[0])
-    return [path[0], ret_points, path[2]]
+    return [[] + path[0], ret_points, path[2]]
+
+
+def flat_packed_paths(paths, tlr=0.1):
+    ret = PackedPaths()
+    pts = paths.points
+    out = ret.points
+    for index in range(len(paths)):
+        start, end = paths.get_node_range(index)
+        if start == end:
+            continue
+        pos = 2 * paths.path_points[index]
+        x0, y0 = first = [pts[pos], pts[pos + 1]]
+        ret.start_path(first)
+        size = len(out)
+        for seg in paths.nodes[start:end]:
+            if seg == SEG_LINE:
+                x0, y0 = pts[pos + 2], pts[pos + 3]
+                out.extend((x0, y0))
+                pos += 2
+            else:
+                flat_bezier(out, x0, y0, *pts[pos + 2:pos + 8], tlr=tlr)
+                x0, y0 = pts[pos + 6], pts[pos + 7]
+                pos += 6
+        ret.nodes.extend(array('b', [SEG_LINE]) * ((len(out) - size) // 2))
+        if paths.closed[index]:
+            if first != [x0, y0]:
+                ret.append_point(first)
+            ret.close_path(paths.closed[index])
+    return ret
 
 
 def flat_paths(paths, tlr=0.1):
+    if isinstance(paths, PackedPaths):
+        return flat_packed_paths(paths, tlr)
     return [flat_path(path, tlr) for path in paths if path[1]]
 
 
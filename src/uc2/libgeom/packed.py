@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compact paths storage.
+
+PACKED PATHS DEFINITION:
+points - array('d') of x,y coordinates: path start point followed
+         by node points (one pair for line node, three pairs for curve node)
+nodes - array('b') of node types: SEG_LINE, SEG_CURVE (curve point
+        without marker) or curve point marker (NODE_CUSP, NODE_SMOOTH...)
+path_nodes - array('l') of the first node index for every path
+path_points - array('l') of the start point (pair) index for every path
+closed - array('b') of path end markers (CURVE_CLOSED, CURVE_OPENED)
+
+PackedPaths behaves as sequence of paths, but indexing and iteration
+return new path lists, so changing items of returned path does not change
+stored paths. Changed path should be assigned back (paths[index] = path)
+or new paths should be assigned to curve.
+"""
+
+import gc
+from array import array
+
+from uc2 import libcairo, sk2const
+
+SEG_LINE = -1
+SEG_CURVE = -2
+
+
+def _cubic_extrema(a, b, c, d):
+    """
+    Returns coordinate values of cubic Bezier extremums inside (0,1).
+    """
+    ka = -a + 3.0 * (b - c) + d
+    kb = 2.0 * (a - 2.0 * b + c)
+    kc = b - a
+    if abs(ka) < 1e-12:
+        roots = [-kc / kb] if abs(kb) > 1e-12 else []
+    else:
+        disc = kb * kb - 4.0 * ka * kc
+        if disc < 0.0:
+            return []
+        disc **= 0.5
+        roots = [(-kb + disc) / (2.0 * ka), (-kb - disc) / (2.0 * ka)]
+    ret = []
+    for t in roots:
+        if 0.0 < t < 1.0:
+            mt = 1.0 - t
+            ret.append(mt * mt * mt * a + 3.0 * mt * mt * t * b +
+                       3.0 * mt * t * t * c + t * t * t * d)
+    return ret
+
+
+class PackedPaths(object):
+    """
+    Array based storage of paths.
+    """
+    points = None
+    nodes = None
+    path_nodes = None
+    path_points = None
+    closed = None
+
+    def __init__(self, paths=None):
+        self.points = array('d')
+        self.nodes = array('b')
+        self.path_nodes = array('l')
+        self.path_points = array('l')
+        self.closed = array('b')
+        for path in paths or []:
+            self.add_path(path)
+
+    @classmethod
+    def from_paths(cls, paths):
+        if isinstance(paths, cls):
+            return paths
+        return cls(paths)
+
+    # --- Building
+
+    def start_path(self, point):
+        if len(point) != 2:
+            raise ValueError('Wrong path start point %s' % repr(point))
+        self.path_nodes.append(len(self.nodes))
+        self.path_points.append(len(self.points) // 2)
+        self.closed.append(sk2const.CURVE_OPENED)
+        self.points.extend(point)
+
+    def append_point(self, point):
+        if len(point) == 2:
+            self.nodes.append(SEG_LINE)
+            self.points.extend(point)
+        else:
+            self.nodes.append(int(point[3]) if len(point) > 3 else SEG_CURVE)
+            self.points.extend(point[0])
+            self.points.extend(point[1])
+            self.points.extend(point[2])
+
+    def close_path(self, marker=sk2const.CURVE_CLOSED):
+        self.closed[-1] = int(marker)
+
+    def add_path(self, path):
+        self.start_path(path[0])
+        # inlined append_point()
+        add_node = self.nodes.append
+        add_coords = self.points.extend
+        for point in path[1]:
+            if len(point) == 2:
+                add_node(SEG_LINE)
+                add_coords(point)
+            else:
+                add_node(int(point[3]) if len(point) > 3 else SEG_CURVE)
+                add_coords(point[0])
+                add_coords(point[1])
+                add_coords(point[2])
+        self.close_path(path[2])
+
+    # --- Unpacking
+
+    def get_node_range(self, index):
+        end = self.path_nodes[index + 1] if index + 1 < len(self.path_nodes) \
+            else len(self.nodes)
+        return self.path_nodes[index], end
+
+    def get_path(self, index):
+        pts = self.points
+        pos = 2 * self.path_points[index]
+        start, end = self.get_node_range(index)
+        points = []
+        for seg in self.nodes[start:end]:
+            if seg == SEG_LINE:
+                points.append([pts[pos + 2], pts[pos + 3]])
+                pos += 2
+            else:
+                point = [[pts[pos + 2], pts[pos + 3]],
+                         [pts[pos + 4], pts[pos + 5]],
+                         [pts[pos + 6], pts[pos + 7]]]
+                if seg != SEG_CURVE:
+                    point.append(seg)
+                points.append(point)
+                pos += 6
+        start_point = [pts[2 * self.path_points[index]],
+                       pts[2 * self.path_points[index] + 1]]
+        return [start_point, points, self.closed[index]]
+
+    def to_paths(self):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return [self.get_path(index) for index in range(len(self))]
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    # --- Sequence protocol
+
+    def __len__(self):
+        return len(self.path_nodes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get_path(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('paths index out of range')
+        return self.get_path(index)
+
+    def __setitem__(self, index, path):
+        paths = self.to_paths()
+        paths[index] = path
+        self.__init__(paths)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.get_path(index)
+
+    def __add__(self, other):
+        return self.to_paths() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.to_paths()
+
+    def __eq__(self, other):
+        if isinstance(other, PackedPaths):
+            return self.nodes == other.nodes and \
+                   self.closed == other.closed and \
+                   self.path_nodes == other.path_nodes and \
+                   self.points == other.points
+        if isinstance(other, list):
+            return self.to_paths() == other
+        return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __str__(self):
+        return self.to_paths().__str__()
+
+    __repr__ = __str__
+
+    def copy(self):
+        ret = PackedPaths()
+        ret.points = self.points[:]
+        ret.nodes = self.nodes[:]
+        ret.path_nodes = self.path_nodes[:]
+        ret.path_points = self.path_points[:]
+        ret.closed = self.closed[:]
+        return ret
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # --- Bulk operations
+
+    def apply_trafo(self, trafo):
+        """
+        Transforms all points in place.
+        """
+        libcairo.apply_trafo_to_buffer(self.points, trafo)
+        return self
+
+    def transformed(self, trafo):
+        return self.copy().apply_trafo(trafo)
+
+    def get_bbox(self):
+        """
+        Returns exact bbox of paths.
+        Control points are checked only when they are out of bbox of
+        path nodes.
+        """
+        if not self.points:
+            return [0.0, 0.0, 0.0, 0.0]
+        pts = self.points
+        xs = []
+        ys = []
+        curves = []
+        for index in range(len(self)):
+            pos = 2 * self.path_points[index]
+            xs.append(pts[pos])
+            ys.append(pts[pos + 1])
+            start, end = self.get_node_range(index)
+            for seg in self.nodes[start:end]:
+                if seg == SEG_LINE:
+                    pos += 2
+                else:
+                    curves.append(pos)
+                    pos += 6
+                xs.append(pts[pos])
+                ys.append(pts[pos + 1])
+        x0, x1 = min(xs), max(xs)
+        y0, y1 = min(ys), max(ys)
+        for pos in curves:
+            for axis in (0, 1):
+                a, b, c, d = pts[pos + axis:pos + axis + 8:2]
+                vmin, vmax = (x0, x1) if not axis else (y0, y1)
+                if vmin <= b <= vmax and vmin <= c <= vmax:
+                    continue
+                for value in _cubic_extrema(a, b, c, d):
+                    vmin = min(vmin, value)
+                    vmax = max(vmax, value)
+                if not axis:
+                    x0, x1 = vmin, vmax
+                else:
+                    y0, y1 = vmin, vmax
+        return [x0, y0, x1, y1]
+
+
+def pack_paths(paths):
+    return PackedPaths.from_paths(paths)
+
+
+def unpack_paths(paths):
+    if isinstance(paths, PackedPaths):
+        return paths.to_paths()
+    return paths
+
+
+def is_packed(paths):
+    return isinstance(paths, PackedPaths)
@@ -21,6 +21,7 @@ import math
 from copy import deepcopy
 
 from bbox import is_bbox_overlap, sum_bbox
+from bbox_index import BBoxIndex
 from bezier_ops import bezier_base_point, get_paths_bbox
 from cwrap import create_cpath
 from points import mult_point, add_points, distance, midpoint
@@ -574,39 +575,121 @@ def get_approx_paths(paths):
     return approx_paths
 
 
+def find_bbox_pairs(bboxes):
+    """
+    Returns list of (i, j), i < j, index pairs of overlapped bboxes.
+    Bboxes are placed into uniform grid and only bboxes sharing grid cell
+    are compared. Pair is reported in the cell containing minimal corner
+    of bboxes intersection, so every pair is reported once.
+    """
+    if len(bboxes) < 2:
+        return []
+    num = float(len(bboxes))
+    x0 = min(bbox[0] for bbox in bboxes)
+    y0 = min(bbox[1] for bbox in bboxes)
+    w = max(bbox[2] for bbox in bboxes) - x0
+    h = max(bbox[3] for bbox in bboxes) - y0
+    # cell is not less than average bbox and grid has up to 4 cells per bbox
+    size = sum(max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+               for bbox in bboxes) / num
+    size = max(size, math.sqrt(w * h / (4.0 * num)),
+               max(w, h) / (4.0 * num), 1e-9)
+
+    cells = {}
+    for idx, (bx0, by0, bx1, by1) in enumerate(bboxes):
+        for cx in range(int((bx0 - x0) / size), int((bx1 - x0) / size) + 1):
+            for cy in range(int((by0 - y0) / size),
+                            int((by1 - y0) / size) + 1):
+                key = (cx, cy)
+                if key in cells:
+                    cells[key].append(idx)
+                else:
+                    cells[key] = [idx]
+
+    ret = []
+    for (cx, cy), items in cells.iteritems():
+        if len(items) < 2:
+            continue
+        for k, i in enumerate(items):
+            ax0, ay0, ax1, ay1 = bboxes[i]
+            for j in items[k + 1:]:
+                bx0, by0, bx1, by1 = bboxes[j]
+                if ax0 > bx1 or bx0 > ax1 or ay0 > by1 or by0 > ay1:
+                    continue
+                rx = ax0 if ax0 > bx0 else bx0
+                ry = ay0 if ay0 > by0 else by0
+                if int((rx - x0) / size) == cx and \
+                        int((ry - y0) / size) == cy:
+                    ret.append((i, j) if i < j else (j, i))
+    return ret
+
+
+def get_segment_pairs(approx_paths):
+    """
+    Returns pairs of approximated segments which bboxes are overlapped.
+    Segment is (path index, partial index, point index) tuple.
+    Bboxes are enlarged by rounding tolerance to keep all cross points
+    found by cross_point().
+    """
+    tolerance = 10.0 ** (1 - PRECISION)
+    segments = []
+    bboxes = []
+    for i, partials in enumerate(approx_paths):
+        for k, partial in enumerate(partials):
+            approx_path = partial[1]
+            for p in range(1, len(approx_path)):
+                (x0, y0), (x1, y1) = approx_path[p - 1][0], approx_path[p][0]
+                segments.append((i, k, p))
+                bboxes.append((min(x0, x1) - tolerance, min(y0, y1) - tolerance,
+                               max(x0, x1) + tolerance, max(y0, y1) + tolerance))
+    return [(segments[a], segments[b]) for a, b in find_bbox_pairs(bboxes)]
+
+
+def cross_point(p0, p1, p2, p3):
+    if equal(p0, p2):
+        return p0
+    elif equal(p0, p3) or equal(p1, p2) or equal(p1, p3):
+        return None
+    return intersect_lines(p0, p1, p2, p3)
+
+
+def intersect_approx_paths(approx_paths):
+    """
+    Finds cross points of approximated paths which belong to different
+    objects and registers them in path objects. Cross points are
+    processed in the same order as all-pairs comparison of path partials
+    does.
+    """
+    candidates = []
+    for (i, k1, p), (j, k2, q) in get_segment_pairs(approx_paths):
+        if i != j:
+            candidates.append((i, j, k1, k2, p, q))
+    candidates.sort()
+
+    cross_point_id = 0
+    for i, j, k1, k2, p, q in candidates:
+        path1, approx_path1, rect1 = approx_paths[i][k1]
+        path2, approx_path2, rect2 = approx_paths[j][k2]
+        if path1.obj_id == path2.obj_id or not is_bbox_overlap(rect1, rect2):
+            continue
+        (p0, t0), (p1, t1) = approx_path1[p - 1:p + 1]
+        (p2, t2), (p3, t3) = approx_path2[q - 1:q + 1]
+        cp = cross_point(p0, p1, p2, p3)
+        if cp is not None:
+            index1 = index(cp, p0, t0, p1, t1)
+            index2 = index(cp, p2, t2, p3, t3)
+            path1.cp_indexes.append(index1)
+            path1.cp_dict[index1] = cross_point_id
+            path2.cp_indexes.append(index2)
+            path2.cp_dict[index2] = cross_point_id
+            cross_point_id += 1
+
+
 def intersect_objects(curve_objs):
     paths = []
     for i in range(len(curve_objs)):
         paths += curve_objs[i].paths()
-    approx_paths = get_approx_paths(paths)
-
-    cross_point_id = 0
-    for i in range(len(approx_paths)):
-        for j in range(i + 1, len(approx_paths)):
-            for path1, approx_path1, rect1 in approx_paths[i]:
-                for path2, approx_path2, rect2 in approx_paths[j]:
-                    if not path1.obj_id == path2.obj_id and \
-                            is_bbox_overlap(rect1, rect2):
-                        for p in range(1, len(approx_path1)):
-                            (p0, t0), (p1, t1) = approx_path1[p - 1:p + 1]
-                            for q in range(1, len(approx_path2)):
-                                (p2, t2), (p3, t3) = approx_path2[q - 1:q + 1]
-                                if equal(p0, p2):
-                                    cp = p0
-                                elif equal(p0, p3) or \
-                                        equal(p1, p2) or \
-                                        equal(p1, p3):
-                                    cp = None
-                                else:
-                                    cp = intersect_lines(p0, p1, p2, p3)
-                                if cp is not None:
-                                    index1 = index(cp, p0, t0, p1, t1)
-                                    index2 = index(cp, p2, t2, p3, t3)
-                                    path1.cp_indexes.append(index1)
-                                    path1.cp_dict[index1] = cross_point_id
-                                    path2.cp_indexes.append(index2)
-                                    path2.cp_dict[index2] = cross_point_id
-                                    cross_point_id += 1
+    intersect_approx_paths(get_approx_paths(paths))
     result = []
     for obj in curve_objs:
         for path in obj.paths():
@@ -616,35 +699,7 @@ def intersect_objects(curve_objs):
 
 def intersect_segments(path1, path2):
     paths = [PathObject(path1, 0), PathObject(path2, 1)]
-    approx_paths = get_approx_paths(paths)
-
-    cross_point_id = 0
-    for i in range(len(approx_paths)):
-        for j in range(i + 1, len(approx_paths)):
-            for path1, approx_path1, rect1 in approx_paths[i]:
-                for path2, approx_path2, rect2 in approx_paths[j]:
-                    if not path1.obj_id == path2.obj_id and \
-                            is_bbox_overlap(rect1, rect2):
-                        for p in range(1, len(approx_path1)):
-                            (p0, t0), (p1, t1) = approx_path1[p - 1:p + 1]
-                            for q in range(1, len(approx_path2)):
-                                (p2, t2), (p3, t3) = approx_path2[q - 1:q + 1]
-                                if equal(p0, p2):
-                                    cp = p0
-                                elif equal(p0, p3) or \
-                                        equal(p1, p2) or \
-                                        equal(p1, p3):
-                                    cp = None
-                                else:
-                                    cp = intersect_lines(p0, p1, p2, p3)
-                                if cp is not None:
-                                    index1 = index(cp, p0, t0, p1, t1)
-                                    index2 = index(cp, p2, t2, p3, t3)
-                                    path1.cp_indexes.append(index1)
-                                    path1.cp_dict[index1] = cross_point_id
-                                    path2.cp_indexes.append(index2)
-                                    path2.cp_dict[index2] = cross_point_id
-                                    cross_point_id += 1
+    intersect_approx_paths(get_approx_paths(paths))
 
     result = [[], []]
     if not paths[0].cp_indexes:
@@ -674,51 +729,42 @@ def intersect_segments(path1, path2):
 
 def self_intersect(curve_obj):
     paths = curve_obj.paths()
-    approx_paths = get_approx_paths(paths)
+    approx_paths = get_approx_paths(paths)[:1]
+    partials = approx_paths[0]
+
+    # partials are compared in both orders starting from the last one
+    num = len(partials)
+    candidates = []
+    for (_i, k1, p), (_j, k2, q) in get_segment_pairs(approx_paths):
+        if k1 != k2:
+            pos1, pos2 = (k1 + 1) % num, (k2 + 1) % num
+            candidates.append((pos1, pos2, p, q, k1, k2))
+            candidates.append((pos2, pos1, q, p, k2, k1))
+    candidates.sort()
 
     cross_point_id = 0
-    approx_paths = approx_paths[0]
-
-    for i in range(-1, len(approx_paths) - 1):
-        path1, approx_path1, rect1 = approx_paths[i]
-        for j in range(-1, len(approx_paths) - 1):
-            if i == j:
-                continue
-            path2, approx_path2, rect2 = approx_paths[j]
-            if is_bbox_overlap(rect1, rect2):
-                for p in range(1, len(approx_path1)):
-                    (p0, t0), (p1, t1) = approx_path1[p - 1:p + 1]
-                    for q in range(1, len(approx_path2)):
-                        (p2, t2), (p3, t3) = approx_path2[q - 1:q + 1]
-                        if equal(p0, p2):
-                            cp = p0
-                        elif equal(p0, p3) or \
-                                equal(p1, p2) or \
-                                equal(p1, p3):
-                            cp = None
-                        else:
-                            cp = intersect_lines(p0, p1, p2, p3)
-                        if cp is not None:
-                            index1 = index(cp, p0, t0, p1, t1)
-                            index2 = index(cp, p2, t2, p3, t3)
-                            if index1 not in path1.cp_indexes:
-                                path1.cp_indexes.append(index1)
-                                path1.cp_dict[index1] = cross_point_id
-                            if index2 not in path2.cp_indexes:
-                                path2.cp_indexes.append(index2)
-                                path2.cp_dict[index2] = cross_point_id
-                            cross_point_id += 1
+    for _pos1, _pos2, p, q, k1, k2 in candidates:
+        path1, approx_path1, rect1 = partials[k1]
+        path2, approx_path2, rect2 = partials[k2]
+        if not is_bbox_overlap(rect1, rect2):
+            continue
+        (p0, t0), (p1, t1) = approx_path1[p - 1:p + 1]
+        (p2, t2), (p3, t3) = approx_path2[q - 1:q + 1]
+        cp = cross_point(p0, p1, p2, p3)
+        if cp is not None:
+            index1 = index(cp, p0, t0, p1, t1)
+            index2 = index(cp, p2, t2, p3, t3)
+            if index1 not in path1.cp_indexes:
+                path1.cp_indexes.append(index1)
+                path1.cp_dict[index1] = cross_point_id
+            if index2 not in path2.cp_indexes:
+                path2.cp_indexes.append(index2)
+                path2.cp_dict[index2] = cross_point_id
+            cross_point_id += 1
 
     return paths[0].split()
 
 
-def find_cross_id(path_objs, cross_id):
-    for item in path_objs:
-        if item.end_id == cross_id or item.start_id == cross_id:
-            return item
-    return None
-
-
 def contained(curve_obj, path_obj):
     for item in path_obj.get_points():
         if not curve_obj.is_point_inside(item):
@@ -777,27 +823,94 @@ def intersect_and_join(paths1, paths2, rule=INTERSECT_RULE):
         else:
             buff.append(item)
 
-    while len(buff):
-        start = buff[0]
+    result = [item.get_path() for item in join_path_objs(buff, closed_paths)]
+    for obj in objs:
+        obj.destroy()
+    return result
+
 
+def join_path_objs(buff, closed_paths=None):
+    """
+    Joins splitted path objects by cross point ids.
+    Every chain is collected first and its segments are concatenated
+    once, so joining is linear in total number of segments.
+    Returns list of resulting path objects.
+    """
+    closed_paths = closed_paths or []
+    ends = {}
+    for idx, item in enumerate(buff):
+        ends.setdefault(item.start_id, []).append(idx)
+        if item.end_id != item.start_id:
+            ends.setdefault(item.end_id, []).append(idx)
+    used = [False] * len(buff)
+
+    for idx, start in enumerate(buff):
+        if used[idx]:
+            continue
+        used[idx] = True
+        chain = [start]
+        end_id = start.end_id
+        while not start.start_id == end_id:
+            cont = None
+            for item in ends.get(end_id, []):
+                if not used[item]:
+                    cont = item
+                    break
+            if cont is None:
+                break
+            used[cont] = True
+            path_obj = buff[cont]
+            if path_obj.end_id == end_id:
+                path_obj = path_obj.reverse_path()
+            chain.append(path_obj)
+            end_id = path_obj.end_id
+        if len(chain) > 1:
+            segs = []
+            for path_obj in chain:
+                segs += path_obj.get_segments()
+            start_id = start.start_id
+            start = PathObject([start.get_start_point(), segs, 0])
+            start.start_id = start_id
+            start.end_id = end_id
         if start.start_id == start.end_id:
             start.close_path()
-            closed_paths.append(start)
-            buff.remove(start)
+        closed_paths.append(start)
+    return closed_paths
+
+
+def unite_and_join(paths_list):
+    """
+    Unites list of paths sets in one pass. Every paths set is a separate
+    filled object. All objects are intersected at once and only those
+    parts of outlines which are not inside any other object are joined
+    into result, so union does not depend on objects order and costs
+    single intersection pass instead of a chain of fuse_paths() calls.
+    """
+    paths_list = [paths for paths in paths_list if paths]
+    if len(paths_list) < 2:
+        return deepcopy(paths_list[0]) if paths_list else []
+    objs = [CurveObject(paths, obj_id)
+            for obj_id, paths in enumerate(paths_list)]
+    index = BBoxIndex([(obj.get_bbox(), obj) for obj in objs])
+    new_paths = intersect_objects(objs)
+
+    buff = []
+    closed_paths = []
+    for item in new_paths:
+        item.update_bbox()
+        inside = False
+        for obj in index.query(item.bbox):
+            if obj.obj_id != item.obj_id and contained(obj, item):
+                inside = True
+                break
+        if inside:
             continue
-        cont = find_cross_id(buff[1:], start.end_id)
-        if cont:
-            start = start.join_path(cont)
-            buff.remove(cont)
-            buff = [start, ] + buff[1:]
+        if item.is_closed():
+            closed_paths.append(item)
         else:
-            closed_paths.append(start)
-            buff = buff[1:]
-
-    result = []
-    for item in closed_paths:
-        result.append(item.get_path())
+            buff.append(item)
 
+    result = [item.get_path() for item in join_path_objs(buff, closed_paths)]
     for obj in objs:
         obj.destroy()
     return result
@@ -816,6 +929,10 @@ def fuse_paths(paths1, paths2):
     return ret
 
 
+def union_paths(paths_list):
+    return unite_and_join(paths_list)
+
+
 def trim_paths(target_paths, source_paths):
     ret = intersect_and_join(target_paths, source_paths, CUTTING_RULE)
     ret = ret or target_paths
@@ -15,9 +15,11 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import gc
 import math
 
 import cwrap
+from packed import PackedPaths
 
 NORMAL_TRAFO = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
 
@@ -36,40 +38,62 @@ def trafo_rotate_grad(grad, cx=0.0, cy=0.0):
     return trafo_rotate(angle, cx, cy)
 
 
-def _apply_trafo_to_point(point, trafo):
-    x0, y0 = point
-    m11, m21, m12, m22, dx, dy = trafo
-    x1 = m11 * x0 + m12 * y0 + dx
-    y1 = m21 * x0 + m22 * y0 + dy
-    return [x1, y1]
-
-
 def apply_trafo_to_point(point, trafo):
+    m11, m21, m12, m22, dx, dy = trafo
     if len(point) == 2:
-        return _apply_trafo_to_point(point, trafo)
-    else:
-        return [_apply_trafo_to_point(point[0], trafo),
-                _apply_trafo_to_point(point[1], trafo),
-                _apply_trafo_to_point(point[2], trafo), point[3]]
+        x, y = point
+        return [m11 * x + m12 * y + dx, m21 * x + m22 * y + dy]
+    (x1, y1), (x2, y2), (x3, y3) = point[:3]
+    return [[m11 * x1 + m12 * y1 + dx, m21 * x1 + m22 * y1 + dy],
+            [m11 * x2 + m12 * y2 + dx, m21 * x2 + m22 * y2 + dy],
+            [m11 * x3 + m12 * y3 + dx, m21 * x3 + m22 * y3 + dy], point[3]]
 
 
 def apply_trafo_to_points(points, trafo):
-    return [apply_trafo_to_point(point, trafo) for point in points]
+    """
+    Batch version of apply_trafo_to_point() which avoids
+    per point function calls and trafo unpacking.
+    """
+    m11, m21, m12, m22, dx, dy = trafo
+    ret = []
+    append = ret.append
+    for point in points:
+        if len(point) == 2:
+            x, y = point
+            append([m11 * x + m12 * y + dx, m21 * x + m22 * y + dy])
+        else:
+            (x1, y1), (x2, y2), (x3, y3) = point[:3]
+            append([[m11 * x1 + m12 * y1 + dx, m21 * x1 + m22 * y1 + dy],
+                    [m11 * x2 + m12 * y2 + dx, m21 * x2 + m22 * y2 + dy],
+                    [m11 * x3 + m12 * y3 + dx, m21 * x3 + m22 * y3 + dy],
+                    point[3]])
+    return ret
 
 
 def apply_trafo_to_path(path, trafo):
     return [apply_trafo_to_point(path[0], trafo),
-            [apply_trafo_to_point(point, trafo) for point in path[1]],
-            path[2]]
+            apply_trafo_to_points(path[1], trafo), path[2]]
 
 
 def apply_trafo_to_paths(paths, trafo):
-    return [apply_trafo_to_path(path, trafo) for path in paths]
+    if isinstance(paths, PackedPaths):
+        return paths.transformed(trafo)
+    # Point lists are not cyclic, so collector passes triggered by
+    # allocation of millions of lists are pure overhead
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [apply_trafo_to_path(path, trafo) for path in paths]
+    finally:
+        if gc_enabled:
+            gc.enable()
 
 
 def apply_trafo_to_bbox(bbox, trafo):
-    p0, p1 = apply_trafo_to_points([bbox[:2], bbox[2:]], trafo)
-    return p0 + p1
+    x0, y0, x1, y1 = bbox
+    m11, m21, m12, m22, dx, dy = trafo
+    return [m11 * x0 + m12 * y0 + dx, m21 * x0 + m22 * y0 + dy,
+            m11 * x1 + m12 * y1 + dx, m21 * x1 + m22 * y1 + dy]
 
 
 def get_transformed_paths(obj):
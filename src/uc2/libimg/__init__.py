@@ -24,6 +24,7 @@ from PIL import Image
 
 from uc2 import libgeom
 from uc2.libimg import magickwand
+from uc2.utils import fsutils
 
 LOG = logging.getLogger(__name__)
 
@@ -37,11 +38,14 @@ def get_magickwand_version():
 
 
 def check_image(path):
+    is_memfile = fsutils.is_memfile(path)
     try:
-        Image.open(path)
+        Image.open(path.open() if is_memfile else path)
         LOG.debug('PIL check: True')
         return True
     except Exception:
+        if is_memfile:
+            return magickwand.check_image_blob(path.data)
         return magickwand.check_image_file(path)
 
 
@@ -81,7 +85,7 @@ def generate_preview(presenter, renderer_cls, size=(100, 100),
         rend = renderer_cls(presenter.cms)
         rend.antialias_flag = True
         for item in layers:
-            rend.render(ctx, item.childs)
+            rend.render_layer(ctx, item)
     # ---rendering
     image_stream = StringIO()
     surface.write_to_png(image_stream)
@@ -15,6 +15,7 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
 import logging
 import os
 from base64 import b64decode, b64encode
@@ -26,7 +27,7 @@ from PIL import Image, ImageOps
 from uc2 import uc2const
 from uc2.cms import val_255
 from uc2.libcairo import image_to_surface
-from uc2.utils import fsutils
+from uc2.utils import fsutils, profiler
 from . import magickwand
 
 TIFF_FMT = 'TIFF'
@@ -43,6 +44,7 @@ class ImageHandler(object):
     cdata = None
     ps_cdata = None
     gray_cdata = None
+    digest = None
 
     def __init__(self, pixmap):
         self.pixmap = pixmap
@@ -57,9 +59,30 @@ class ImageHandler(object):
         return self.alpha is not None
 
     def clear_cache(self):
+        """
+        Releases cairo surfaces cached for rendering.
+        """
         self.cdata = None
         self.ps_cdata = None
         self.gray_cdata = None
+        self.digest = None
+
+    def get_digest(self):
+        """
+        Returns SHA-1 hex digest of bitmap and alpha channel content.
+        Equal images have equal digests, so it can be used for
+        deduplication of exported bitmaps.
+        """
+        if self.digest is None:
+            sha = hashlib.sha1()
+            for image in (self.bitmap, self.alpha):
+                if image:
+                    sha.update('%s%s' % (image.mode, image.size))
+                    sha.update(image.tobytes())
+                else:
+                    sha.update('-')
+            self.digest = sha.hexdigest()
+        return self.digest
 
     def _get_saver_fmt(self, image):
         return TIFF_FMT if image.mode == uc2const.IMAGE_CMYK else PNG_FMT
@@ -69,6 +92,7 @@ class ImageHandler(object):
             return None
         fobj = StringIO()
         image.save(fobj, format=self._get_saver_fmt(image))
+        profiler.count(profiler.BITMAPS_ENCODED)
         return fobj.getvalue()
 
     def _str2image(self, image_str=None):
@@ -90,6 +114,7 @@ class ImageHandler(object):
         self.bitmap = bitmap if bitmap else self.bitmap
         self.alpha = alpha if alpha else self.alpha
         self.clear_cache()
+        self.pixmap.set_dirty()
 
     def set_images_from_str(self, bitmap_str=None, alpha_str=None):
         self.set_images(self._str2image(bitmap_str),
@@ -148,7 +173,6 @@ class ImageHandler(object):
             if alpha.mode.endswith('A'):
                 alpha = alpha.split()[-1]
         self.set_images(image, alpha)
-        self.update_cache(cms)
 
     def _load_by_pil(self, cms, fileptr):
         fileptr.seek(0)
@@ -290,7 +314,19 @@ class DrawableImageHandler(ImageHandler):
 
         return image_to_surface(rgb_image)
 
-    def get_surface(self, cms, proofing=False, stroke_mode=False):
+    def get_surface(self, cms, proofing=False, stroke_mode=False,
+                    cached=True):
+        """
+        Returns cairo surface of display image. Surfaces are created
+        on demand only. Not cached surface is not kept by handler,
+        so one-off consumers do not hold RGBA copy of the bitmap.
+        """
+        if not cached:
+            if stroke_mode:
+                surface = self.gray_cdata
+            else:
+                surface = self.ps_cdata if proofing else self.cdata
+            return surface or self._get_surface(cms, proofing, stroke_mode)
         if stroke_mode:
             if not self.gray_cdata:
                 self.gray_cdata = self._get_surface(cms, stroke_mode=True)
@@ -305,6 +341,10 @@ class DrawableImageHandler(ImageHandler):
             return self.cdata
 
     def update_cache(self, cms):
+        """
+        Builds display surface in advance. Loading does not call it,
+        surfaces are created on first rendering.
+        """
         self.get_surface(cms, cms.proofing)
 
 
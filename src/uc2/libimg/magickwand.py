@@ -54,6 +54,16 @@ def check_image_file(filepath):
     return ret == 1
 
 
+def check_image_blob(raw_content):
+    import _libimg
+    _libimg.init_magick()
+    wand = _libimg.new_image()
+    ret = _libimg.load_image_blob(wand, raw_content)
+    _libimg.terminate_magick()
+    LOG.debug('MagickWand check: %s', ret == 1)
+    return ret == 1
+
+
 def process_image(raw_content):
     import _libimg
     LOG.debug('MagickWand processing started')
@@ -18,7 +18,7 @@
 import _libpango
 import cairo
 import os
-from copy import deepcopy
+from collections import OrderedDict
 
 from markup import apply_markup, apply_glyph_markup
 
@@ -38,19 +38,35 @@ def get_version():
 
 
 # --- Glyph caching
+# Glyph outlines are cached as untransformed cairo paths.
+# Cache key contains font description, alignment, layout width
+# and markuped cluster text so glyphs are shared between
+# characters, text objects and documents.
 
-GLYPH_CACHE = {}
+GLYPH_CACHE = OrderedDict()
+GLYPH_CACHE_SIZE = 4096
 
 
-def get_glyph_cache(font_name, char):
-    char = str(char)
-    if font_name in GLYPH_CACHE and char in GLYPH_CACHE[font_name]:
-        return deepcopy(GLYPH_CACHE[font_name][char])
+def get_glyph_cache_key(markuped_text, width, text_style):
+    return (text_style[0], text_style[1], text_style[2], text_style[3],
+            width, markuped_text)
 
 
-def set_glyph_cache(font_name, char, glyph):
-    GLYPH_CACHE[font_name] = GLYPH_CACHE.get(font_name, {})
-    GLYPH_CACHE[font_name][str(char)] = deepcopy(glyph)
+def get_glyph_cache(key):
+    glyph = GLYPH_CACHE.pop(key, None)
+    if glyph is not None:
+        GLYPH_CACHE[key] = glyph
+    return glyph
+
+
+def set_glyph_cache(key, glyph):
+    GLYPH_CACHE[key] = glyph
+    while len(GLYPH_CACHE) > GLYPH_CACHE_SIZE:
+        GLYPH_CACHE.popitem(last=False)
+
+
+def clear_glyph_cache():
+    GLYPH_CACHE.clear()
 
 
 # --- Pango context functionality
@@ -80,15 +96,21 @@ def set_layout(text, width, text_style, markup, layout=PANGO_LAYOUT):
 def set_glyph_layout(text, width, text_style, markup, text_range=None,
                      check_nt=False, layout=PANGO_LAYOUT):
     text_range = text_range or []
+    markuped_text, vpos = apply_glyph_markup(text, text_range, markup, check_nt)
+    set_markuped_glyph_layout(markuped_text, width, text_style,
+                              check_nt, layout)
+    return vpos
+
+
+def set_markuped_glyph_layout(markuped_text, width, text_style,
+                              check_nt=False, layout=PANGO_LAYOUT):
     if not width == -1:
         width *= PANGO_UNITS
     _libpango.set_layout_width(layout, width)
     fnt_descr = get_font_description(text_style, check_nt)
     _libpango.set_layout_font_description(layout, fnt_descr)
     _libpango.set_layout_alignment(layout, text_style[3])
-    markuped_text, vpos = apply_glyph_markup(text, text_range, markup, check_nt)
     _libpango.set_layout_markup(layout, markuped_text)
-    return vpos
 
 
 def layout_path(ctx=CTX, layout=PANGO_LAYOUT):
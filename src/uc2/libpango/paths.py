@@ -21,10 +21,12 @@ import cairo
 from copy import deepcopy
 
 from uc2 import libcairo
+from uc2.utils import profiler
 
 import core
 from core import NONPRINTING_CHARS
 from langs import check_maynmar, check_arabic
+from markup import apply_glyph_markup
 
 
 def cluster_text(text, clusters):
@@ -201,6 +203,28 @@ def get_log_layout_data(layout_data, byte_dict, rtl_regs):
     return log_layout_data
 
 
+def get_glyph_cpath(ctx, text, width, text_style, markup, text_range):
+    """
+    Returns outline of provided glyph cluster and its vertical
+    position shift. Outline is taken from glyph cache if possible.
+    Returned cairo path is a copy and can be transformed in place.
+    """
+    markuped_text, vpos = apply_glyph_markup(text, text_range, markup, True)
+    key = core.get_glyph_cache_key(markuped_text, width, text_style)
+    cpath = core.get_glyph_cache(key)
+    if cpath is None:
+        ctx.new_path()
+        ctx.move_to(0, 0)
+        layout = core.create_layout(ctx)
+        core.set_markuped_glyph_layout(markuped_text, width, text_style,
+                                       True, layout)
+        core.layout_path(ctx, layout)
+        cpath = ctx.copy_path()
+        core.set_glyph_cache(key, cpath)
+        profiler.count(profiler.GLYPHS_SHAPED)
+    return libcairo.copy_cpath(cpath), vpos
+
+
 def get_glyphs(ctx, layout_data, text, width, text_style, markup):
     glyphs = []
     i = -1
@@ -219,20 +243,15 @@ def get_glyphs(ctx, layout_data, text, width, text_style, markup):
                 glyphs.append(None)
                 continue
 
-        ctx.new_path()
-        ctx.move_to(0, 0)
-        layout = core.create_layout(ctx)
         text_range = [i, i + len(item)]
-        vpos = core.set_glyph_layout(item, width, text_style, markup,
-                                     text_range, True, layout)
+        cpath, vpos = get_glyph_cpath(ctx, item, width, text_style, markup,
+                                      text_range)
         if vpos:
             for index in range(*text_range):
                 x, y, w, h, base_line, byte_index = layout_data[index]
                 dh = (y - base_line) * vpos
                 layout_data[index] = (x, y + dh, w, h,
                                       base_line + dh, byte_index)
-        core.layout_path(ctx, layout)
-        cpath = ctx.copy_path()
         m00 = 1.0
         m11 = -1.0
         if os.name == 'nt':
@@ -264,19 +283,14 @@ def get_rtl_glyphs(ctx, layout_data, log_layout_data, byte_dict, rtl_regs,
             glyphs.append(None)
             continue
 
-        ctx.new_path()
-        ctx.move_to(0, 0)
-        layout = core.create_layout(ctx)
-        vpos = core.set_glyph_layout(txt, width, text_style,
-                                     markup, text_range, True, layout)
+        cpath, vpos = get_glyph_cpath(ctx, txt, width, text_style, markup,
+                                      text_range)
         if vpos:
             for index in range(*text_range):
                 x, y, w, h, base_line, byte_index = log_layout_data[index]
                 dh = (y - base_line) * vpos
                 log_layout_data[index] = (x, y + dh, w, h,
                                           base_line + dh, byte_index)
-        core.layout_path(ctx, layout)
-        cpath = ctx.copy_path()
         m00 = 1.0
         m11 = -1.0
         if os.name == 'nt':
@@ -95,6 +95,7 @@ class UCConfig(SerializedConfig):
     cms_cmyk_intent = uc2const.INTENT_PERCEPTUAL
 
     cms_flags = uc2const.cmsFLAGS_NOTPRECALC
+    cms_precalc = False
     cms_proofing = False
     cms_gamutcheck = False
     cms_alarmcodes = (1.0, 0.0, 1.0)
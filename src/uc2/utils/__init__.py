@@ -18,28 +18,75 @@
 import base64
 import math
 import struct
+import threading
 import time
 
 
+class IdGenerator(object):
+    """
+    Collision-free monotonic id generator.
+    By default ids are based on UNIX time (1/100000 sec resolution) and
+    every next id is greater than previous one even if time is not
+    changed. In deterministic mode ids are sequential numbers starting
+    from provided seed, so repeated export produces the same ids.
+    """
+    seed = None
+    last = 0
+
+    def __init__(self, seed=None):
+        self.lock = threading.Lock()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        with self.lock:
+            self.seed = seed
+            self.last = int(seed) if seed is not None else 0
+
+    def is_deterministic(self):
+        return self.seed is not None
+
+    def next_int(self):
+        with self.lock:
+            value = self.last + 1
+            if self.seed is None:
+                value = max(value, int(time.time() * 100000))
+            self.last = value
+            return value
+
+
+ID_GENERATOR = IdGenerator()
+
+
+def set_deterministic_ids(seed=0):
+    """
+    Switches id generation to deterministic mode (or back to time based
+    mode if seed is None).
+    """
+    ID_GENERATOR.reset(seed)
+
+
 def generate_base64_id():
     """
     Generates bas64 encoded id based on UNIX time
     """
-    time.sleep(0.001)
-    return base64.b64encode(str(int(time.time() * 100000)))
+    return base64.b64encode(generate_id())
 
 
 def generate_id():
     """
     Generates numeric id based on UNIX time
     """
-    time.sleep(0.001)
-    return str(int(time.time() * 100000))
+    return str(ID_GENERATOR.next_int())
 
 
 def generate_guid():
+    """
+    Generates GUID. uuid1() is unique within process (timestamps are
+    monotonic), in deterministic mode name based GUID is generated.
+    """
     import uuid
-    time.sleep(0.001)
+    if ID_GENERATOR.is_deterministic():
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, generate_id()))
     return str(uuid.uuid1())
 
 
@@ -21,6 +21,7 @@ import logging
 import os
 import shutil
 import sys
+from cStringIO import StringIO
 
 from uc2 import _, events, msgconst
 from uc2.utils import system
@@ -60,6 +61,8 @@ def upath(path):
 
 
 def isfile(path):
+    if is_memfile(path):
+        return True
     return os.path.isfile(upath(path))
 
 
@@ -71,7 +74,57 @@ def uopen(path, mode='rb'):
     return open(upath(path), mode)
 
 
+class MemoryFile(object):
+    """
+    In-memory file content which can be used instead of file path
+    for format detection and loading. Every opening returns new
+    read-only file object sharing the same data buffer.
+    """
+    data = ''
+    name = ''
+
+    def __init__(self, data, name=''):
+        self.data = data
+        self.name = name
+
+    def open(self):
+        return StringIO(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __str__(self):
+        return self.name or '<memory>'
+
+
+class NonClosingFile(object):
+    """
+    File object wrapper which keeps wrapped file open after saving,
+    so savers can write into caller's stream.
+    """
+    fileptr = None
+
+    def __init__(self, fileptr):
+        self.fileptr = fileptr
+
+    def __getattr__(self, name):
+        return getattr(self.fileptr, name)
+
+    def __str__(self):
+        return '<stream>'
+
+    def close(self):
+        if hasattr(self.fileptr, 'flush'):
+            self.fileptr.flush()
+
+
+def is_memfile(path):
+    return isinstance(path, MemoryFile)
+
+
 def get_fileptr(path, writable=False):
+    if is_memfile(path) and not writable:
+        return path.open()
     if not path:
         msg = _('There is no file path')
         raise IOError(errno.ENODATA, msg, '')
@@ -94,6 +147,8 @@ def lexists(path):
 
 
 def exists(path):
+    if is_memfile(path):
+        return True
     return os.path.exists(upath(path))
 
 
@@ -114,6 +169,8 @@ def copy(src, dest):
 
 
 def getsize(path):
+    if is_memfile(path):
+        return len(path)
     return os.path.getsize(upath(path))
 
 
@@ -125,6 +182,8 @@ def get_file_extension(path):
     """
     Returns file extension without comma.
     """
+    if is_memfile(path):
+        path = path.name
     ext = os.path.splitext(path)[1]
     ext = ext.lower().replace('.', '')
     return ext
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (C) 2015 by Ihor E. Novikov
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License
+#  as published by the Free Software Foundation, either version 3
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Conversion profiling.
+
+Instrumented code reports stages and counters through events.PROFILE
+channel. Signals cost nothing but empty channel iteration while no
+Profiler is connected.
+"""
+
+import gc
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from uc2 import events, uc2const
+
+LOG = logging.getLogger(__name__)
+
+STAGE_START = 'start'
+STAGE_END = 'end'
+COUNTER = 'count'
+DOCUMENT = 'document'
+
+# Stages
+DETECTION = 'detection'
+LOADING = 'loading'
+PARSING = 'parsing'
+UPDATE = 'update'
+SAVING = 'saving'
+WRITING = 'writing'
+CLOSING = 'closing'
+
+# Counters
+COLORS_TRANSFORMED = 'colors_transformed'
+GLYPHS_SHAPED = 'glyphs_shaped'
+BITMAPS_ENCODED = 'bitmaps_encoded'
+
+
+def start_stage(name):
+    events.emit(events.PROFILE, STAGE_START, name, None)
+
+
+def end_stage(name):
+    events.emit(events.PROFILE, STAGE_END, name, None)
+
+
+def count(name, value=1):
+    events.emit(events.PROFILE, COUNTER, name, value)
+
+
+def count_objects(doc):
+    events.emit(events.PROFILE, DOCUMENT, 'objects', doc)
+
+
+def _get_cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+
+class Profiler(object):
+    """
+    Collects stage timings and counters emitted into events.PROFILE.
+
+    Every stage reports wall and CPU time and net change of objects
+    tracked by garbage collector. 'self' values exclude nested stages,
+    so translation time is the self time of loading and saving stages.
+    """
+    stages = None
+    counters = None
+    stack = None
+
+    def __init__(self):
+        self.stages = OrderedDict()
+        self.counters = {}
+        self.stack = []
+
+    def connect(self):
+        events.connect(events.PROFILE, self.receiver)
+
+    def disconnect(self):
+        events.disconnect(events.PROFILE, self.receiver)
+
+    def receiver(self, kind, name, value):
+        if kind == COUNTER:
+            self.counters[name] = self.counters.get(name, 0) + value
+        elif kind == STAGE_START:
+            self.stack.append((name, time.time(), _get_cpu_time(),
+                               len(gc.get_objects()), [0.0, 0.0]))
+        elif kind == STAGE_END:
+            self._end_stage(name)
+        elif kind == DOCUMENT and value is not None:
+            self._count_objects(name, value)
+
+    def _end_stage(self, name):
+        if not self.stack or self.stack[-1][0] != name:
+            LOG.warning('Unbalanced profiling stage "%s"', name)
+            return
+        name, wall0, cpu0, objs0, nested = self.stack.pop()
+        wall = time.time() - wall0
+        cpu = _get_cpu_time() - cpu0
+        if self.stack:
+            self.stack[-1][4][0] += wall
+            self.stack[-1][4][1] += cpu
+        stage = self.stages.setdefault(name, {
+            'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+            'self_wall': 0.0, 'self_cpu': 0.0, 'gc_objects': 0})
+        stage['calls'] += 1
+        stage['wall'] += wall
+        stage['cpu'] += cpu
+        stage['self_wall'] += wall - nested[0]
+        stage['self_cpu'] += cpu - nested[1]
+        stage['gc_objects'] += len(gc.get_objects()) - objs0
+
+    def _count_objects(self, name, doc):
+        names = {}
+        if doc.cid == uc2const.SK2:
+            from uc2.formats.sk2.sk2_cids import CID_TO_NAME
+            names = CID_TO_NAME
+        result = self.counters.setdefault(name, {})
+        objs = [doc.model] if doc.model is not None else []
+        while objs:
+            obj = objs.pop()
+            cid = str(names.get(obj.cid, obj.cid))
+            result[cid] = result.get(cid, 0) + 1
+            objs += obj.childs or []
+
+    def get_report(self):
+        return {'stages': self.stages, 'counters': self.counters}
+
+    def save(self, filepath):
+        with open(filepath, 'wb') as fileptr:
+            json.dump(self.get_report(), fileptr, indent=1)
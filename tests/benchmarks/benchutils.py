@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Common helpers of benchmark scripts.
+"""
+
+import time
+
+
+def parse_args(argv):
+	"""
+	Parses --key=value and --flag arguments into dict.
+	"""
+	options = {}
+	for arg in argv:
+		if arg.startswith('--'):
+			key, _sep, value = arg[2:].partition('=')
+			options[key] = value or True
+	return options
+
+
+def measure(func, repeat=1):
+	"""
+	Calls func repeat times, returns best wall time
+	and result of the last call.
+	"""
+	best = result = None
+	for _i in range(repeat):
+		start = time.time()
+		result = func()
+		wall = time.time() - start
+		best = wall if best is None else min(best, wall)
+	return best, result
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Bezier flattening benchmark on synthetic cutter job.
+
+Compares recursive flattening (implementation used before explicit
+stack engine) with libgeom.flat_paths() on path lists and packed paths.
+Cutter job is a set of closed outlines in plotter units (1/40 mm) as
+PLT saver flattens them, tolerance is plt_tolerance.
+
+Usage:
+	python flattening_benchmark.py [--outlines=2000] [--tolerance=0.1]
+"""
+
+import math
+import random
+import sys
+from copy import deepcopy
+
+from benchutils import parse_args, measure
+from uc2 import libgeom, sk2const
+from uc2.formats.plt.plt_config import PLT_Config
+from uc2.libgeom.flattering import base_point
+from uc2.libgeom.points import add_points, mult_point, get_point_angle
+
+OUTLINES = 2000
+
+
+def split_segment(start_point, end_point, t=0.5):
+	p0 = start_point[2] if len(start_point) > 2 else start_point
+	p1, p2, p3 = end_point[:3]
+	flag = end_point[3] if len(end_point) == 4 else 0
+	p0_1 = add_points(mult_point(p0, (1.0 - t)), mult_point(p1, t))
+	p1_2 = add_points(mult_point(p1, (1.0 - t)), mult_point(p2, t))
+	p2_3 = add_points(mult_point(p2, (1.0 - t)), mult_point(p3, t))
+	p01_12 = add_points(mult_point(p0_1, (1.0 - t)), mult_point(p1_2, t))
+	p12_23 = add_points(mult_point(p1_2, (1.0 - t)), mult_point(p2_3, t))
+	p0112_1223 = add_points(mult_point(p01_12, (1.0 - t)),
+		mult_point(p12_23, t))
+	new_point = [p0_1, p01_12, p0112_1223, flag]
+	new_end_point = [p12_23, p2_3, p3, flag]
+	return new_point, new_end_point
+
+
+def check_flatness(p0, p1, p2, tlr=0.5):
+	p0, p1, p2 = (base_point(p) for p in (p0, p1, p2))
+	if p0 == p1 or p1 == p2:
+		return True
+	a1 = get_point_angle(p1, p0)
+	a2 = get_point_angle(p2, p1)
+	return abs(a2 - a1) < tlr
+
+
+def legacy_flat_segment(start_point, end_point, tlr):
+	ret = []
+	p0 = start_point
+	p1, p2 = split_segment(start_point, end_point)
+	if check_flatness(p0, p1, p2, tlr):
+		ret += [base_point(p) for p in (p0, p1, p2)]
+	else:
+		ret += legacy_flat_segment(p0, p1, tlr)[:-1]
+		ret += legacy_flat_segment(p1, p2, tlr)
+	return ret
+
+
+def legacy_flat_paths(paths, tlr):
+	ret = []
+	for path in paths:
+		if not path[1]:
+			continue
+		path = deepcopy(path)
+		points = []
+		start = path[0]
+		for point in path[1]:
+			if len(point) == 2:
+				points.append(point)
+			else:
+				points += legacy_flat_segment(start, point, tlr)[1:]
+			start = point
+		if path[2] and path[0] != points[-1]:
+			points.append([] + path[0])
+		ret.append([path[0], points, path[2]])
+	return ret
+
+
+def create_outline(rnd):
+	"""
+	Closed wavy outline similar to glyph or sticker contour.
+	"""
+	cx, cy = rnd.uniform(0.0, 40000.0), rnd.uniform(0.0, 40000.0)
+	radius = rnd.uniform(200.0, 4000.0)
+	nodes = rnd.randint(4, 16)
+	points = []
+	for index in range(nodes + 1):
+		angle = 2.0 * math.pi * index / nodes
+		r = radius * rnd.uniform(0.7, 1.0)
+		points.append([cx + r * math.cos(angle), cy + r * math.sin(angle)])
+	start = points[0]
+	path = []
+	for p0, p3 in zip(points[:-1], points[1:]):
+		c1 = [p0[0] + rnd.uniform(-radius, radius) / 3.0,
+			p0[1] + rnd.uniform(-radius, radius) / 3.0]
+		c2 = [p3[0] + rnd.uniform(-radius, radius) / 3.0,
+			p3[1] + rnd.uniform(-radius, radius) / 3.0]
+		path.append([c1, c2, p3, sk2const.NODE_CUSP])
+	return [start, path, sk2const.CURVE_CLOSED]
+
+
+def count_points(paths):
+	return sum(len(path[1]) for path in paths)
+
+
+def main(argv):
+	options = parse_args(argv)
+	outlines = int(options.get('outlines', OUTLINES))
+	tlr = float(options.get('tolerance', PLT_Config.plt_tolerance))
+
+	rnd = random.Random(0)
+	paths = [create_outline(rnd) for _i in range(outlines)]
+	packed = libgeom.pack_paths(paths)
+	print 'Outlines: %d, tolerance: %s' % (outlines, tlr)
+
+	results = [
+		('legacy recursive', measure(
+			lambda: legacy_flat_paths(paths, tlr))),
+		('flat_paths(list)', measure(
+			lambda: libgeom.flat_paths(paths, tlr))),
+		('flat_paths(packed)', measure(
+			lambda: libgeom.flat_paths(packed, tlr))),
+	]
+	base = results[0][1][0]
+	for name, (wall, result) in results:
+		print '%-24s %8.3fs %8.1fx %10d points' % (name, wall,
+			base / wall if wall else 0.0, count_points(result))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Path intersection benchmark.
+
+Compares all-pairs comparison of approximated path partials
+(implementation used before grid index) with grid based
+shaping.intersect_approx_paths() on two overlapped outlines
+with given total number of segments.
+
+Usage:
+	python shaping_benchmark.py [--segments=10000] [--skip-legacy]
+"""
+
+import math
+import random
+import sys
+
+from benchutils import parse_args, measure
+from uc2.libgeom import shaping
+from uc2.libgeom.bbox import is_bbox_overlap
+
+SEGMENTS = 10000
+
+
+def legacy_intersect(approx_paths):
+	cross_point_id = 0
+	for i in range(len(approx_paths)):
+		for j in range(i + 1, len(approx_paths)):
+			for path1, approx_path1, rect1 in approx_paths[i]:
+				for path2, approx_path2, rect2 in approx_paths[j]:
+					if not path1.obj_id == path2.obj_id and \
+							is_bbox_overlap(rect1, rect2):
+						for p in range(1, len(approx_path1)):
+							(p0, t0), (p1, t1) = approx_path1[p - 1:p + 1]
+							for q in range(1, len(approx_path2)):
+								(p2, t2), (p3, t3) = approx_path2[q - 1:q + 1]
+								cp = shaping.cross_point(p0, p1, p2, p3)
+								if cp is not None:
+									index1 = shaping.index(cp, p0, t0, p1, t1)
+									index2 = shaping.index(cp, p2, t2, p3, t3)
+									path1.cp_indexes.append(index1)
+									path1.cp_dict[index1] = cross_point_id
+									path2.cp_indexes.append(index2)
+									path2.cp_dict[index2] = cross_point_id
+									cross_point_id += 1
+
+
+def create_outline(rnd, cx, cy, radius, nodes):
+	"""
+	Closed wavy polygon similar to traced bitmap outline.
+	"""
+	points = []
+	for index in range(nodes):
+		angle = 2.0 * math.pi * index / nodes
+		r = radius * (1.0 + 0.05 * math.sin(40.0 * angle) +
+			rnd.uniform(-0.01, 0.01))
+		points.append([cx + r * math.cos(angle), cy + r * math.sin(angle)])
+	return [points[0], points[1:] + [[] + points[0]], 1]
+
+
+def create_path_objs(outlines):
+	return [shaping.PathObject(path, obj_id)
+		for obj_id, path in enumerate(outlines)]
+
+
+def measure_crossings(func, outlines):
+	path_objs = create_path_objs(outlines)
+	approx_paths = shaping.get_approx_paths(path_objs)
+	wall = measure(lambda: func(approx_paths))[0]
+	return wall, sum(len(item.cp_indexes) for item in path_objs)
+
+
+def main(argv):
+	options = parse_args(argv)
+	segments = int(options.get('segments', SEGMENTS))
+
+	rnd = random.Random(0)
+	outlines = [create_outline(rnd, 0.0, 0.0, 1000.0, segments // 2),
+		create_outline(rnd, 300.0, 100.0, 1000.0, segments // 2)]
+	print 'Segments: %d' % segments
+
+	results = []
+	if not options.get('skip-legacy'):
+		results.append(('legacy all pairs', measure_crossings(legacy_intersect,
+			outlines)))
+	results.append(('intersect_approx_paths', measure_crossings(
+		shaping.intersect_approx_paths, outlines)))
+	base = results[0][1][0]
+	for name, (wall, crossings) in results:
+		print '%-24s %8.3fs %8.1fx %6d cross points' % (name, wall,
+			base / wall if wall else 0.0, crossings)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+SK2 line parsing benchmark.
+
+Compares exec() of compiled SK2 lines (implementation used before
+sk2_parser) with sk2_parser.parse_line() on synthetic curves.
+Exit status is 1 when speedup is less than --min-speedup.
+
+Usage:
+	python sk2_parser_benchmark.py [--objects=5000] [--repeat=3]
+		[--min-speedup=5.0]
+"""
+
+import random
+import sys
+
+from benchutils import parse_args, measure
+from uc2.formats.sk2 import sk2_parser
+
+OBJECTS = 5000
+REPEAT = 3
+MIN_SPEEDUP = 5.0
+
+STYLE = "[[1, 0, ['CMYK', [0.0, 0.0, 0.0, 1.0], 1.0, 'Black']], " \
+	"[0, 0.2834, ['CMYK', [0.0, 0.0, 0.0, 1.0], 1.0, 'Black'], " \
+	"[], 1, 0, 10.433, 0, 0, []], [], []]"
+
+
+class Receiver(object):
+	def obj(self, tag): pass
+
+	def set(self, item, val): pass
+
+	def end(self): pass
+
+
+def create_lines(objects, seed=1):
+	rnd = random.Random(seed)
+	lines = []
+	for index in range(objects):
+		points = [[rnd.random() * 100.0, rnd.random() * 100.0]
+			for _i in range(20)]
+		lines += ["obj('Curve')",
+			"set('paths',%r)" % ([[points[0], points[1:], 1]],),
+			"set('style',%s)" % STYLE,
+			"set('trafo',[1.0, 0.0, 0.0, 1.0, 0.0, 0.0])",
+			"set('name','Curve %d')" % index,
+			"end()"]
+	return lines
+
+
+def legacy_parse(lines, receiver):
+	for line in lines:
+		exec compile('receiver.' + line, '<string>', 'exec')
+
+
+def parse(lines, receiver):
+	for line in lines:
+		cmd, args = sk2_parser.parse_line(line)
+		getattr(receiver, cmd)(*args)
+
+
+def main(argv):
+	options = parse_args(argv)
+	objects = int(options.get('objects', OBJECTS))
+	repeat = int(options.get('repeat', REPEAT))
+	min_speedup = float(options.get('min-speedup', MIN_SPEEDUP))
+
+	lines = create_lines(objects)
+	receiver = Receiver()
+	print 'Objects: %d, lines: %d' % (objects, len(lines))
+
+	exec_time = measure(lambda: legacy_parse(lines, receiver), repeat)[0]
+	parser_time = measure(lambda: parse(lines, receiver), repeat)[0]
+	speedup = exec_time / parser_time if parser_time else 0.0
+	print '%-24s %8.3fs' % ('legacy exec', exec_time)
+	print '%-24s %8.3fs %8.1fx' % ('sk2_parser.parse_line', parser_time,
+		speedup)
+	if speedup < min_speedup:
+		print 'Speedup is less than %.1fx' % min_speedup
+		return 1
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
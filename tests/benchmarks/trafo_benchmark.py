@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Affine transformation micro-benchmark.
+
+Compares per point transformation of path lists (implementation used
+before batch kernels), list based libgeom.apply_trafo_to_paths() and
+in place transformation of packed paths buffer.
+
+Usage:
+	python trafo_benchmark.py [--points=1000000] [--repeat=3]
+"""
+
+import random
+import sys
+
+from benchutils import parse_args, measure
+from uc2 import libgeom, sk2const
+
+POINTS = 1000000
+REPEAT = 3
+TRAFO = [0.5, 0.3, -0.2, 1.5, 10.0, 20.0]
+
+
+def legacy_point(point, trafo):
+	x0, y0 = point
+	m11, m21, m12, m22, dx, dy = trafo
+	return [m11 * x0 + m12 * y0 + dx, m21 * x0 + m22 * y0 + dy]
+
+
+def legacy_node(point, trafo):
+	if len(point) == 2:
+		return legacy_point(point, trafo)
+	return [legacy_point(point[0], trafo), legacy_point(point[1], trafo),
+		legacy_point(point[2], trafo), point[3]]
+
+
+def legacy_paths(paths, trafo):
+	return [[legacy_node(path[0], trafo),
+		[legacy_node(point, trafo) for point in path[1]], path[2]]
+		for path in paths]
+
+
+def create_paths(points, seed=0):
+	"""
+	Creates paths with given number of coordinate pairs,
+	half of nodes are curve ones.
+	"""
+	rnd = random.Random(seed)
+
+	def rnd_point():
+		return [rnd.uniform(-500.0, 500.0), rnd.uniform(-500.0, 500.0)]
+
+	paths = []
+	count = 0
+	while count < points:
+		nodes = []
+		for index in range(1000):
+			if index % 2:
+				nodes.append([rnd_point(), rnd_point(), rnd_point(),
+					sk2const.NODE_CUSP])
+				count += 3
+			else:
+				nodes.append(rnd_point())
+				count += 1
+		paths.append([rnd_point(), nodes, sk2const.CURVE_CLOSED])
+		count += 1
+	return paths
+
+
+def main(argv):
+	options = parse_args(argv)
+	points = int(options.get('points', POINTS))
+	repeat = int(options.get('repeat', REPEAT))
+
+	paths = create_paths(points)
+	packed = libgeom.pack_paths(paths)
+	print 'Paths: %d, points: %d' % (len(paths), len(packed.points) // 2)
+
+	results = [
+		('legacy per point', measure(
+			lambda: legacy_paths(paths, TRAFO), repeat)),
+		('apply_trafo_to_paths(list)', measure(
+			lambda: libgeom.apply_trafo_to_paths(paths, TRAFO), repeat)),
+		('apply_trafo_to_paths(packed)', measure(
+			lambda: libgeom.apply_trafo_to_paths(packed, TRAFO), repeat)),
+		('PackedPaths.apply_trafo', measure(
+			lambda: packed.apply_trafo(TRAFO), repeat)),
+	]
+	base = results[0][1][0]
+	for name, (wall, _result) in results:
+		print '%-32s %8.4fs %8.1fx' % (name, wall,
+			base / wall if wall else 0.0)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
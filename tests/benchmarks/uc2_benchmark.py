@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Conversion benchmark suite.
+
+Generates synthetic SK2 documents (curves, texts, gradients, bitmaps and
+mixed content), saves every document into each format of MODEL_SAVERS
+and loads produced files back by MODEL_LOADERS using translate.convert().
+Every conversion runs in a fresh interpreter process to measure its
+own peak RSS.
+
+Usage:
+	python uc2_benchmark.py [--objects=500] [--baseline=baseline.json]
+		[--save] [--threshold=0.25] [--formats=svg,pdf] [--output=dir]
+
+With --save the results are written into baseline JSON file, otherwise
+they are compared against stored baseline and regressions (wall time
+or peak RSS grown more than threshold) are reported.
+Exit status is 1 when regressions or failures are found.
+"""
+
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from benchutils import parse_args
+from uc2 import uc2_init, uc2const, sk2const
+from uc2.cmds.translate import convert
+from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+	'baseline.json')
+OBJECTS = 500
+THRESHOLD = 0.25
+
+PROFILES = ['curves', 'texts', 'gradients', 'bitmaps', 'mixed']
+PAGE_SIZE = (595.0, 842.0)
+
+APP = None
+
+
+def get_app():
+	global APP
+	if APP is None:
+		APP = uc2_init()
+		APP.init_mngrs()
+	return APP
+
+
+def get_ext(fmt):
+	return uc2const.FORMAT_EXTENSION[fmt][0]
+
+
+# --- Corpus generation
+
+def rnd_point(rnd):
+	w, h = PAGE_SIZE
+	return [rnd.uniform(-w / 2.0, w / 2.0), rnd.uniform(-h / 2.0, h / 2.0)]
+
+
+def rnd_color(rnd, alpha=1.0):
+	return [uc2const.COLOR_RGB, [rnd.random(), rnd.random(), rnd.random()],
+		alpha, '']
+
+
+def rnd_stroke(rnd):
+	return [sk2const.STROKE_MIDDLE, rnd.uniform(0.1, 3.0), rnd_color(rnd),
+		[], sk2const.CAP_BUTT, sk2const.JOIN_MITER, 10.433, 0, 0, []]
+
+
+def rnd_paths(rnd, nodes=12):
+	start = rnd_point(rnd)
+	points = []
+	for _i in range(nodes):
+		if rnd.random() > 0.5:
+			points.append(rnd_point(rnd))
+		else:
+			points.append([rnd_point(rnd), rnd_point(rnd), rnd_point(rnd),
+				sk2const.NODE_CUSP])
+	return [[start, points, sk2const.CURVE_CLOSED]]
+
+
+def create_curve(doc, layer, rnd):
+	fill = [sk2const.FILL_EVENODD, sk2const.FILL_SOLID, rnd_color(rnd)]
+	style = [fill, rnd_stroke(rnd), [], []]
+	return sk2_model.Curve(doc.config, layer, rnd_paths(rnd),
+		[] + sk2const.NORMAL_TRAFO, style)
+
+
+def create_gradient(doc, layer, rnd):
+	gr_type = rnd.choice([sk2const.GRADIENT_LINEAR, sk2const.GRADIENT_RADIAL])
+	alpha = rnd.choice([1.0, 0.5])
+	stops = [[0.0, rnd_color(rnd)], [0.5, rnd_color(rnd, alpha)],
+		[1.0, rnd_color(rnd)]]
+	vector = [rnd_point(rnd), rnd_point(rnd)]
+	fill = [sk2const.FILL_EVENODD, sk2const.FILL_GRADIENT,
+		[gr_type, vector, stops]]
+	rect = rnd_point(rnd) + [rnd.uniform(10.0, 200.0), rnd.uniform(10.0, 200.0)]
+	return sk2_model.Rectangle(doc.config, layer, rect,
+		style=[fill, [], [], []])
+
+
+def create_text(doc, layer, rnd):
+	words = ['UniConvertor', 'benchmark', 'text', 'layout', 'glyph', 'sK1']
+	text = ' '.join(rnd.choice(words) for _i in range(rnd.randint(2, 12)))
+	fill = [sk2const.FILL_EVENODD, sk2const.FILL_SOLID, rnd_color(rnd)]
+	text_style = ['Sans', 'Regular', rnd.uniform(6.0, 36.0),
+		sk2const.TEXT_ALIGN_LEFT, [], True]
+	return sk2_model.Text(doc.config, layer, rnd_point(rnd), text,
+		sk2const.TEXTBLOCK_WIDTH, style=[fill, [], text_style, []])
+
+
+def create_bitmap(doc, layer, rnd):
+	size = (rnd.randint(16, 256), rnd.randint(16, 256))
+	image = Image.new('RGB', size, tuple(rnd.randint(0, 255) for _i in '123'))
+	for _i in range(16):
+		image.putpixel((rnd.randrange(size[0]), rnd.randrange(size[1])),
+			(255, 0, 0))
+	pixmap = sk2_model.Pixmap(doc.config, layer)
+	pixmap.handler.load_from_images(doc.cms, image)
+	pixmap.trafo = [1.0, 0.0, 0.0, 1.0] + rnd_point(rnd)
+	return pixmap
+
+
+CREATORS = {
+	'curves': [create_curve],
+	'texts': [create_text],
+	'gradients': [create_gradient],
+	'bitmaps': [create_bitmap],
+	'mixed': [create_curve, create_text, create_gradient, create_bitmap],
+}
+
+
+def create_document(filepath, profile, objects, seed=0):
+	rnd = random.Random(seed)
+	doc = SK2_Presenter(get_app().appdata)
+	page = doc.methods.get_page()
+	doc.methods.set_page_format(page, ['A4', PAGE_SIZE, uc2const.PORTRAIT])
+	layer = doc.methods.get_layer(page)
+	creators = CREATORS[profile]
+	for index in range(objects):
+		obj = creators[index % len(creators)](doc, layer, rnd)
+		layer.childs.append(obj)
+	doc.update()
+	doc.save(filepath)
+	doc.close()
+
+
+# --- Measurement
+
+RESULT_PREFIX = 'RESULT '
+
+
+def get_peak_rss():
+	"""
+	Returns peak RSS of current process in kilobytes.
+	VmHWM belongs to process memory map, so it does not include memory
+	of parent process unlike ru_maxrss inherited through fork/exec.
+	"""
+	if os.path.exists('/proc/self/status'):
+		with open('/proc/self/status') as fileptr:
+			for line in fileptr:
+				if line.startswith('VmHWM:'):
+					return int(line.split()[1])
+	# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == 'darwin':
+		rss //= 1024
+	return rss
+
+
+def run_conversion(src, dst):
+	"""
+	Child process side: converts file and prints result line.
+	"""
+	app = get_app()
+	start = time.time()
+	status = 'ok'
+	try:
+		convert(app.appdata, [src, dst], {})
+	except Exception as e:
+		status = 'fail: %s' % e
+	wall = time.time() - start
+	print RESULT_PREFIX + json.dumps([status, wall, get_peak_rss()])
+	return 0
+
+
+def measure(src, dst, objects):
+	cmd = [sys.executable, os.path.abspath(__file__), '--child', src, dst]
+	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+	output = proc.communicate()[0]
+	status, wall, rss = 'fail: exit code %s' % proc.returncode, 0.0, 0
+	for line in output.splitlines():
+		if line.startswith(RESULT_PREFIX):
+			status, wall, rss = json.loads(line[len(RESULT_PREFIX):])
+			status = str(status)
+	return {
+		'status': status,
+		'time': round(wall, 4),
+		'rss_kb': rss,
+		'objects_per_sec': round(objects / wall, 2) if wall else 0.0,
+	}
+
+
+def run_benchmarks(workdir, objects, formats=None):
+	results = {}
+	savers = [fmt for fmt in uc2const.MODEL_SAVERS if fmt != uc2const.SK2]
+	loaders = set(uc2const.MODEL_LOADERS)
+	if formats:
+		savers = [fmt for fmt in savers if get_ext(fmt) in formats]
+	sk2_ext = get_ext(uc2const.SK2)
+
+	for profile in PROFILES:
+		src = os.path.join(workdir, '%s.%s' % (profile, sk2_ext))
+		create_document(src, profile, objects)
+		for fmt in savers:
+			ext = get_ext(fmt)
+			dst = os.path.join(workdir, '%s-%s.%s' % (profile, fmt, ext))
+			key = '%s:%s->%s' % (profile, sk2_ext, ext)
+			results[key] = measure(src, dst, objects)
+			report(key, results[key])
+			if fmt not in loaders or not os.path.exists(dst):
+				continue
+			back = os.path.join(workdir, '%s-%s.%s' % (profile, fmt, sk2_ext))
+			key = '%s:%s->%s' % (profile, ext, sk2_ext)
+			results[key] = measure(dst, back, objects)
+			report(key, results[key])
+	return results
+
+
+# --- Reporting
+
+def report(key, result):
+	print '%-28s %8.3fs %10d KB %12.1f obj/s  %s' % (key, result['time'],
+		result['rss_kb'], result['objects_per_sec'], result['status'])
+
+
+def compare(results, baseline, threshold):
+	"""
+	Returns list of regression descriptions.
+	"""
+	regressions = []
+	for key in sorted(results.keys()):
+		result = results[key]
+		if result['status'] != 'ok':
+			regressions.append('%s: %s' % (key, result['status']))
+			continue
+		base = baseline.get(key)
+		if not base or base.get('status') != 'ok':
+			continue
+		for field in ('time', 'rss_kb'):
+			limit = base[field] * (1.0 + threshold)
+			if base[field] and result[field] > limit:
+				regressions.append('%s: %s %s -> %s (+%.0f%%)' % (
+					key, field, base[field], result[field],
+					100.0 * (result[field] / float(base[field]) - 1.0)))
+	return regressions
+
+
+def main(argv):
+	options = parse_args(argv)
+	if options.get('child'):
+		src, dst = [arg for arg in argv if not arg.startswith('--')]
+		return run_conversion(src, dst)
+	objects = int(options.get('objects', OBJECTS))
+	threshold = float(options.get('threshold', THRESHOLD))
+	baseline_path = options.get('baseline', BASELINE)
+	formats = options.get('formats')
+	formats = formats.split(',') if isinstance(formats, str) else None
+
+	workdir = options.get('output')
+	keep_files = bool(workdir)
+	if workdir:
+		if not os.path.isdir(workdir):
+			os.makedirs(workdir)
+	else:
+		workdir = tempfile.mkdtemp(prefix='uc2-bench-')
+
+	try:
+		results = run_benchmarks(workdir, objects, formats)
+	finally:
+		if not keep_files:
+			shutil.rmtree(workdir, True)
+
+	data = {
+		'meta': {
+			'objects': objects,
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+		},
+		'results': results,
+	}
+
+	if options.get('save'):
+		with open(baseline_path, 'wb') as fileptr:
+			json.dump(data, fileptr, indent=1, sort_keys=True)
+		print 'Baseline is saved into', baseline_path
+		return 0
+
+	baseline = {}
+	if os.path.exists(baseline_path):
+		with open(baseline_path, 'rb') as fileptr:
+			stored = json.load(fileptr)
+		if stored['meta']['objects'] != objects:
+			print 'Baseline is recorded for %d objects, comparison skipped' \
+				% stored['meta']['objects']
+		else:
+			baseline = stored['results']
+	else:
+		print 'No baseline found at', baseline_path
+
+	regressions = compare(results, baseline, threshold)
+	for item in regressions:
+		print 'REGRESSION', item
+	return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
@@ -19,10 +19,30 @@ import unittest
 import cms_testsuite
 import _libimg_testsuite
 import image_testsuite
+import sk2_parser_testsuite
+import detector_testsuite
+import bbox_index_testsuite
+import packed_paths_testsuite
+import plt_optimizer_testsuite
+import svg_export_testsuite
+import cmds_testsuite
+import png_export_testsuite
+import sk2_model_testsuite
+import utils_testsuite
 
 suite = unittest.TestSuite()
 suite.addTest(cms_testsuite.get_suite())
 suite.addTest(_libimg_testsuite.get_suite())
 suite.addTest(image_testsuite.get_suite())
+suite.addTest(sk2_parser_testsuite.get_suite())
+suite.addTest(detector_testsuite.get_suite())
+suite.addTest(bbox_index_testsuite.get_suite())
+suite.addTest(packed_paths_testsuite.get_suite())
+suite.addTest(plt_optimizer_testsuite.get_suite())
+suite.addTest(svg_export_testsuite.get_suite())
+suite.addTest(cmds_testsuite.get_suite())
+suite.addTest(png_export_testsuite.get_suite())
+suite.addTest(sk2_model_testsuite.get_suite())
+suite.addTest(utils_testsuite.get_suite())
 
 unittest.TextTestRunner(verbosity=2).run(suite)
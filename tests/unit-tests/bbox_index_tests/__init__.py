@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import random
+import unittest
+
+from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2.sk2_config import SK2_Config
+from uc2.libgeom import BBoxIndex
+
+
+def rnd_bbox(rnd, size=1000.0):
+	x, y = rnd.uniform(0.0, size), rnd.uniform(0.0, size)
+	w, h = rnd.uniform(0.0, size / 10.0), rnd.uniform(0.0, size / 10.0)
+	return [x, y, x + w, y + h]
+
+
+def overlaps(bbox1, bbox2):
+	return bbox1[0] <= bbox2[2] and bbox1[2] >= bbox2[0] and \
+		bbox1[1] <= bbox2[3] and bbox1[3] >= bbox2[1]
+
+
+class Obj(object):
+	is_selectable = True
+
+	def __init__(self, bbox):
+		self.cache_bbox = bbox
+
+	def get_visual_bbox(self):
+		return self.cache_bbox
+
+
+class TestBBoxIndex(unittest.TestCase):
+
+	def test01_query(self):
+		rnd = random.Random(1)
+		bboxes = [rnd_bbox(rnd) for _i in range(500)]
+		index = BBoxIndex([(bbox, i) for i, bbox in enumerate(bboxes)])
+		self.assertEqual(500, len(index))
+		for _i in range(50):
+			bbox = rnd_bbox(rnd)
+			expected = [i for i, item in enumerate(bboxes)
+					if overlaps(item, bbox)]
+			self.assertEqual(expected, index.query(bbox))
+
+	def test02_empty(self):
+		index = BBoxIndex([])
+		self.assertEqual([], index.query([0.0, 0.0, 1.0, 1.0]))
+		self.assertEqual([], index.get_bbox())
+
+	def test03_layer_culling(self):
+		rnd = random.Random(2)
+		layer = sk2_model.Layer(SK2_Config())
+		layer.childs = [Obj(rnd_bbox(rnd)) for _i in range(300)]
+		# objects without bbox are always returned
+		for pos in (0, 100, 299):
+			layer.childs[pos] = Obj([])
+		bbox = [200.0, 200.0, 600.0, 600.0]
+		expected = [obj for obj in layer.childs
+				if not obj.cache_bbox or overlaps(obj.cache_bbox, bbox)]
+		self.assertEqual(expected, layer.get_objects_in_bbox(bbox))
+		# index is rebuilt after objects change
+		layer.childs.append(Obj([300.0, 300.0, 310.0, 310.0]))
+		self.assertTrue(layer.childs[-1] in layer.get_objects_in_bbox(bbox))
+		layer.childs.pop(1)
+		expected = [obj for obj in layer.childs
+				if not obj.cache_bbox or overlaps(obj.cache_bbox, bbox)]
+		self.assertEqual(expected, layer.get_objects_in_bbox(bbox))
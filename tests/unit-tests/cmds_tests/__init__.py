@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+
+import httplib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+from uc2 import uc2_init, utils
+from uc2.cmds import convert, parse_cmd_args
+from uc2.cmds.serve import WorkerPool, _confine_path, _create_server, \
+	_parse_address
+
+
+class TestCmdArgs(unittest.TestCase):
+
+	def setUp(self):
+		self.argv = sys.argv
+
+	def tearDown(self):
+		sys.argv = self.argv
+
+	def parse(self, *args):
+		sys.argv = ['uniconvertor'] + list(args)
+		return parse_cmd_args(None)[1]
+
+	def test01_values(self):
+		options = self.parse('--jobs=4', '--image-scale=1.5', '--verbose',
+			'--fit-to-page=no', '--format=pdf')
+		self.assertEqual({'jobs': 4, 'image-scale': 1.5, 'verbose': True,
+			'fit-to-page': False, 'format': 'pdf'}, options)
+
+	def test02_serve_address(self):
+		for address, host_port in (
+			('127.0.0.1', ('127.0.0.1', 8765)),
+			('127.0.0.1:9000', ('127.0.0.1', 9000)),
+			('localhost', ('localhost', 8765)),
+			('9000', ('127.0.0.1', 9000)),
+			(':9000', ('127.0.0.1', 9000))):
+			options = self.parse('--serve=%s' % address)
+			self.assertEqual(host_port, _parse_address(options['serve']))
+
+
+class TestTranslate(unittest.TestCase):
+
+	def setUp(self):
+		self.app = uc2_init()
+		self.tmp_dir = tempfile.mkdtemp(prefix='uc2-cmds-')
+		self.filepath = os.path.join(self.tmp_dir, 'drawing.svg')
+		with open(self.filepath, 'wb') as fileptr:
+			fileptr.write('<svg xmlns="http://www.w3.org/2000/svg"/>')
+
+	def tearDown(self):
+		utils.set_deterministic_ids(None)
+		shutil.rmtree(self.tmp_dir, True)
+
+	def convert(self, **options):
+		files = [self.filepath, os.path.join(self.tmp_dir, 'drawing.pdf')]
+		options['dry-run'] = True
+		convert(self.app.appdata, files, options)
+		return utils.generate_id()
+
+	def test01_deterministic_ids(self):
+		self.assertEqual('1', self.convert(**{'deterministic-ids': True}))
+		self.assertEqual('1', self.convert(**{'deterministic-ids': True}))
+		self.assertEqual('11', self.convert(**{'deterministic-ids': 10}))
+		self.assertTrue(int(self.convert()) > 100000)
+
+
+class FakeWorker(object):
+	timeout = None
+
+	def run(self, job, timeout):
+		self.timeout = timeout
+		return True, []
+
+	def is_alive(self):
+		return True
+
+
+class FakePool(object):
+	timeout = 10.0
+
+	def __init__(self):
+		self.jobs = []
+
+	def convert(self, *args):
+		self.jobs.append(args)
+		return {'status': True, 'messages': [], 'time': 0.0}
+
+
+class TestServe(unittest.TestCase):
+
+	def setUp(self):
+		self.root = os.path.realpath(tempfile.mkdtemp())
+		with open(os.path.join(self.root, 'drawing.svg'), 'wb') as fileptr:
+			fileptr.write('<svg xmlns="http://www.w3.org/2000/svg"/>')
+		self.server = _create_server('127.0.0.1:0', None)[0]
+		self.server.root = self.root
+		self.server.pool = FakePool()
+		self.thread = threading.Thread(target=self.server.serve_forever)
+		self.thread.start()
+
+	def tearDown(self):
+		self.server.shutdown()
+		self.server.server_close()
+		self.thread.join()
+		shutil.rmtree(self.root, True)
+
+	def post(self, request, headers=None):
+		if headers is None:
+			headers = {'Content-Type': 'application/json'}
+		conn = httplib.HTTPConnection(*self.server.server_address[:2])
+		conn.request('POST', '/convert', json.dumps(request), headers)
+		response = conn.getresponse()
+		return response.status, json.loads(response.read())
+
+	def test01_confine_path(self):
+		root = self.root
+		path = os.path.join(root, 'drawing.svg')
+		self.assertEqual(path, _confine_path(root, 'drawing.svg'))
+		self.assertEqual(path, _confine_path(root, path))
+		self.assertEqual(path, _confine_path(root, 'a/../drawing.svg'))
+		self.assertIsNone(_confine_path(root, '../drawing.svg'))
+		self.assertIsNone(_confine_path(root, '/etc/passwd'))
+		self.assertIsNone(_confine_path(root, root + '-x/drawing.svg'))
+		os.symlink('/etc', os.path.join(root, 'link'))
+		self.assertIsNone(_confine_path(root, 'link/passwd'))
+
+	def test02_convert(self):
+		request = {'input': 'drawing.svg', 'output': 'drawing.pdf'}
+		self.assertEqual(200, self.post(request)[0])
+		filepath, out_filepath = self.server.pool.jobs[0][:2]
+		self.assertEqual(os.path.join(self.root, 'drawing.svg'), filepath)
+		self.assertEqual(os.path.join(self.root, 'drawing.pdf'), out_filepath)
+
+	def test03_simple_cross_origin(self):
+		request = {'input': 'drawing.svg', 'output': 'drawing.pdf'}
+		headers = {'Content-Type': 'text/plain'}
+		self.assertEqual(415, self.post(request, headers)[0])
+		headers = {'Content-Type': 'application/json',
+			'Origin': 'http://example.com'}
+		self.assertEqual(403, self.post(request, headers)[0])
+		self.assertEqual([], self.server.pool.jobs)
+
+	def test04_outside_of_root(self):
+		for request in (
+			{'input': 'drawing.svg', 'output': '../drawing.pdf'},
+			{'input': 'drawing.svg', 'output': os.path.expanduser('~/.bashrc')},
+			{'input': '/etc/passwd', 'output': 'passwd.svg'}):
+			self.assertEqual(403, self.post(request)[0])
+		self.assertEqual([], self.server.pool.jobs)
+
+	def test05_timeout(self):
+		request = {'input': 'drawing.svg', 'output': 'drawing.pdf',
+			'options': {'timeout': 5, 'format': 'pdf'}}
+		self.assertEqual(200, self.post(request)[0])
+		options, timeout = self.server.pool.jobs[0][2:]
+		self.assertEqual(5, timeout)
+		self.assertEqual({'format': 'pdf'}, options)
+		for value in (0, -1, 'x', True):
+			request['options'] = {'timeout': value}
+			self.assertEqual(400, self.post(request)[0])
+
+	def test06_pool_timeout(self):
+		pool = WorkerPool(0, 10.0)
+		worker = FakeWorker()
+		pool.idle.put(worker)
+		for timeout, expected in ((None, 10.0), (5, 5), (60, 10.0)):
+			pool.convert('drawing.svg', 'drawing.pdf', {}, timeout)
+			self.assertEqual(expected, worker.timeout)
@@ -452,4 +452,32 @@ class TestCmsFunctions(unittest.TestCase):
 		except libcms.CmsError:
 			self.fail()
 
-
+	#---Batch transformation tests
+
+	def test34_do_batch_transform(self):
+		colors = [[0, 0, 0, 0], [255, 255, 255, 0], [100, 190, 150, 0]]
+		ret = libcms.cms_do_batch_transform(self.transform, colors,
+						uc2const.COLOR_RGB, uc2const.COLOR_CMYK)
+		self.assertEqual(3, len(ret))
+		for rgb, cmyk in zip(colors, ret):
+			out = libcms.COLORB()
+			libcms.cms_do_transform(self.transform, rgb, out)
+			self.assertEqual([out[0], out[1], out[2], out[3]], cmyk)
+		self.assertEqual([], libcms.cms_do_batch_transform(self.transform,
+						[], uc2const.COLOR_RGB, uc2const.COLOR_CMYK))
+
+	def test35_do_batch_transform_with_short_color(self):
+		colors = [[0, 0, 0, 0], [255, 255, 255]]
+		self.assertRaises(libcms.CmsError, libcms.cms_do_batch_transform,
+						self.transform, colors, uc2const.COLOR_RGB, uc2const.COLOR_CMYK)
+
+	def test36_transform_buffer_with_short_buffer(self):
+		_cms = libcms._cms
+		self.assertRaises(ValueError, _cms.transformBuffer,
+						self.transform, '\x00' * 7, 2, 4, 4)
+		self.assertRaises(ValueError, _cms.transformBuffer,
+						self.transform, '\x00' * 8, 2, 0, 4)
+		self.assertRaises(ValueError, _cms.transformBuffer,
+						self.transform, '\x00' * 8, -1, 4, 4)
+		self.assertEqual(8, len(_cms.transformBuffer(self.transform,
+						'\x00' * 8, 2, 4, 4)))
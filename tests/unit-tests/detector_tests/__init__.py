@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+
+import unittest
+
+from uc2 import uc2const
+from uc2.formats import detector
+from uc2.utils.fsutils import MemoryFile
+
+SVG_DOC = '<?xml version="1.0"?>\n<!-- Created with sK1 -->\n' \
+	'<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" "svg11.dtd" [\n' \
+	'<!ENTITY ns "http://www.w3.org/2000/svg">]>\n' \
+	'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"/>'
+
+AI_SVG_DOC = '<?xml version="1.0" encoding="utf-8"?>\n' \
+	'<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" "svg11.dtd" [\n' \
+	'\t<!ENTITY ns_svg "http://www.w3.org/2000/svg">\n' \
+	'\t<!ENTITY ns_xlink "http://www.w3.org/1999/xlink">\n]>\n' \
+	'<svg version="1.1" id="Layer_1" xmlns="&ns_svg;" ' \
+	'xmlns:xlink="&ns_xlink;" width="10" height="10"/>'
+
+SAMPLES = [
+	(SVG_DOC, 'drawing.svg', uc2const.SVG),
+	(SVG_DOC, 'drawing.png', uc2const.SVG),
+	('<svg:svg xmlns:svg="http://www.w3.org/2000/svg"/>', '', uc2const.SVG),
+	(AI_SVG_DOC, '', uc2const.SVG),
+	('<svg width="10" height="10"/>', '', uc2const.SVG),
+	('RIFF\x10\x00\x00\x00CDRDvrsn', 'drawing.svg', uc2const.CDR),
+	('RIFF\x10\x00\x00\x00CMX1cont', '', uc2const.CMX),
+	('\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR', 'image.jpg', uc2const.PNG),
+	('##sK1 2 1\n', '', uc2const.SK2),
+	('IN;PU0,0;', 'plot.plt', uc2const.PLT),
+	('GIMP Palette\nName: Test\n', 'palette.txt', uc2const.GPL),
+]
+
+UNKNOWN = [
+	('<svg xmlns="http://example.com/other"/>', 'drawing.svg'),
+	('garbage', 'drawing.svg'),
+	('', ''),
+]
+
+class TestDetector(unittest.TestCase):
+
+	def test01_signatures(self):
+		for data, name, pid in SAMPLES:
+			result = detector.detect(MemoryFile(data, name))
+			self.assertEqual(pid, result[0])
+			self.assertTrue(result[1] > 0.0)
+
+	def test02_unknown(self):
+		for data, name in UNKNOWN:
+			self.assertEqual((None, 0.0),
+							detector.detect(MemoryFile(data, name)))
+
+	def test03_extension_rank(self):
+		data = '\x00\x01\x00\x00\x00\x00'
+		self.assertEqual(uc2const.ACO,
+						detector.detect(MemoryFile(data, 'colors.aco'))[0])
+
+	def test04_newer_sk2(self):
+		self.assertRaises(RuntimeError, detector.detect,
+						MemoryFile('##sK1 2 99\n'))
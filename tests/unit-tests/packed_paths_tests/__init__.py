@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+
+import random
+import unittest
+from copy import deepcopy
+
+from uc2 import libgeom, sk2const
+from uc2.libgeom import PackedPaths
+
+TRAFO = [0.5, 0.3, -1.2, 2.0, 10.0, -20.0]
+
+
+def rnd_point(rnd):
+	return [rnd.uniform(-100.0, 100.0), rnd.uniform(-100.0, 100.0)]
+
+
+def rnd_paths(rnd, markers=True):
+	paths = []
+	for _i in range(rnd.randint(1, 4)):
+		points = []
+		for _j in range(rnd.randint(0, 8)):
+			if rnd.random() < 0.5:
+				points.append(rnd_point(rnd))
+			else:
+				point = [rnd_point(rnd), rnd_point(rnd), rnd_point(rnd)]
+				if markers:
+					point.append(rnd.choice([sk2const.NODE_CUSP,
+						sk2const.NODE_SMOOTH, sk2const.NODE_SYMMETRICAL]))
+				points.append(point)
+		end = rnd.choice([sk2const.CURVE_CLOSED, sk2const.CURVE_OPENED])
+		paths.append([rnd_point(rnd), points, end])
+	return paths
+
+
+def get_values(items):
+	ret = []
+	for item in items:
+		if isinstance(item, list):
+			ret += get_values(item)
+		else:
+			ret.append(item)
+	return ret
+
+
+def sample_bbox(paths, steps=2000):
+	"""
+	Reference bbox by dense sampling of Bezier segments.
+	"""
+	xs, ys = [], []
+	for path in paths:
+		start = path[0]
+		xs.append(start[0])
+		ys.append(start[1])
+		for point in path[1]:
+			if len(point) == 2:
+				start = point
+				xs.append(start[0])
+				ys.append(start[1])
+				continue
+			(x1, y1), (x2, y2), (x3, y3) = point[:3]
+			x0, y0 = start
+			for step in range(steps + 1):
+				t = step / float(steps)
+				mt = 1.0 - t
+				a, b, c, d = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+				xs.append(a * x0 + b * x1 + c * x2 + d * x3)
+				ys.append(a * y0 + b * y1 + c * y2 + d * y3)
+			start = point[2]
+	return [min(xs), min(ys), max(xs), max(ys)]
+
+
+class TestPackedPaths(unittest.TestCase):
+
+	def setUp(self):
+		self.rnd = random.Random(0)
+
+	def assertBBoxEqual(self, bbox1, bbox2, delta):
+		self.assertEqual(4, len(bbox2))
+		for value1, value2 in zip(bbox1, bbox2):
+			self.assertAlmostEqual(value1, value2, delta=delta)
+
+	def test01_round_trip(self):
+		for markers in (True, False):
+			for _i in range(50):
+				paths = rnd_paths(self.rnd, markers)
+				packed = PackedPaths(paths)
+				self.assertEqual(len(paths), len(packed))
+				self.assertEqual(paths, packed.to_paths())
+				self.assertEqual(paths, list(packed))
+				self.assertEqual(paths[-1], packed[-1])
+				self.assertEqual(paths[1:], packed[1:])
+				self.assertEqual(str(paths), str(packed))
+		self.assertEqual([], PackedPaths().to_paths())
+		self.assertRaises(IndexError, PackedPaths(paths).__getitem__, 10)
+
+	def test02_bbox(self):
+		for _i in range(50):
+			paths = rnd_paths(self.rnd)
+			bbox = PackedPaths(paths).get_bbox()
+			self.assertBBoxEqual(sample_bbox(paths), bbox, 0.01)
+			# cairo path extents are calculated for flattened path
+			self.assertBBoxEqual(libgeom.get_paths_bbox(paths), bbox, 0.2)
+			self.assertEqual(bbox, libgeom.get_paths_bbox(PackedPaths(paths)))
+
+	def test03_trafo(self):
+		for _i in range(50):
+			paths = rnd_paths(self.rnd)
+			expected = libgeom.apply_trafo_to_paths(paths, TRAFO)
+			packed = PackedPaths(paths)
+			transformed = packed.transformed(TRAFO)
+			self.assertEqual(paths, packed.to_paths())
+			self.assertIs(packed, packed.apply_trafo(TRAFO))
+			for result in (transformed, packed,
+					libgeom.apply_trafo_to_paths(PackedPaths(paths), TRAFO)):
+				self.assertIsInstance(result, PackedPaths)
+				values = get_values(result.to_paths())
+				self.assertEqual(len(get_values(expected)), len(values))
+				for value1, value2 in zip(get_values(expected), values):
+					self.assertAlmostEqual(value1, value2, 9)
+
+	def test04_deepcopy(self):
+		paths = rnd_paths(self.rnd)
+		packed = PackedPaths(paths)
+		for item in (deepcopy(packed), packed.copy(),
+				deepcopy([packed])[0]):
+			self.assertIsNot(packed.points, item.points)
+			self.assertEqual(packed, item)
+			item.apply_trafo(TRAFO)
+			self.assertNotEqual(packed, item)
+			self.assertEqual(paths, packed.to_paths())
+
+	def test05_shims(self):
+		paths1 = rnd_paths(self.rnd)
+		paths2 = rnd_paths(self.rnd)
+		packed1, packed2 = PackedPaths(paths1), PackedPaths(paths2)
+		self.assertTrue(packed1 == paths1)
+		self.assertTrue(packed1 == PackedPaths(paths1))
+		self.assertFalse(packed1 != paths1)
+		self.assertTrue(packed1 != packed2)
+		self.assertFalse(packed1 == None)
+		self.assertEqual(paths1 + paths2, packed1 + packed2)
+		self.assertEqual(paths1 + paths2, packed1 + paths2)
+		self.assertEqual(paths2 + paths1, paths2 + packed1)
+		self.assertIsInstance(packed1 + paths2, list)
+		self.assertIs(packed1, PackedPaths.from_paths(packed1))
+
+	def test06_item_assignment(self):
+		paths = rnd_paths(self.rnd, False)
+		packed = PackedPaths(paths)
+		# returned paths are copies
+		path = packed[0]
+		path[2] = 7
+		self.assertEqual(paths, packed.to_paths())
+		# changed path should be assigned back
+		packed[0] = path
+		paths[0] = path
+		self.assertEqual(paths, packed.to_paths())
+		packed[-1] = [[0.0, 0.0], [[1.0, 1.0]], sk2const.CURVE_OPENED]
+		self.assertEqual([[0.0, 0.0], [[1.0, 1.0]], 0], packed[-1])
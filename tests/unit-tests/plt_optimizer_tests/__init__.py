@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import random
+import unittest
+
+from uc2 import sk2const
+from uc2.formats.plt import plt_optimizer
+
+
+def create_paths(rnd, count, size=40000.0):
+	paths = []
+	for index in range(count):
+		x, y = rnd.uniform(0.0, size), rnd.uniform(0.0, size)
+		if index % 2:
+			points = [[x + rnd.uniform(-50.0, 50.0),
+					y + rnd.uniform(-50.0, 50.0)] for _i in range(3)]
+			paths.append([[x, y], points, sk2const.CURVE_OPENED])
+		else:
+			points = [[x + 40.0, y], [x + 40.0, y + 30.0], [x, y + 30.0], [x, y]]
+			paths.append([[x, y], points, sk2const.CURVE_CLOSED])
+	return paths
+
+
+def get_key(path):
+	"""
+	Returns path identity which does not depend on path start point
+	(closed paths) or direction (open paths).
+	"""
+	points = [tuple(path[0])] + [tuple(point) for point in path[1]]
+	if path[2] == sk2const.CURVE_CLOSED:
+		cycle = points[:-1]
+		index = cycle.index(min(cycle))
+		return 'closed', tuple(cycle[index:] + cycle[:index])
+	return 'opened', tuple(min(points, points[::-1]))
+
+
+class TestPLTOptimizer(unittest.TestCase):
+
+	def check_tour(self, paths):
+		result = plt_optimizer.optimize_travel(paths)
+		self.assertEqual(sorted(get_key(path) for path in paths),
+						sorted(get_key(path) for path in result))
+		for path in result:
+			if path[2] == sk2const.CURVE_CLOSED:
+				self.assertEqual(path[0], path[1][-1])
+		before = plt_optimizer.get_travel_distance(paths)
+		after = plt_optimizer.get_travel_distance(result)
+		self.assertTrue(after <= before)
+		return before, after
+
+	def test01_random_paths(self):
+		before, after = self.check_tour(create_paths(random.Random(1), 500))
+		self.assertTrue(after < before / 5.0)
+
+	def test02_clustered_paths(self):
+		rnd = random.Random(2)
+		paths = create_paths(rnd, 1, 40000.0)
+		paths += create_paths(rnd, 2000, 400.0)
+		self.check_tour(paths)
+
+	def test03_equal_paths(self):
+		paths = create_paths(random.Random(3), 1) * 200
+		self.check_tour(paths)
+
+	def test04_empty(self):
+		self.assertEqual([], plt_optimizer.optimize_travel([]))
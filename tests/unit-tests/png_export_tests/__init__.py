@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+
+import unittest
+from cStringIO import StringIO
+
+import cairo
+from PIL import Image
+
+from uc2 import uc2_init, uc2const, sk2const
+from uc2.formats import png
+from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2.crenderer import CairoRenderer
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+
+APP = None
+PAGE_SIZE = (151.0, 213.0)
+
+
+def get_app():
+	global APP
+	if APP is None:
+		APP = uc2_init()
+		APP.init_mngrs()
+	return APP
+
+
+def rgb(r, g, b, alpha=1.0):
+	return [uc2const.COLOR_RGB, [r, g, b], alpha, '']
+
+
+def create_document():
+	"""
+	Antialiased curves, strokes and translucent fill crossing
+	band borders at any band height.
+	"""
+	doc = SK2_Presenter(get_app().appdata)
+	page = doc.methods.get_page()
+	doc.methods.set_page_format(page, ['Custom', PAGE_SIZE, uc2const.PORTRAIT])
+	layer = doc.methods.get_layer(page)
+	stroke = [sk2const.STROKE_MIDDLE, 2.3, rgb(0.0, 0.0, 1.0), [],
+		sk2const.CAP_ROUND, sk2const.JOIN_ROUND, 10.433, 0, 0, []]
+	fill = [sk2const.FILL_EVENODD, sk2const.FILL_SOLID, rgb(1.0, 0.5, 0.0, 0.6)]
+	paths = [[[-70.3, -100.1], [[60.7, 95.9], [[70.0, -90.0], [-60.0, 80.0],
+		[-10.1, -99.7], sk2const.NODE_CUSP]], sk2const.CURVE_CLOSED]]
+	curve = sk2_model.Curve(doc.config, layer, paths,
+		[] + sk2const.NORMAL_TRAFO, [fill, stroke, [], []])
+	circle = sk2_model.Circle(doc.config, layer, [-50.5, -40.5, 97.3, 81.1],
+		style=[[], stroke, [], []])
+	layer.childs += [curve, circle]
+	doc.update()
+	return doc
+
+
+def render_surface(doc, scale=1.0):
+	"""
+	Renders page into single surface as PNG saver did
+	before banded rendering.
+	"""
+	page = doc.methods.get_page()
+	w, h = [scale * item for item in page.page_format[1]]
+	trafo = (scale, 0, 0, -scale, w / 2.0, h / 2.0)
+	surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, int(w), int(h))
+	ctx = cairo.Context(surface)
+	ctx.set_matrix(cairo.Matrix(*trafo))
+	rend = CairoRenderer(doc.cms)
+	for item in doc.methods.get_visible_layers(page):
+		rend.render(ctx, item.childs)
+	return surface
+
+
+def decode(data):
+	image = Image.open(StringIO(data))
+	return image.mode, image.size, image.tobytes()
+
+
+class TestPNGExport(unittest.TestCase):
+
+	def setUp(self):
+		self.doc = create_document()
+		self.band_size = png.PNG_BAND_SIZE
+
+	def tearDown(self):
+		png.PNG_BAND_SIZE = self.band_size
+		self.doc.close()
+
+	def save(self, band_height, scale=1.0):
+		width = int(PAGE_SIZE[0] * scale)
+		png.PNG_BAND_SIZE = 4 * width * band_height
+		fileptr = StringIO()
+		fileptr.close = lambda: None
+		png.png_saver(self.doc, fileptr=fileptr, image_scale=scale)
+		return fileptr.getvalue()
+
+	def test01_pixels_equal_write_to_png(self):
+		for scale in (1.0, 2.5):
+			fileptr = StringIO()
+			render_surface(self.doc, scale).write_to_png(fileptr)
+			expected = decode(fileptr.getvalue())
+			self.assertEqual('RGBA', expected[0])
+			for band_height in (1, 7, 64, 10000):
+				self.assertEqual(expected, decode(self.save(band_height, scale)))
+
+	def test02_band_height(self):
+		data = self.save(10000)
+		for band_height in (1, 7, 64):
+			self.assertEqual(data, self.save(band_height))
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+
+import unittest
+
+from uc2 import uc2_init, uc2const, sk2const
+from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+
+APP = None
+
+
+def get_app():
+	global APP
+	if APP is None:
+		APP = uc2_init()
+		APP.init_mngrs()
+	return APP
+
+
+def create_curve(doc, layer):
+	paths = [[[0.0, 0.0], [[100.0, 0.0], [100.0, 50.0]],
+		sk2const.CURVE_CLOSED]]
+	fill = [sk2const.FILL_EVENODD, sk2const.FILL_SOLID,
+		[uc2const.COLOR_RGB, [1.0, 0.0, 0.0], 1.0, '']]
+	return sk2_model.Curve(doc.config, layer, paths,
+		[] + sk2const.NORMAL_TRAFO, [fill, [], [], []])
+
+
+class TestModelUpdate(unittest.TestCase):
+
+	def setUp(self):
+		self.doc = SK2_Presenter(get_app().appdata)
+		self.layer = self.doc.methods.get_layer(self.doc.methods.get_page())
+		self.curve = create_curve(self.doc, self.layer)
+		self.layer.childs.append(self.curve)
+		self.doc.update()
+
+	def tearDown(self):
+		self.doc.close()
+
+	def test01_unchanged(self):
+		cpath = self.curve.cache_cpath
+		self.doc.update()
+		self.assertIs(cpath, self.curve.cache_cpath)
+
+	def test02_trafo_in_place(self):
+		self.assertEqual([0.0, 0.0, 100.0, 50.0], self.curve.cache_bbox)
+		self.curve.trafo[4] += 10.0
+		self.curve.trafo[5] += 20.0
+		self.doc.update()
+		self.assertEqual([10.0, 20.0, 110.0, 70.0], self.curve.cache_bbox)
+		self.assertEqual([10.0, 20.0, 110.0, 70.0], self.layer.cache_bbox)
+
+	def test03_style_in_place(self):
+		cpath = self.curve.cache_cpath
+		self.curve.style[1] = [sk2const.STROKE_MIDDLE, 10.0,
+			[uc2const.COLOR_RGB, [0.0, 0.0, 0.0], 1.0, ''], [],
+			sk2const.CAP_BUTT, sk2const.JOIN_MITER, 10.433, 0, 0, []]
+		self.doc.update()
+		self.assertIsNot(cpath, self.curve.cache_cpath)
+		bbox = self.curve.get_visual_bbox()
+		self.assertTrue(bbox[0] < 0.0 and bbox[3] > 50.0)
+
+	def test04_paths_in_place(self):
+		paths = self.curve.paths
+		paths.apply_trafo([2.0, 0.0, 0.0, 2.0, 0.0, 0.0])
+		self.assertIs(paths, self.curve.paths)
+		self.doc.update()
+		self.assertEqual([0.0, 0.0, 200.0, 100.0], self.curve.cache_bbox)
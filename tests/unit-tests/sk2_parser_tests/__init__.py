@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import unittest
+
+from uc2.formats.sk2 import sk2_parser
+
+LITERALS = [
+	"1", "-2.5e-07", "1L", "None", "True", "False", "''", "'it\\'s'",
+	'"a\\nb"', "u'\\u0410b'", "'\xd0\xa1\xd0\xbb\xd0\xbe\xd0\xb9'",
+	"()", "(1,)", "(1.0, 1.0, 1.0)", "[]", "[1,]", "{}",
+	"[[[-8.0, -8.0], [[-8.0, 8.0], [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0], 0]], 1]]",
+	"[[1, 0, ['CMYK', [0.0, 0.0, 0.0, 1.0], 1.0, 'Black']], [], [], []]",
+	"{'Default Style': [[], [0, 0.28, ['CMYK', [0.0, 0.0, 0.0, 1.0]]]], 1: None}",
+	"['Custom', (16.0, 16.0), 0]",
+]
+
+INVALID = [
+	"__import__('os').system('ls')", "os.system", "[1 2]", "[1,,2]", "{1, 2}",
+	"{1: 2: 3}", "[1", "1 2", "(1, 2]", "'abc", "[1] + [2]", "",
+]
+
+class TestSK2Parser(unittest.TestCase):
+
+	def test01_literals(self):
+		for text in LITERALS:
+			value = sk2_parser.parse_literal(text)
+			expected = eval(text)
+			self.assertEqual(expected, value)
+			self.assertEqual(type(expected), type(value))
+
+	def test02_invalid_literals(self):
+		for text in INVALID:
+			self.assertRaises(sk2_parser.SK2ParsingError,
+							sk2_parser.parse_literal, text)
+
+	def test03_memoized_copies(self):
+		text = "[[1, 0, ['RGB', [0.0, 0.0, 0.0], 1.0, '']], [], [], []]"
+		value = sk2_parser.parse_literal(text)
+		value[0][2][1][0] = 1.0
+		self.assertEqual(eval(text), sk2_parser.parse_literal(text))
+
+	def test04_lines(self):
+		self.assertEqual((sk2_parser.OBJ, ('Curve',)),
+						sk2_parser.parse_line("obj('Curve')"))
+		self.assertEqual((sk2_parser.END, ()), sk2_parser.parse_line("end()"))
+		self.assertEqual((sk2_parser.SET, ('name', 'Layer, 1')),
+						sk2_parser.parse_line("set('name','Layer, 1')"))
+		self.assertRaises(sk2_parser.SK2ParsingError,
+						sk2_parser.parse_line, "setattr('x',1)")
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from uc2 import uc2_init, uc2const, sk2const, utils
+from uc2.formats.sk2 import sk2_model
+from uc2.formats.sk2.sk2_presenter import SK2_Presenter
+from uc2.formats.svg import svg_loader, svg_saver
+
+APP = None
+
+
+def get_app():
+	global APP
+	if APP is None:
+		APP = uc2_init()
+		APP.init_mngrs()
+	return APP
+
+
+def rgb(r, g, b):
+	return [uc2const.COLOR_RGB, [r, g, b], 1.0, '']
+
+
+def stroke(color, arrows=[]):
+	return [sk2const.STROKE_MIDDLE, 1.0, color, [], sk2const.CAP_BUTT,
+		sk2const.JOIN_MITER, 10.433, 0, 0, arrows]
+
+
+def fill(color):
+	return [sk2const.FILL_EVENODD, sk2const.FILL_SOLID, color]
+
+
+def create_document():
+	"""
+	Arrowed line followed by objects with other styles,
+	so style classes are allocated after arrows.
+	"""
+	doc = SK2_Presenter(get_app().appdata)
+	layer = doc.methods.get_layer(doc.methods.get_page())
+	paths = [[[0.0, 0.0], [[100.0, 50.0], [200.0, 0.0]],
+		sk2const.CURVE_OPENED]]
+	line = sk2_model.Curve(doc.config, layer, paths,
+		[] + sk2const.NORMAL_TRAFO, [[], stroke(rgb(1.0, 0.0, 0.0), [1, 1]),
+		[], []])
+	rect = sk2_model.Rectangle(doc.config, layer, [0.0, 0.0, 50.0, 50.0],
+		[] + sk2const.NORMAL_TRAFO,
+		[fill(rgb(0.0, 1.0, 0.0)), stroke(rgb(0.0, 0.0, 1.0)), [], []])
+	circle = sk2_model.Circle(doc.config, layer, [100.0, 100.0, 40.0, 40.0],
+		style=[fill(rgb(0.0, 0.0, 1.0)), [], [], []])
+	layer.childs += [line, rect, circle]
+	doc.update()
+	return doc
+
+
+def add_gradients(doc):
+	"""
+	Rectangles at different positions filled by the same gradient.
+	"""
+	layer = doc.methods.get_layer(doc.methods.get_page())
+	stops = [[0.0, rgb(1.0, 0.0, 0.0)], [1.0, rgb(0.0, 0.0, 1.0)]]
+	for x in (0.0, 100.0, 200.0):
+		fill = [sk2const.FILL_EVENODD, sk2const.FILL_GRADIENT,
+			[sk2const.GRADIENT_LINEAR, [[x, 0.0], [x + 50.0, 0.0]], stops]]
+		layer.childs.append(sk2_model.Rectangle(doc.config, layer,
+			[x, 0.0, 50.0, 50.0], [] + sk2const.NORMAL_TRAFO,
+			[fill, [], [], []]))
+	doc.update()
+
+
+def get_gradient_fills(obj):
+	ret = []
+	for child in obj.childs:
+		ret += get_gradient_fills(child)
+	style = getattr(obj, 'style', None)
+	if style and style[0] and style[0][1] == sk2const.FILL_GRADIENT:
+		ret.append(style[0][2])
+	return ret
+
+
+class TestSVGExport(unittest.TestCase):
+
+	def setUp(self):
+		self.doc = create_document()
+		self.tmp_dir = tempfile.mkdtemp(prefix='uc2-svg-')
+
+	def tearDown(self):
+		self.doc.close()
+		shutil.rmtree(self.tmp_dir, True)
+
+	def export(self, **cnf):
+		filepath = os.path.join(self.tmp_dir, 'drawing.svg')
+		utils.set_deterministic_ids()
+		try:
+			svg_saver(self.doc, filepath, cnf=cnf)
+		finally:
+			utils.set_deterministic_ids(None)
+		with open(filepath, 'rb') as fileptr:
+			return fileptr.read()
+
+	def test01_stream_equals_model(self):
+		for css in (False, True):
+			streamed = self.export(svg_css_styles=css, svg_stream_export=True)
+			model = self.export(svg_css_styles=css, svg_stream_export=False)
+			self.assertEqual(model, streamed)
+
+	def test02_css_classes(self):
+		data = self.export(svg_css_styles=True)
+		rules = dict(re.findall(r'\.(st\d+)\{([^}]*)\}', data))
+		used = re.findall(r'class="(st\d+)"', data)
+		# line, arrows, rectangle, circle
+		self.assertEqual(4, len(used))
+		self.assertEqual(sorted(set(used)), sorted(rules.keys()))
+		self.assertEqual('fill:#ff0000;', rules[used[1]])
+
+	def test03_shared_gradient_stops(self):
+		add_gradients(self.doc)
+		streamed = self.export(svg_stream_export=True)
+		self.assertEqual(self.export(svg_stream_export=False), streamed)
+		# stops are written once, every rectangle has own vector
+		self.assertEqual(2, streamed.count('<stop '))
+		self.assertEqual(3, streamed.count('xlink:href="#grad'))
+
+		filepath = os.path.join(self.tmp_dir, 'drawing.svg')
+		doc = svg_loader(get_app().appdata, filepath)
+		gradients = get_gradient_fills(doc.model)
+		doc.close()
+		self.assertEqual(3, len(gradients))
+		for gradient in gradients:
+			self.assertEqual(2, len(gradient[2]))
+			self.assertEqual([0.0, 1.0], [stop[0] for stop in gradient[2]])
+		vectors = [gradient[1] for gradient in gradients]
+		self.assertEqual(3, len(set(str(item) for item in vectors)))
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+#	Copyright (C) 2015 by Ihor E. Novikov
+#	
+#	This program is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU Affero General Public License
+#	as published by the Free Software Foundation, either version 3
+#	of the License, or (at your option) any later version.
+#	
+#	This program is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#	
+#	You should have received a copy of the GNU Affero General Public License
+#	along with this program.  If not, see <https://www.gnu.org/licenses/>. 
+
+
+import threading
+import unittest
+
+from uc2 import utils
+from uc2.utils import IdGenerator
+
+
+class TestIdGenerator(unittest.TestCase):
+
+	def tearDown(self):
+		utils.set_deterministic_ids(None)
+
+	def test01_unique_in_threads(self):
+		generator = IdGenerator()
+		ids = []
+
+		def worker():
+			values = [generator.next_int() for _i in range(2000)]
+			ids.extend(values)
+
+		threads = [threading.Thread(target=worker) for _i in range(4)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(8000, len(set(ids)))
+
+	def test02_monotonic(self):
+		for seed in (None, 0):
+			generator = IdGenerator(seed)
+			ids = [generator.next_int() for _i in range(10000)]
+			self.assertEqual(sorted(set(ids)), ids)
+		utils.set_deterministic_ids(None)
+		ids = [int(utils.generate_id()) for _i in range(1000)]
+		self.assertEqual(sorted(set(ids)), ids)
+
+	def test03_reproducible(self):
+		def get_ids(seed):
+			utils.set_deterministic_ids(seed)
+			return [utils.generate_id(), utils.generate_base64_id(),
+				utils.generate_guid()]
+
+		self.assertEqual(get_ids(0), get_ids(0))
+		self.assertEqual(get_ids(100), get_ids(100))
+		self.assertNotEqual(get_ids(0), get_ids(100))
+		self.assertEqual('1', get_ids(0)[0])
+		self.assertEqual('101', get_ids(100)[0])
+
+	def test04_time_based(self):
+		utils.set_deterministic_ids(5)
+		utils.set_deterministic_ids(None)
+		self.assertFalse(utils.ID_GENERATOR.is_deterministic())
+		self.assertTrue(int(utils.generate_id()) > 100000)
+		self.assertNotEqual(utils.generate_guid(), utils.generate_guid())